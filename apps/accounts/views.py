@@ -173,7 +173,7 @@ def dashboard(request):
         # So'nggi test natijalari
         recent_attempts = QuizAttempt.objects.filter(
             quiz__course__teacher=user,
-            completed_at__isnull=False
+            graded_at__isnull=False
         ).select_related('student', 'quiz').order_by('-completed_at')[:5]
 
         context = {
@@ -190,7 +190,8 @@ def dashboard(request):
     else:
         from apps.courses.models import Enrollment, LessonProgress
         from apps.assessments.models import Quiz, QuizAttempt
-        from apps.attendance.models import Attendance
+        from apps.attendance.models import AttendanceSummary
+        from apps.attendance.summaries import overall_percentage
         from apps.analytics.models import ActivityLog
         from django.db.models import Avg
         from django.utils import timezone
@@ -216,13 +217,10 @@ def dashboard(request):
         total_quizzes = quiz_attempts.count()
         avg_score = quiz_attempts.aggregate(avg=Avg('score'))['avg'] or 0
 
-        # Davomat
-        total_attendance = Attendance.objects.filter(student=user).count()
-        present_attendance = Attendance.objects.filter(
-            student=user,
-            status__in=['present', 'late', 'excused']
-        ).count()
-        attendance_percentage = int((present_attendance / total_attendance) * 100) if total_attendance > 0 else 0
+        # Davomat (faol kurslar xulosalaridan)
+        attendance_percentage = overall_percentage(
+            AttendanceSummary.objects.filter(student=user, course__in=enrollments.values('course'))
+        )
 
         # Yaqinlashayotgan testlar
         now = timezone.now()
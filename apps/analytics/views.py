@@ -10,7 +10,8 @@ from datetime import timedelta
 from .models import ActivityLog
 from apps.courses.models import Course, Enrollment, LessonProgress
 from apps.assessments.models import QuizAttempt, Grade
-from apps.attendance.models import Attendance
+from apps.attendance.models import Attendance, AttendanceSummary
+from apps.attendance.summaries import get_summary, overall_percentage
 
 
 # ===================== TALABA =====================
@@ -36,13 +37,10 @@ def student_stats(request):
     total_quizzes = quiz_attempts.count()
     avg_score = quiz_attempts.aggregate(avg=Avg('score'))['avg'] or 0
 
-    # Davomat
-    total_attendance = Attendance.objects.filter(student=user).count()
-    present_attendance = Attendance.objects.filter(
-        student=user,
-        status__in=['present', 'late', 'excused']
-    ).count()
-    attendance_percentage = int((present_attendance / total_attendance) * 100) if total_attendance > 0 else 0
+    # Davomat (faol kurslar xulosalaridan)
+    attendance_percentage = overall_percentage(
+        AttendanceSummary.objects.filter(student=user, course__in=enrollments.values('course'))
+    )
 
     # So'nggi faolliklar
     recent_activities = ActivityLog.objects.filter(user=user)[:10]
@@ -51,7 +49,7 @@ def student_stats(request):
     course_progress = []
     for enrollment in enrollments:
         course = enrollment.course
-        total_lessons = course.lesson_count()
+        total_lessons = course.lesson_count
         completed = LessonProgress.objects.filter(
             student=user,
             lesson__module__course=course,
@@ -102,7 +100,7 @@ def teacher_course_analytics(request, course_pk):
 
     # Umumiy statistika
     total_students = Enrollment.objects.filter(course=course, status='active').count()
-    total_lessons = course.lesson_count()
+    total_lessons = course.lesson_count
     total_quizzes = course.quizzes.count()
 
     # O'rtacha progress
@@ -112,19 +110,18 @@ def teacher_course_analytics(request, course_pk):
     # Test statistikasi
     quiz_attempts = QuizAttempt.objects.filter(
         quiz__course=course,
-        completed_at__isnull=False
+        graded_at__isnull=False
     )
     avg_quiz_score = quiz_attempts.aggregate(avg=Avg('score'))['avg'] or 0
     passed_quizzes = quiz_attempts.filter(is_passed=True).count()
     total_attempts = quiz_attempts.count()
     pass_rate = int((passed_quizzes / total_attempts) * 100) if total_attempts > 0 else 0
 
-    # Davomat statistikasi
+    # Davomat statistikasi (faol talabalar xulosalaridan)
     total_sessions = course.sessions.count()
-    attendances = Attendance.objects.filter(session__course=course)
-    present_count = attendances.filter(status='present').count()
-    total_attendance = attendances.count()
-    attendance_rate = int((present_count / total_attendance) * 100) if total_attendance > 0 else 0
+    attendance_rate = overall_percentage(
+        AttendanceSummary.objects.filter(course=course, student__in=enrollments.values('student'))
+    )
 
     # Eng faol talabalar
     active_students = Enrollment.objects.filter(
@@ -168,7 +165,7 @@ def teacher_student_progress(request, course_pk, student_pk):
     student = enrollment.student
 
     # Dars progressi
-    total_lessons = course.lesson_count()
+    total_lessons = course.lesson_count
     completed_lessons = LessonProgress.objects.filter(
         student=student,
         lesson__module__course=course,
@@ -180,7 +177,7 @@ def teacher_student_progress(request, course_pk, student_pk):
     quiz_attempts = QuizAttempt.objects.filter(
         student=student,
         quiz__course=course,
-        completed_at__isnull=False
+        graded_at__isnull=False
     ).select_related('quiz').order_by('-completed_at')
 
     avg_quiz_score = quiz_attempts.aggregate(avg=Avg('score'))['avg'] or 0
@@ -191,9 +188,7 @@ def teacher_student_progress(request, course_pk, student_pk):
         session__course=course
     ).select_related('session').order_by('-session__date')
 
-    total_sessions = course.sessions.count()
-    present_count = attendances.filter(status__in=['present', 'late', 'excused']).count()
-    attendance_rate = int((present_count / total_sessions) * 100) if total_sessions > 0 else 0
+    attendance_rate = get_summary(student, course).percentage
 
     # Baho
     grade = Grade.objects.filter(student=student, course=course).first()
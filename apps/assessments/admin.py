@@ -1,7 +1,12 @@
 # apps/assessments/admin.py
 
 from django.contrib import admin
-from .models import Quiz, Question, Answer, QuizAttempt, StudentAnswer, Grade
+from django.utils.html import format_html, format_html_join
+from .models import (
+    Quiz, QuestionBank, Question, QuizPoolRule, Answer, QuizAttempt, StudentAnswer, QuizAttemptSummary,
+    RegradeRun, RegradeChange, GradingPolicy, Grade, ItemCalibration
+)
+from .grading import review_attempt
 
 
 class AnswerInline(admin.TabularInline):
@@ -15,6 +20,20 @@ class QuestionInline(admin.TabularInline):
     extra = 1
     ordering = ['order']
     show_change_link = True
+    exclude = ('bank',)
+
+
+class BankQuestionInline(admin.TabularInline):
+    model = Question
+    extra = 1
+    ordering = ['order']
+    show_change_link = True
+    exclude = ('quiz',)
+
+
+class QuizPoolRuleInline(admin.TabularInline):
+    model = QuizPoolRule
+    extra = 0
 
 
 @admin.register(Quiz)
@@ -24,7 +43,7 @@ class QuizAdmin(admin.ModelAdmin):
     search_fields = ('title', 'course__name', 'course__code')
     list_editable = ('is_active',)
 
-    inlines = [QuestionInline]
+    inlines = [QuestionInline, QuizPoolRuleInline]
 
     fieldsets = (
         (None, {
@@ -32,7 +51,10 @@ class QuizAdmin(admin.ModelAdmin):
         }),
         ('Sozlamalar', {
             'fields': ('time_limit_minutes', 'passing_score', 'attempts_allowed', 'shuffle_questions',
-                       'show_correct_answers')
+                       'shuffle_answers', 'show_correct_answers')
+        }),
+        ('Moslashuvchan rejim', {
+            'fields': ('is_adaptive', 'adaptive_max_questions', 'adaptive_target_se')
         }),
         ('Vaqt oralig\'i', {
             'fields': ('available_from', 'available_until')
@@ -55,11 +77,20 @@ class QuizAdmin(admin.ModelAdmin):
     get_status.short_description = 'Holat'
 
 
+@admin.register(QuestionBank)
+class QuestionBankAdmin(admin.ModelAdmin):
+    list_display = ('title', 'course', 'created_at')
+    list_filter = ('course',)
+    search_fields = ('title', 'course__name', 'course__code')
+
+    inlines = [BankQuestionInline]
+
+
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ('text_short', 'quiz', 'question_type', 'points', 'order')
-    list_filter = ('question_type', 'quiz__course', 'quiz')
-    search_fields = ('text', 'quiz__title')
+    list_display = ('text_short', 'quiz', 'bank', 'question_type', 'difficulty', 'points', 'order')
+    list_filter = ('question_type', 'difficulty', 'quiz__course', 'quiz', 'bank')
+    search_fields = ('text', 'tags', 'quiz__title', 'bank__title')
     ordering = ['quiz', 'order']
 
     inlines = [AnswerInline]
@@ -70,6 +101,14 @@ class QuestionAdmin(admin.ModelAdmin):
     text_short.short_description = 'Savol'
 
 
+@admin.register(ItemCalibration)
+class ItemCalibrationAdmin(admin.ModelAdmin):
+    list_display = ('question', 'model', 'discrimination', 'difficulty', 'responses', 'calibrated_at')
+    list_filter = ('model', 'question__quiz__course')
+    search_fields = ('question__text',)
+    raw_id_fields = ('question',)
+
+
 @admin.register(Answer)
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ('text', 'question', 'is_correct', 'order')
@@ -90,11 +129,32 @@ class QuizAttemptAdmin(admin.ModelAdmin):
     list_display = ('student', 'quiz', 'score', 'is_passed', 'started_at', 'completed_at')
     list_filter = ('is_passed', 'quiz__course', 'quiz')
     search_fields = ('student__username', 'student__first_name', 'quiz__title')
-    readonly_fields = ('started_at', 'completed_at', 'score', 'points_earned', 'points_possible', 'is_passed')
+    readonly_fields = (
+        'started_at', 'completed_at', 'score', 'points_earned', 'points_possible', 'is_passed', 'answers_review'
+    )
     ordering = ['-started_at']
 
     inlines = [StudentAnswerInline]
 
+    def get_inlines(self, request, obj):
+        # Siqilgan usulda StudentAnswer qatorlari bo'lmaydi
+        if obj is not None and obj.selections is not None:
+            return []
+        return super().get_inlines(request, obj)
+
+    @admin.display(description="Javoblar")
+    def answers_review(self, obj):
+        if obj.pk is None or not obj.is_completed():
+            return '-'
+        return format_html('<ol>{}</ol>', format_html_join('', '<li>{} &mdash; {} ({} ball)</li>', (
+            (
+                review.question.text[:80],
+                ', '.join(answer.text for answer in review.question.answers if answer.pk in review.selected_ids) or '-',
+                review.points_earned,
+            )
+            for review in review_attempt(obj)
+        )))
+
 
 @admin.register(StudentAnswer)
 class StudentAnswerAdmin(admin.ModelAdmin):
@@ -103,13 +163,69 @@ class StudentAnswerAdmin(admin.ModelAdmin):
     search_fields = ('attempt__student__username', 'question__text')
 
 
+@admin.register(QuizAttemptSummary)
+class QuizAttemptSummaryAdmin(admin.ModelAdmin):
+    list_display = ('student', 'quiz', 'attempts_used', 'best_score', 'is_passed', 'updated_at')
+    list_filter = ('is_passed', 'quiz__course', 'quiz')
+    search_fields = ('student__username', 'student__first_name', 'quiz__title')
+    readonly_fields = ('quiz', 'student', 'attempts_used', 'best_score', 'is_passed', 'ongoing_attempt', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
+
+
+class RegradeChangeInline(admin.TabularInline):
+    model = RegradeChange
+    extra = 0
+    fields = ('student', 'attempt', 'old_score', 'new_score', 'old_passed', 'new_passed')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RegradeRun)
+class RegradeRunAdmin(admin.ModelAdmin):
+    list_display = ('quiz', 'status', 'attempts_total', 'attempts_changed', 'passed_flipped', 'started_by', 'started_at')
+    list_filter = ('status', 'quiz__course')
+    search_fields = ('quiz__title',)
+    readonly_fields = ('quiz', 'started_by', 'status', 'attempts_total', 'attempts_processed', 'attempts_changed',
+                       'passed_flipped', 'error', 'started_at', 'finished_at')
+
+    inlines = [RegradeChangeInline]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(GradingPolicy)
+class GradingPolicyAdmin(admin.ModelAdmin):
+    list_display = ('course', 'quiz_weight', 'assignment_weight', 'attendance_weight',
+                    'grade_a', 'grade_b', 'grade_c', 'grade_d', 'updated_at')
+    search_fields = ('course__name', 'course__code')
+
+    fieldsets = (
+        (None, {
+            'fields': ('course',)
+        }),
+        ('Ulushlar', {
+            'fields': ('quiz_weight', 'assignment_weight', 'attendance_weight')
+        }),
+        ('Harf baho chegaralari', {
+            'fields': ('grade_a', 'grade_b', 'grade_c', 'grade_d')
+        }),
+    )
+
+
 @admin.register(Grade)
 class GradeAdmin(admin.ModelAdmin):
     list_display = ('student', 'course', 'quiz_score', 'attendance_score', 'assignment_score', 'total_score',
                     'letter_grade')
     list_filter = ('letter_grade', 'course')
     search_fields = ('student__username', 'student__first_name', 'course__name')
-    readonly_fields = ('updated_at',)
+    # Topshiriq bali qo'lda kiritiladi, qolganlari hisoblanadi
+    readonly_fields = ('quiz_score', 'attendance_score', 'total_score', 'letter_grade', 'updated_at')
 
     fieldsets = (
         (None, {
@@ -0,0 +1,263 @@
+# apps/assessments/analysis.py
+
+from dataclasses import dataclass
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from .models import Question, Answer, QuizAttempt
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Ogohlantirish chegaralari
+EASY_THRESHOLD = 0.9
+HARD_THRESHOLD = 0.2
+WEAK_DISCRIMINATION = 0.2
+
+
+@dataclass(frozen=True)
+class DistractorStats:
+    """Javob varianti tanlanishi"""
+    pk: int
+    text: str
+    is_correct: bool
+    count: int
+    share: float
+
+    @property
+    def share_percent(self):
+        return round(self.share * 100)
+
+
+@dataclass(frozen=True)
+class ItemStats:
+    """Savol tahlili"""
+    pk: int
+    text: str
+    points: int
+    presented: int
+    difficulty: float
+    discrimination: float
+    distractors: tuple
+
+    @property
+    def difficulty_percent(self):
+        return round(self.difficulty * 100)
+
+    @property
+    def is_too_easy(self):
+        return self.presented > 0 and self.difficulty >= EASY_THRESHOLD
+
+    @property
+    def is_too_hard(self):
+        return self.presented > 0 and self.difficulty <= HARD_THRESHOLD
+
+    @property
+    def is_weak(self):
+        return self.discrimination is not None and self.discrimination < WEAK_DISCRIMINATION
+
+
+@dataclass(frozen=True)
+class QuizAnalysis:
+    """Testning psixometrik tahlili"""
+    quiz_id: int
+    attempts: int
+    alpha: float
+    items: tuple
+
+
+def cache_key(name, quiz, stamp):
+    count, last = stamp
+    return f'assessments:{name}:{quiz.pk}:v{quiz.version}:{count}:{last.timestamp() if last else 0}'
+
+
+def cached_report(name, quiz, build):
+    """Hisobotni keshdan olish (test versiyasi va yakunlangan urinishlar bo'yicha), yo'q bo'lsa hisoblash"""
+    stamp = QuizAttempt.objects.filter(quiz=quiz, completed_at__isnull=False).aggregate(
+        count=Count('pk'),
+        last=Max('completed_at')
+    )
+    key = cache_key(name, quiz, (stamp['count'], stamp['last']))
+    report = cache.get(key)
+    if report is None:
+        report = build(quiz)
+        cache.set(key, report, CACHE_TIMEOUT)
+    return report
+
+
+@dataclass
+class Responses:
+    """Urinishlar javoblari matritsa ko'rinishida"""
+    attempt_ids: np.ndarray
+    student_ids: np.ndarray
+    questions: list
+    answers: list
+    answer_column: np.ndarray
+    answer_key: np.ndarray
+    starts: np.ndarray
+    points: np.ndarray
+    presented: np.ndarray
+    selected: np.ndarray
+
+
+def load_responses(quiz):
+    """Urinishlar x savollar (berilganmi) va urinishlar x javoblar (tanlanganmi) matritsalari
+
+    Tanlangan javoblar urinishning siqilgan `selections` maydonidan, eski usuldagi urinishlar uchun
+    esa bitta so'rovda (urinish - StudentAnswer - tanlangan javob, LEFT JOIN) olinadi.
+    Urinish yoki baholanadigan savol bo'lmasa None qaytadi.
+    """
+    completed = QuizAttempt.objects.filter(quiz=quiz, completed_at__isnull=False)
+    attempts = list(completed.order_by('pk').values_list('pk', 'student_id', 'question_ids', 'selections'))
+    if not attempts:
+        return None
+
+    pooled_ids = {question_id for attempt in attempts for question_id in attempt[2] or ()}
+    questions = list(
+        Question.objects.filter(Q(quiz=quiz) | Q(pk__in=pooled_ids)).order_by('order', 'pk').values_list(
+            'pk', 'text', 'points', 'quiz_id'
+        )
+    )
+    answers = list(
+        Answer.objects.filter(question_id__in=[question[0] for question in questions]).order_by('order', 'pk').values_list(
+            'pk', 'question_id', 'text', 'is_correct'
+        )
+    )
+
+    # Javobsiz savollarni baholab bo'lmaydi
+    answered_questions = {answer[1] for answer in answers}
+    questions = [question for question in questions if question[0] in answered_questions]
+    if not questions:
+        return None
+
+    column = {question[0]: index for index, question in enumerate(questions)}
+    # Javoblar savol ustunlari bo'yicha ketma-ket joylashadi (reduceat uchun)
+    answers.sort(key=lambda answer: column[answer[1]])
+    answer_column = np.array([column[answer[1]] for answer in answers], dtype=np.int64)
+    answer_index = {answer[0]: index for index, answer in enumerate(answers)}
+
+    # Qaysi urinishga qaysi savollar berilgan
+    row = {attempt[0]: index for index, attempt in enumerate(attempts)}
+    own_columns = [column[question[0]] for question in questions if question[3] == quiz.pk]
+    presented = np.zeros((len(attempts), len(questions)), dtype=bool)
+    for index, (attempt_id, student_id, question_ids, stored) in enumerate(attempts):
+        if question_ids:
+            presented[index, [column[pk] for pk in question_ids if pk in column]] = True
+        else:
+            presented[index, own_columns] = True
+
+    selections = [
+        (row[attempt_id], answer_index[answer_id])
+        for attempt_id, student_id, question_ids, stored in attempts
+        for answer_ids in (stored or {}).values()
+        for answer_id in answer_ids
+        if answer_id in answer_index
+    ]
+    if any(attempt[3] is None for attempt in attempts):
+        selections += [
+            (row[attempt_id], answer_index[answer_id])
+            for attempt_id, answer_id in completed.filter(selections__isnull=True).order_by().values_list(
+                'pk', 'student_answers__selected_answers'
+            ).iterator()
+            if answer_id in answer_index
+        ]
+    selected = np.zeros((len(attempts), len(answers)), dtype=bool)
+    if selections:
+        rows, columns = np.array(selections, dtype=np.int64).T
+        selected[rows, columns] = True
+
+    return Responses(
+        attempt_ids=np.array([attempt[0] for attempt in attempts], dtype=np.int64),
+        student_ids=np.array([attempt[1] for attempt in attempts], dtype=np.int64),
+        questions=questions,
+        answers=answers,
+        answer_column=answer_column,
+        answer_key=np.array([answer[3] for answer in answers], dtype=bool),
+        starts=np.searchsorted(answer_column, np.arange(len(questions))),
+        points=np.array([question[2] for question in questions], dtype=float),
+        presented=presented,
+        selected=selected,
+    )
+
+
+def correct_matrix(responses):
+    """Urinish x savol: to'liq to'g'ri belgilangan savol = 1 (score_question bilan bir xil qoida)"""
+    mismatches = np.add.reduceat(
+        (responses.selected != responses.answer_key).astype(np.int64), responses.starts, axis=1
+    )
+    return (mismatches == 0) & responses.presented
+
+
+def analyze(quiz):
+    """Savollar qiyinligi, point-biserial ajratish, variantlar tanlanishi va Kronbax alfasi"""
+    responses = load_responses(quiz)
+    if responses is None:
+        return QuizAnalysis(quiz_id=quiz.pk, attempts=0, alpha=None, items=())
+
+    questions = responses.questions
+    answers = responses.answers
+    answer_column = responses.answer_column
+    starts = responses.starts
+    points = responses.points
+    presented = responses.presented
+    selected = responses.selected
+
+    correct = correct_matrix(responses)
+    item_scores = correct * points
+    earned = item_scores.sum(axis=1)
+
+    shown = presented.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        difficulty = correct.sum(axis=0) / shown
+
+        # Savol va qolgan savollar yig'indisi orasidagi korrelyatsiya (tuzatilgan point-biserial)
+        rest = earned[:, None] - item_scores
+        item_dev = (correct - correct.sum(axis=0) / shown) * presented
+        rest_dev = (rest - (rest * presented).sum(axis=0) / shown) * presented
+        discrimination = (item_dev * rest_dev).sum(axis=0) / np.sqrt(
+            (item_dev ** 2).sum(axis=0) * (rest_dev ** 2).sum(axis=0)
+        )
+
+        counts = selected.sum(axis=0)
+        shares = counts / shown[answer_column]
+
+    # Kronbax alfasi - barcha savollar berilgan urinishlar bo'yicha
+    alpha = None
+    complete = presented.all(axis=1)
+    if len(questions) > 1 and complete.sum() > 1:
+        complete_scores = item_scores[complete]
+        total_variance = complete_scores.sum(axis=1).var(ddof=1)
+        if total_variance > 0:
+            k = len(questions)
+            alpha = float(k / (k - 1) * (1 - complete_scores.var(axis=0, ddof=1).sum() / total_variance))
+
+    def finite(value):
+        return float(value) if np.isfinite(value) else None
+
+    items = tuple(
+        ItemStats(
+            pk=question[0],
+            text=question[1],
+            points=question[2],
+            presented=int(shown[j]),
+            difficulty=finite(difficulty[j]) or 0.0,
+            discrimination=finite(discrimination[j]),
+            distractors=tuple(
+                DistractorStats(
+                    pk=answers[k][0],
+                    text=answers[k][2],
+                    is_correct=answers[k][3],
+                    count=int(counts[k]),
+                    share=finite(shares[k]) or 0.0
+                )
+                for k in range(starts[j], starts[j + 1] if j + 1 < len(questions) else len(answers))
+            )
+        )
+        for j, question in enumerate(questions)
+    )
+    return QuizAnalysis(quiz_id=quiz.pk, attempts=len(responses.attempt_ids), alpha=alpha, items=items)
+
+
+def get_analysis(quiz):
+    return cached_report('item_analysis', quiz, analyze)
@@ -6,3 +6,5 @@ class AssessmentsConfig(AppConfig):
     name = 'apps.assessments'
     verbose_name = 'Baholash'
 
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,31 @@
+# apps/assessments/checks.py
+
+from django.core.checks import Warning, register
+from django.db import connection
+
+from .grading import async_grading, grading_timeout
+
+
+@register()
+def async_grading_check(app_configs, **kwargs):
+    """Navbatli baholash `grade_submissions` ishchisiga bog'liq - zaxira va DB tekshiruvi"""
+    if not async_grading():
+        return []
+
+    errors = []
+    if grading_timeout() <= 0:
+        errors.append(Warning(
+            "ASSESSMENTS_ASYNC_GRADING yoqilgan, ASSESSMENTS_GRADING_TIMEOUT esa 0: "
+            "ishchi ishlamasa urinishlar hech qachon baholanmaydi.",
+            hint="`python manage.py grade_submissions --interval 2` ni doim ishlaydigan jarayon sifatida "
+                 "ishga tushiring yoki ASSESSMENTS_GRADING_TIMEOUT ni 0 dan katta qiling.",
+            id='assessments.W001',
+        ))
+    if not connection.features.has_select_for_update_skip_locked:
+        errors.append(Warning(
+            f"{connection.vendor} SKIP LOCKED ni qo'llamaydi: bir nechta baholash ishchisi bitta "
+            "urinishni ikki marta baholashi mumkin.",
+            hint="Faqat bitta `grade_submissions` ishchisini ishga tushiring.",
+            id='assessments.W002',
+        ))
+    return errors
@@ -0,0 +1,179 @@
+# apps/assessments/compiled.py
+
+import random
+from dataclasses import dataclass, replace
+
+from django.core.cache import cache
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Quiz, Question, QuestionBank
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class CompiledAnswer:
+    """Javob varianti (o'zgarmas nusxa)"""
+    pk: int
+    text: str
+    is_correct: bool
+    html: str
+
+
+@dataclass(frozen=True)
+class CompiledQuestion:
+    """Savol va uning javoblari (o'zgarmas nusxa)"""
+    pk: int
+    question_type: str
+    type_display: str
+    text: str
+    points: int
+    answers: tuple
+    correct_ids: frozenset
+    text_html: str
+
+    def get_question_type_display(self):
+        return self.type_display
+
+    def render(self, answers=None):
+        """Tayyor HTML bo'lagi (javoblar tartibi berilishi mumkin)"""
+        answers = self.answers if answers is None else answers
+        return mark_safe(self.text_html + ''.join(answer.html for answer in answers))
+
+    @property
+    def html(self):
+        return self.render()
+
+
+@dataclass(frozen=True)
+class CompiledQuiz:
+    """Testning kompilyatsiya qilingan, versiyalangan nusxasi"""
+    quiz_id: int
+    version: int
+    questions: tuple
+    total_points: int
+
+    @property
+    def answer_key(self):
+        return {question.pk: question.correct_ids for question in self.questions}
+
+    @property
+    def question_map(self):
+        return {question.pk: question for question in self.questions}
+
+
+def cache_key(quiz_id, version):
+    return f'assessments:compiled_quiz:{quiz_id}:v{version}'
+
+
+def compile_question(question):
+    answers = tuple(
+        CompiledAnswer(
+            pk=answer.pk,
+            text=answer.text,
+            is_correct=answer.is_correct,
+            html=render_to_string('assessments/partials/answer.html', {
+                'question': question,
+                'answer': answer
+            })
+        )
+        for answer in question.answers.all()
+    )
+    return CompiledQuestion(
+        pk=question.pk,
+        question_type=question.question_type,
+        type_display=question.get_question_type_display(),
+        text=question.text,
+        points=question.points,
+        answers=answers,
+        correct_ids=frozenset(answer.pk for answer in answers if answer.is_correct),
+        text_html=render_to_string('assessments/partials/question_text.html', {
+            'question': question
+        })
+    )
+
+
+def compile_questions(quiz, questions):
+    compiled_questions = tuple(compile_question(question) for question in questions)
+    return CompiledQuiz(
+        quiz_id=quiz.pk,
+        version=quiz.version,
+        questions=compiled_questions,
+        total_points=sum(question.points for question in compiled_questions)
+    )
+
+
+def compile_quiz(quiz):
+    """Savollar va javoblarni ikki so'rovda yuklab, HTML bo'laklarini tayyorlash"""
+    questions = Question.objects.filter(quiz_id=quiz.pk).prefetch_related('answers').order_by('order', 'pk')
+    return compile_questions(quiz, questions)
+
+
+def get_compiled_quiz(quiz):
+    """Keshdan olish, yo'q bo'lsa kompilyatsiya qilib saqlash"""
+    key = cache_key(quiz.pk, quiz.version)
+    compiled = cache.get(key)
+    if compiled is None:
+        compiled = compile_quiz(quiz)
+        cache.set(key, compiled, CACHE_TIMEOUT)
+    return compiled
+
+
+def get_compiled_attempt(attempt):
+    """Urinish tarkibi: odatda test nusxasi, bank savollari bo'lsa urinishga xos nusxa"""
+    quiz = attempt.quiz
+    if not attempt.question_ids:
+        return get_compiled_quiz(quiz)
+
+    # Moslashuvchan testda tarkib savol berilgan sari o'sadi
+    key = f'assessments:compiled_attempt:{attempt.pk}:v{quiz.version}:{len(attempt.question_ids)}'
+    compiled = cache.get(key)
+    if compiled is None:
+        questions = Question.objects.filter(pk__in=attempt.question_ids).prefetch_related('answers')
+        position = {question_id: index for index, question_id in enumerate(attempt.question_ids)}
+        compiled = compile_questions(quiz, sorted(questions, key=lambda question: position[question.pk]))
+        cache.set(key, compiled, CACHE_TIMEOUT)
+    return compiled
+
+
+def invalidate_quiz(quiz_id):
+    """Versiyani oshirish - eski nusxa endi ishlatilmaydi"""
+    Quiz.objects.filter(pk=quiz_id).update(version=F('version') + 1)
+
+
+def invalidate_bank(bank_id):
+    """Bank va undan savol oladigan testlar versiyasini oshirish"""
+    QuestionBank.objects.filter(pk=bank_id).update(version=F('version') + 1)
+    Quiz.objects.filter(pool_rules__bank_id=bank_id).update(version=F('version') + 1)
+
+
+def invalidate_question(question_id):
+    Quiz.objects.filter(questions__pk=question_id).update(version=F('version') + 1)
+    QuestionBank.objects.filter(questions__pk=question_id).update(version=F('version') + 1)
+    Quiz.objects.filter(pool_rules__bank__questions__pk=question_id).update(version=F('version') + 1)
+
+
+def attempt_questions(compiled, attempt):
+    """Urinish uchun savollar tartibi (seed asosida, har safar bir xil)"""
+    quiz = attempt.quiz
+    questions = list(compiled.questions)
+    if not (quiz.shuffle_questions or quiz.shuffle_answers):
+        return questions
+
+    seed = attempt.shuffle_seed if attempt.shuffle_seed is not None else attempt.pk
+
+    if quiz.shuffle_questions:
+        random.Random(seed).shuffle(questions)
+
+    if quiz.shuffle_answers:
+        shuffled = []
+        for question in questions:
+            answers = list(question.answers)
+            # Har bir savol o'z seed'i bilan - boshqa savollar o'zgarsa ham tartib saqlanadi
+            random.Random(f'{seed}:{question.pk}').shuffle(answers)
+            shuffled.append(replace(question, answers=tuple(answers)))
+        questions = shuffled
+
+    return questions
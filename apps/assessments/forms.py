@@ -2,6 +2,7 @@
 
 from django import forms
 from .models import Quiz, Question, Answer
+from .importers import FORMAT_CHOICES
 
 
 class QuizForm(forms.ModelForm):
@@ -12,7 +13,8 @@ class QuizForm(forms.ModelForm):
         fields = (
             'title', 'description', 'time_limit_minutes',
             'passing_score', 'attempts_allowed', 'shuffle_questions',
-            'show_correct_answers', 'available_from', 'available_until', 'is_active'
+            'shuffle_answers', 'show_correct_answers', 'is_adaptive', 'adaptive_max_questions',
+            'adaptive_target_se', 'available_from', 'available_until', 'is_active'
         )
         widgets = {
             'title': forms.TextInput(attrs={
@@ -41,9 +43,26 @@ class QuizForm(forms.ModelForm):
             'shuffle_questions': forms.CheckboxInput(attrs={
                 'class': 'form-check-input'
             }),
+            'shuffle_answers': forms.CheckboxInput(attrs={
+                'class': 'form-check-input'
+            }),
             'show_correct_answers': forms.CheckboxInput(attrs={
                 'class': 'form-check-input'
             }),
+            'is_adaptive': forms.CheckboxInput(attrs={
+                'class': 'form-check-input'
+            }),
+            'adaptive_max_questions': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': 1
+            }),
+            'adaptive_target_se': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': 0.1,
+                'max': 1,
+                'step': 0.05,
+                'placeholder': 'Masalan: 0.35'
+            }),
             'available_from': forms.DateTimeInput(attrs={
                 'class': 'form-control',
                 'type': 'datetime-local'
@@ -63,11 +82,18 @@ class QuestionForm(forms.ModelForm):
 
     class Meta:
         model = Question
-        fields = ('question_type', 'text', 'points', 'order')
+        fields = ('question_type', 'text', 'points', 'order', 'difficulty', 'tags')
         widgets = {
             'question_type': forms.Select(attrs={
                 'class': 'form-select'
             }),
+            'difficulty': forms.Select(attrs={
+                'class': 'form-select'
+            }),
+            'tags': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Masalan: algebra, tenglamalar'
+            }),
             'text': forms.Textarea(attrs={
                 'class': 'form-control',
                 'rows': 3,
@@ -117,6 +143,32 @@ AnswerFormSet = forms.inlineformset_factory(
 )
 
 
+class QuestionImportForm(forms.Form):
+    """Savollarni fayldan import qilish formasi"""
+    file = forms.FileField(
+        label="Fayl",
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.txt,.gift,.csv,.aiken'
+        })
+    )
+    format = forms.ChoiceField(
+        label="Format",
+        choices=(('', 'Fayl kengaytmasidan'),) + FORMAT_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={
+            'class': 'form-select'
+        })
+    )
+    skip_invalid = forms.BooleanField(
+        label="Xatoli savollarni o'tkazib yuborish",
+        required=False,
+        widget=forms.CheckboxInput(attrs={
+            'class': 'form-check-input'
+        })
+    )
+
+
 class QuizTakeForm(forms.Form):
     """Test topshirish formasi - dinamik yaratiladi"""
 
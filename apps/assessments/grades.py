@@ -0,0 +1,129 @@
+# apps/assessments/grades.py
+
+from django.db import transaction
+from django.db.models import (
+    Avg, Case, DecimalField, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.lookups import GreaterThanOrEqual
+
+from apps.courses.models import Enrollment
+from apps.attendance.models import AttendanceSummary
+from .models import Quiz, QuizAttempt, GradingPolicy, Grade
+
+SCORE_FIELD = DecimalField(max_digits=5, decimal_places=2)
+
+
+def policy_value(field):
+    """Baho qatori kursining siyosat qiymati (siyosat bo'lmasa standart)"""
+    default = GradingPolicy._meta.get_field(field).default
+    return Coalesce(
+        Subquery(GradingPolicy.objects.filter(course=OuterRef('course_id')).values(field)[:1]),
+        Value(default)
+    )
+
+
+def quiz_score_subquery():
+    """Talabaning kursdagi yakunlangan urinishlari o'rtacha bali"""
+    average = QuizAttempt.objects.filter(
+        student=OuterRef('student_id'),
+        quiz__course=OuterRef('course_id'),
+        completed_at__isnull=False
+    ).order_by().values('student').annotate(avg=Avg('score')).values('avg')[:1]
+    return Cast(Coalesce(Subquery(average, output_field=FloatField()), Value(0.0)), SCORE_FIELD)
+
+
+def attendance_score_subquery():
+    """Qatnashilgan sessiyalar ulushi - talabaning kurs davomati xulosasidan (belgilanmagan - qatnashmagan)"""
+    percentage = AttendanceSummary.objects.filter(
+        student=OuterRef('student_id'),
+        course=OuterRef('course_id')
+    ).annotate(
+        percentage=ExpressionWrapper(
+            (F('present_count') + F('late_count') + F('excused_count')) * 100.0 /
+            NullIf(F('total_sessions'), Value(0)),
+            output_field=FloatField()
+        )
+    ).values('percentage')[:1]
+    return Cast(Coalesce(Subquery(percentage, output_field=FloatField()), Value(0.0)), SCORE_FIELD)
+
+
+def total_expression():
+    total = (
+        Cast('quiz_score', FloatField()) * policy_value('quiz_weight') +
+        Cast('assignment_score', FloatField()) * policy_value('assignment_weight') +
+        Cast('attendance_score', FloatField()) * policy_value('attendance_weight')
+    ) / 100.0
+    return ExpressionWrapper(total, output_field=FloatField())
+
+
+def letter_expression(total):
+    return Case(
+        When(GreaterThanOrEqual(total, policy_value('grade_a')), then=Value('A')),
+        When(GreaterThanOrEqual(total, policy_value('grade_b')), then=Value('B')),
+        When(GreaterThanOrEqual(total, policy_value('grade_c')), then=Value('C')),
+        When(GreaterThanOrEqual(total, policy_value('grade_d')), then=Value('D')),
+        default=Value('F')
+    )
+
+
+# ===================== QAYTA HISOBLASH =====================
+
+def ensure_grades(enrollments):
+    """Yozilishlar uchun yetishmayotgan baho qatorlarini yaratish"""
+    pairs = enrollments.order_by().values_list('student_id', 'course_id')
+    Grade.objects.bulk_create(
+        [Grade(student_id=student_id, course_id=course_id) for student_id, course_id in pairs.iterator()],
+        ignore_conflicts=True,
+        batch_size=500
+    )
+
+
+def recompute_grades(grades):
+    """Baho qatorlarini ikki UPDATE bilan qayta hisoblash (qatorlar soniga bog'liq emas)"""
+    with transaction.atomic():
+        updated = grades.update(
+            quiz_score=quiz_score_subquery(),
+            attendance_score=attendance_score_subquery(),
+        )
+        total = total_expression()
+        grades.update(
+            total_score=Cast(total, SCORE_FIELD),
+            letter_grade=letter_expression(total),
+        )
+    return updated
+
+
+def refresh_grades(pairs, create=True):
+    """(talaba_id, kurs_id) juftliklari baholarini yangilash
+
+    `create=False` - faqat mavjud qatorlar (o'chirish signallarida yangi qator yaratilmaydi).
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+
+    student_ids = {student_id for student_id, course_id in pairs}
+    course_ids = {course_id for student_id, course_id in pairs}
+    with transaction.atomic():
+        if create:
+            ensure_grades(Enrollment.objects.filter(student_id__in=student_ids, course_id__in=course_ids))
+        return recompute_grades(Grade.objects.filter(student_id__in=student_ids, course_id__in=course_ids))
+
+
+def refresh_grades_for_attempts(attempts, create=True):
+    attempts = list(attempts)
+    courses = dict(
+        Quiz.objects.filter(pk__in={attempt.quiz_id for attempt in attempts}).values_list('pk', 'course_id')
+    )
+    return refresh_grades(
+        [(attempt.student_id, courses[attempt.quiz_id]) for attempt in attempts if attempt.quiz_id in courses],
+        create=create
+    )
+
+
+def refresh_course_grades(course_ids):
+    """Kurslardagi barcha baholarni qayta hisoblash"""
+    with transaction.atomic():
+        ensure_grades(Enrollment.objects.filter(course_id__in=course_ids))
+        return recompute_grades(Grade.objects.filter(course_id__in=course_ids))
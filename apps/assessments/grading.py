@@ -0,0 +1,226 @@
+# apps/assessments/grading.py
+
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QuizAttempt, StudentAnswer
+from .compiled import get_compiled_quiz, get_compiled_attempt
+from .summaries import refresh_for_attempts
+from .grades import refresh_grades_for_attempts
+from .irt import adaptive_score
+from . import live
+
+ATTEMPT_SCORE_FIELDS = [
+    'points_possible', 'points_earned', 'score', 'is_passed', 'completed_at', 'graded_at', 'results'
+]
+
+# Tanlangan javoblarni saqlash usullari
+COMPACT = 'compact'
+ROWS = 'rows'
+
+
+def selection_storage():
+    """Yangi yakunlangan urinishlar uchun saqlash usuli (ASSESSMENTS_SELECTION_STORAGE)"""
+    return getattr(settings, 'ASSESSMENTS_SELECTION_STORAGE', ROWS)
+
+
+def async_grading():
+    """Yuborilgan urinishlar navbat orqali baholanadimi (ASSESSMENTS_ASYNC_GRADING)"""
+    return getattr(settings, 'ASSESSMENTS_ASYNC_GRADING', False)
+
+
+def grading_timeout():
+    """Ishchi shuncha soniyada olmagan urinish so'rov ichida baholanadi (ASSESSMENTS_GRADING_TIMEOUT, 0 - hech qachon)"""
+    return getattr(settings, 'ASSESSMENTS_GRADING_TIMEOUT', 30)
+
+
+# ===================== JAVOBLARNI SAQLASH =====================
+
+def encode_selections(selections):
+    """{savol_id: {javob_id}} -> {"savol_id": [javob_id, ...]} (urinishda saqlanadigan shakl)"""
+    return {str(question_id): sorted(ids) for question_id, ids in selections.items()}
+
+
+def decode_selections(stored):
+    return {int(question_id): set(ids) for question_id, ids in (stored or {}).items()}
+
+
+def pack_results(attempt, results):
+    """Siqilgan usulda savollar natijasi ham urinishga yoziladi (eski usulda StudentAnswer qatorlarida)"""
+    if attempt.selections is None:
+        attempt.results = None
+    else:
+        attempt.results = {str(question_id): [is_correct, points] for question_id, (is_correct, points) in results.items()}
+
+
+def load_selections(attempts):
+    """Urinishlarning tanlangan javoblari: {urinish_id: {savol_id: {javob_id}}} va eski usuldagi qatorlar
+
+    Siqilgan shakldagi urinishlar so'rovsiz o'qiladi; `selections` bo'sh (None) bo'lganlar
+    uchun StudentAnswer va M2M jadvalidan 2 so'rov. Qatorlar {(urinish_id, savol_id): StudentAnswer}.
+    """
+    selections = {}
+    legacy_ids = []
+    for attempt in attempts:
+        if attempt.selections is None:
+            legacy_ids.append(attempt.pk)
+            selections[attempt.pk] = {}
+        else:
+            selections[attempt.pk] = decode_selections(attempt.selections)
+
+    rows = {}
+    if legacy_ids:
+        student_answers = StudentAnswer.objects.filter(attempt_id__in=legacy_ids).only(
+            'pk', 'attempt_id', 'question_id', 'is_correct', 'points_earned'
+        )
+        selected = defaultdict(set)
+        through = StudentAnswer.selected_answers.through
+        through_rows = through.objects.filter(
+            studentanswer__attempt_id__in=legacy_ids
+        ).values_list('studentanswer_id', 'answer_id')
+        for student_answer_id, answer_id in through_rows:
+            selected[student_answer_id].add(answer_id)
+
+        for student_answer in student_answers:
+            selections[student_answer.attempt_id][student_answer.question_id] = selected.get(student_answer.pk, set())
+            rows[student_answer.attempt_id, student_answer.question_id] = student_answer
+
+    return selections, rows
+
+
+# ===================== BAHOLASH =====================
+
+def score_question(question, selected_ids):
+    """Savol to'liq to'g'ri belgilangandagina ball beriladi"""
+    if question.correct_ids == frozenset(selected_ids):
+        return True, question.points
+    return False, 0
+
+
+def score_attempt(attempt, compiled, selections):
+    """Urinishni xotirada baholash
+
+    `selections` - {savol_id: tanlangan javob id lari}.
+    Savollar natijasi {savol_id: (to'g'rimi, ball)} qaytariladi.
+    """
+    results = {}
+    questions = compiled.question_map
+    total_points = 0
+    earned_points = 0
+
+    for question_id, selected_ids in selections.items():
+        question = questions.get(question_id)
+        if question is None:
+            continue
+
+        is_correct, points = score_question(question, selected_ids)
+        total_points += question.points
+        earned_points += points
+        results[question_id] = (is_correct, points)
+
+    attempt.points_possible = total_points
+    attempt.points_earned = earned_points
+    if attempt.quiz.is_adaptive:
+        # Moslashuvchan testda to'g'ri javoblar ulushi emas, qobiliyat bahosi bo'yicha
+        attempt.score = adaptive_score(attempt.quiz, {
+            question_id: is_correct for question_id, (is_correct, _) in results.items()
+        })
+    else:
+        attempt.score = int((earned_points / total_points) * 100) if total_points > 0 else 0
+    attempt.is_passed = attempt.score >= attempt.quiz.passing_score
+    attempt.graded_at = timezone.now()
+    return results
+
+
+def compiled_for_attempts(attempts):
+    """{urinish_id: kompilyatsiya qilingan nusxa}; test nusxasi har test uchun bir marta olinadi"""
+    compiled_quizzes = {}
+    compiled = {}
+    for attempt in attempts:
+        if attempt.question_ids:
+            # Banklardan tanlangan savollar - urinishga xos nusxa
+            compiled[attempt.pk] = get_compiled_attempt(attempt)
+        else:
+            if attempt.quiz_id not in compiled_quizzes:
+                compiled_quizzes[attempt.quiz_id] = get_compiled_quiz(attempt.quiz)
+            compiled[attempt.pk] = compiled_quizzes[attempt.quiz_id]
+    return compiled
+
+
+def grade_attempts(attempts, completed_at=None):
+    """Urinishlarni bir necha so'rovda baholash (savollar soniga bog'liq emas)
+
+    `completed_at` berilsa, tugatilmagan urinishlar shu vaqt bilan yopiladi.
+    """
+    attempts = list(attempts)
+    if not attempts:
+        return attempts
+
+    selections, rows = load_selections(attempts)
+    compiled = compiled_for_attempts(attempts)
+    newly_graded = [attempt for attempt in attempts if attempt.graded_at is None]
+    changed_answers = []
+    for attempt in attempts:
+        results = score_attempt(attempt, compiled[attempt.pk], selections[attempt.pk])
+        pack_results(attempt, results)
+        if completed_at is not None and attempt.completed_at is None:
+            attempt.completed_at = completed_at
+
+        # Eski usuldagi qatorlarda savol natijasi ham saqlanadi
+        for question_id, (is_correct, points) in results.items():
+            student_answer = rows.get((attempt.pk, question_id))
+            if student_answer is not None and (student_answer.is_correct, student_answer.points_earned) != (is_correct, points):
+                student_answer.is_correct = is_correct
+                student_answer.points_earned = points
+                changed_answers.append(student_answer)
+
+    with transaction.atomic():
+        StudentAnswer.objects.bulk_update(changed_answers, ['is_correct', 'points_earned'], batch_size=500)
+        QuizAttempt.objects.bulk_update(attempts, ATTEMPT_SCORE_FIELDS, batch_size=500)
+        refresh_for_attempts(attempts)
+        refresh_grades_for_attempts(attempts)
+        transaction.on_commit(lambda: live.record_attempts(newly_graded, graded=True))
+    return attempts
+
+
+# ===================== NATIJANI KO'RISH =====================
+
+@dataclass(frozen=True)
+class AnswerReview:
+    """Natija sahifasi uchun bitta savol: savol nusxasi, tanlangan javoblar va natija"""
+    question: object
+    selected_ids: frozenset
+    is_correct: bool
+    points_earned: int
+
+
+def review_attempt(attempt):
+    """Urinishning javob berilgan savollari test tartibida (saqlash usulidan qat'i nazar)
+
+    Savol natijasi baholangandagi holicha olinadi: eski usulda qatorlardan, siqilgan usulda
+    urinishning `results` maydonidan. Natijasi saqlanmagan (maydon qo'shilishidan oldin
+    siqilgan) urinishlarda joriy kalit bo'yicha hisoblanadi.
+    """
+    compiled = get_compiled_attempt(attempt)
+    selections, rows = load_selections([attempt])
+    attempt_selections = selections[attempt.pk]
+    stored = attempt.results or {}
+
+    reviews = []
+    for question in compiled.questions:
+        if question.pk not in attempt_selections:
+            continue
+        selected_ids = frozenset(attempt_selections[question.pk])
+        student_answer = rows.get((attempt.pk, question.pk))
+        if student_answer is not None:
+            is_correct, points = student_answer.is_correct, student_answer.points_earned
+        elif str(question.pk) in stored:
+            is_correct, points = stored[str(question.pk)]
+        else:
+            is_correct, points = score_question(question, selected_ids)
+        reviews.append(AnswerReview(question, selected_ids, is_correct, points))
+    return reviews
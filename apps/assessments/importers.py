@@ -0,0 +1,444 @@
+# apps/assessments/importers.py
+
+import csv
+import os
+import re
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Max
+
+from .models import Question, Answer
+from .compiled import invalidate_quiz, invalidate_bank
+from .services import recount_quiz_counters
+
+AIKEN = 'aiken'
+GIFT = 'gift'
+CSV = 'csv'
+FORMAT_CHOICES = (
+    (AIKEN, 'Aiken'),
+    (GIFT, 'GIFT (Moodle)'),
+    (CSV, 'CSV'),
+)
+EXTENSIONS = {'.gift': GIFT, '.csv': CSV, '.txt': AIKEN, '.aiken': AIKEN}
+
+# Savollar shu o'lchamdagi guruhlar bilan yoziladi (xotirada butun fayl saqlanmaydi)
+BATCH_SIZE = 500
+ANSWER_MAX_LENGTH = Answer._meta.get_field('text').max_length
+TAGS_MAX_LENGTH = Question._meta.get_field('tags').max_length
+
+TRUE_FALSE_ANSWERS = ("To'g'ri", "Noto'g'ri")
+# Sahifada ko'rsatiladigan xatolar soni
+ERRORS_SHOWN = 100
+
+
+@dataclass
+class ParsedQuestion:
+    """Fayldan o'qilgan savol (hali tekshirilmagan)"""
+    line: int
+    text: str
+    # [(matn, to'g'rimi), ...]
+    answers: list
+    question_type: str = ''
+    points: object = 1
+    difficulty: str = ''
+    tags: str = ''
+
+
+@dataclass(frozen=True)
+class LineError:
+    """Fayldagi xato: qator raqami va izoh"""
+    line: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    """Import natijasi: to'g'ri savollar soni, qatorlar bo'yicha xatolar va saqlandimi"""
+    valid: int = 0
+    errors: list = field(default_factory=list)
+    saved: bool = False
+
+    @property
+    def has_errors(self):
+        return bool(self.errors)
+
+
+def detect_format(filename, default=AIKEN):
+    """Fayl kengaytmasidan format (noma'lum bo'lsa `default`)"""
+    return EXTENSIONS.get(os.path.splitext(filename or '')[1].lower(), default)
+
+
+# ===================== AIKEN =====================
+
+AIKEN_OPTION = re.compile(r'^([A-Z])[.)]\s*(.+)$')
+AIKEN_ANSWER = re.compile(r'^ANSWER:\s*(.*)$', re.IGNORECASE)
+
+
+def parse_aiken(lines):
+    """Aiken: savol matni, "A) variant" qatorlari va "ANSWER: B" (faqat bitta to'g'ri javob)
+
+    Savollar ketma-ket o'qiladi; xato blok keyingi ANSWER yoki bo'sh qatorgacha o'tkazib yuboriladi.
+    """
+    text, options, start, skipping = [], [], None, False
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if skipping:
+            if not line or AIKEN_ANSWER.match(line):
+                skipping = False
+            continue
+        if not line:
+            continue
+
+        if start is None:
+            start = number
+
+        answer = AIKEN_ANSWER.match(line)
+        option = AIKEN_OPTION.match(line)
+        if answer:
+            letters = [letter for letter, _ in options]
+            letter = answer.group(1).strip().upper()
+            if not options:
+                yield LineError(number, "ANSWER qatoridan oldin variantlar yo'q")
+            elif letter not in letters:
+                yield LineError(number, f"To'g'ri javob harfi variantlarda yo'q: {answer.group(1).strip()}")
+            else:
+                yield ParsedQuestion(
+                    line=start,
+                    text='\n'.join(text),
+                    answers=[(option_text, option_letter == letter) for option_letter, option_text in options],
+                    question_type=Question.Type.SINGLE
+                )
+            text, options, start = [], [], None
+        elif option and text:
+            options.append((option.group(1), option.group(2).strip()))
+        elif options:
+            yield LineError(number, "Variant yoki ANSWER qatori kutilgan edi")
+            text, options, start, skipping = [], [], None, True
+        else:
+            text.append(line)
+
+    if start is not None:
+        yield LineError(start, "Savol ANSWER qatorisiz tugadi")
+
+
+# ===================== GIFT =====================
+
+GIFT_SPECIAL = '~=#{}:'
+GIFT_FORMAT = re.compile(r'^\[(html|moodle|plain|markdown)\]', re.IGNORECASE)
+GIFT_WEIGHT = re.compile(r'^%(-?\d+(?:\.\d+)?)%')
+
+
+def unescaped(text, chars):
+    """`text` dagi `chars` belgilarining (\\ bilan ekranlanmagan) o'rinlari"""
+    positions = []
+    index = 0
+    while index < len(text):
+        if text[index] == '\\':
+            index += 2
+            continue
+        if text[index] in chars:
+            positions.append(index)
+        index += 1
+    return positions
+
+
+def gift_unescape(text):
+    text = text.replace('\\n', '\n')
+    for char in GIFT_SPECIAL:
+        text = text.replace('\\' + char, char)
+    return text.strip()
+
+
+def parse_gift_answers(body):
+    """GIFT javoblar bloki: [(matn, to'g'rimi)] va ko'p tanlovmi"""
+    feedback = unescaped(body, '#')
+    head = (body[:feedback[0]] if feedback else body).strip().upper()
+    if head in ('T', 'TRUE', 'F', 'FALSE'):
+        is_true = head.startswith('T')
+        return [(TRUE_FALSE_ANSWERS[0], is_true), (TRUE_FALSE_ANSWERS[1], not is_true)], Question.Type.TRUE_FALSE
+
+    if body.lstrip().startswith('#'):
+        raise ValueError("Sonli javobli savollar qo'llab-quvvatlanmaydi")
+    if '->' in body:
+        raise ValueError("Moslashtirish savollari qo'llab-quvvatlanmaydi")
+
+    markers = unescaped(body, '~=')
+    if not markers or body[:markers[0]].strip():
+        raise ValueError("Javoblar = yoki ~ bilan boshlanishi kerak")
+
+    answers = []
+    weighted = False
+    for position, end in zip(markers, markers[1:] + [len(body)]):
+        chunk = body[position + 1:end]
+        # Izoh (#...) javob matniga kirmaydi
+        feedback = unescaped(chunk, '#')
+        if feedback:
+            chunk = chunk[:feedback[0]]
+
+        is_correct = body[position] == '='
+        weight = GIFT_WEIGHT.match(chunk.strip())
+        if weight:
+            weighted = True
+            is_correct = float(weight.group(1)) > 0
+            chunk = chunk.strip()[weight.end():]
+        answers.append((gift_unescape(chunk), is_correct))
+
+    if not any(not is_correct for _, is_correct in answers) and not weighted:
+        raise ValueError("Qisqa javobli savollar qo'llab-quvvatlanmaydi (noto'g'ri variantlar yo'q)")
+
+    correct_count = sum(1 for _, is_correct in answers if is_correct)
+    question_type = Question.Type.MULTIPLE if weighted or correct_count > 1 else Question.Type.SINGLE
+    return answers, question_type
+
+
+def parse_gift_block(block, start, category):
+    source = block.strip()
+    if source.startswith('::'):
+        title_end = source.find('::', 2)
+        if title_end == -1:
+            raise ValueError("Sarlavha :: bilan yopilmagan")
+        source = source[title_end + 2:].strip()
+    source = GIFT_FORMAT.sub('', source).strip()
+
+    braces = unescaped(source, '{}')
+    if len(braces) != 2 or source[braces[0]] != '{' or source[braces[1]] != '}':
+        raise ValueError("Javoblar bloki { ... } topilmadi")
+
+    before, body, after = source[:braces[0]], source[braces[0] + 1:braces[1]], source[braces[1] + 1:]
+    # Matn ichidagi bo'shliq ("... {~a =b} ...") chiziqcha bilan ko'rsatiladi
+    text = gift_unescape(before.rstrip() + (' _____ ' + after.lstrip() if after.strip() else ''))
+    answers, question_type = parse_gift_answers(body)
+    return ParsedQuestion(
+        line=start,
+        text=text,
+        answers=answers,
+        question_type=question_type,
+        tags=category
+    )
+
+
+def parse_gift(lines):
+    """GIFT: bo'sh qator bilan ajratilgan savollar, // izohlar va $CATEGORY (teg sifatida)"""
+    block, start, category = [], None, ''
+
+    def flush():
+        try:
+            return parse_gift_block('\n'.join(block), start, category)
+        except ValueError as exc:
+            return LineError(start, str(exc))
+
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if stripped.startswith('//'):
+            continue
+        if stripped.startswith('$CATEGORY:'):
+            category = stripped[len('$CATEGORY:'):].strip().split('/')[-1].strip('$ ')
+            continue
+        if not stripped:
+            if block:
+                yield flush()
+                block, start = [], None
+            continue
+
+        if start is None:
+            start = number
+        block.append(stripped)
+
+    if block:
+        yield flush()
+
+
+# ===================== CSV =====================
+
+CSV_LETTERS = 'ABCDEFGHIJ'
+
+
+def parse_csv(lines):
+    """CSV: sarlavha qatori bilan; question, answer_1..answer_N, correct (majburiy),
+    type, points, difficulty, tags (ixtiyoriy). correct - "2", "1;3" yoki "B", "A,C"."""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        yield LineError(1, "Fayl bo'sh")
+        return
+
+    columns = {name.strip().lower(): index for index, name in enumerate(header)}
+    missing = [name for name in ('question', 'correct') if name not in columns]
+    answer_columns = sorted(
+        (int(name[len('answer_'):]), index)
+        for name, index in columns.items()
+        if name.startswith('answer_') and name[len('answer_'):].isdigit()
+    )
+    if missing or not answer_columns:
+        missing += [] if answer_columns else ['answer_1']
+        yield LineError(1, f"Sarlavhada ustunlar yo'q: {', '.join(missing)}")
+        return
+
+    def value(row, name):
+        index = columns.get(name)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    last_line = reader.line_num
+    for row in reader:
+        # Ko'p qatorli katakda xato yozuv boshlangan qatorga ko'rsatiladi
+        number, last_line = last_line + 1, reader.line_num
+        if not any(cell.strip() for cell in row):
+            continue
+
+        options = [row[index].strip() if index < len(row) else '' for _, index in answer_columns]
+        while options and not options[-1]:
+            options.pop()
+
+        correct = set()
+        invalid = []
+        for token in re.split(r'[;,\s]+', value(row, 'correct')):
+            if not token:
+                continue
+            if token.isdigit():
+                correct.add(int(token) - 1)
+            elif len(token) == 1 and token.upper() in CSV_LETTERS:
+                correct.add(CSV_LETTERS.index(token.upper()))
+            else:
+                invalid.append(token)
+        if invalid or any(index >= len(options) or index < 0 for index in correct):
+            yield LineError(number, f"To'g'ri javob ko'rsatkichi noto'g'ri: {value(row, 'correct')}")
+            continue
+
+        yield ParsedQuestion(
+            line=number,
+            text=value(row, 'question'),
+            answers=[(option, index in correct) for index, option in enumerate(options)],
+            question_type=value(row, 'type').lower(),
+            points=value(row, 'points') or 1,
+            difficulty=value(row, 'difficulty').lower(),
+            tags=value(row, 'tags')
+        )
+
+
+PARSERS = {AIKEN: parse_aiken, GIFT: parse_gift, CSV: parse_csv}
+
+
+# ===================== TEKSHIRISH VA YOZISH =====================
+
+DIFFICULTY_ALIASES = {
+    **{value: value for value in Question.Difficulty.values},
+    **{label.lower(): value for value, label in Question.Difficulty.choices},
+}
+
+
+def validate(parsed):
+    """Savolni model qoidalari bo'yicha tekshirish va to'ldirish; xatolar ro'yxati qaytadi"""
+    errors = []
+    parsed.text = parsed.text.strip()
+    if not parsed.text:
+        errors.append("Savol matni bo'sh")
+
+    if len(parsed.answers) < 2:
+        errors.append("Kamida 2 ta javob varianti kerak")
+    if any(not text for text, _ in parsed.answers):
+        errors.append("Bo'sh javob varianti")
+    if any(len(text) > ANSWER_MAX_LENGTH for text, _ in parsed.answers):
+        errors.append(f"Javob matni {ANSWER_MAX_LENGTH} belgidan uzun")
+
+    correct_count = sum(1 for _, is_correct in parsed.answers if is_correct)
+    if not correct_count:
+        errors.append("To'g'ri javob belgilanmagan")
+
+    if not parsed.question_type:
+        parsed.question_type = Question.Type.MULTIPLE if correct_count > 1 else Question.Type.SINGLE
+    if parsed.question_type not in Question.Type.values:
+        errors.append(f"Noma'lum savol turi: {parsed.question_type}")
+    elif parsed.question_type != Question.Type.MULTIPLE and correct_count > 1:
+        errors.append("Bitta to'g'ri javobli savolda bir nechta to'g'ri javob")
+    elif parsed.question_type == Question.Type.TRUE_FALSE and len(parsed.answers) != 2:
+        errors.append("To'g'ri/Noto'g'ri savolida 2 ta variant bo'lishi kerak")
+
+    try:
+        parsed.points = int(parsed.points)
+        if parsed.points < 1:
+            raise ValueError
+    except (TypeError, ValueError):
+        errors.append(f"Ball musbat butun son bo'lishi kerak: {parsed.points}")
+
+    difficulty = DIFFICULTY_ALIASES.get(parsed.difficulty or Question.Difficulty.MEDIUM)
+    if difficulty is None:
+        errors.append(f"Noma'lum qiyinlik: {parsed.difficulty}")
+    parsed.difficulty = difficulty
+
+    if len(parsed.tags) > TAGS_MAX_LENGTH:
+        errors.append(f"Teglar {TAGS_MAX_LENGTH} belgidan uzun")
+    return errors
+
+
+def write_batch(batch, quiz, bank, order):
+    """Savollar va javoblarni ikki bulk_create bilan yozish (signallarsiz)"""
+    questions = Question.objects.bulk_create([
+        Question(
+            quiz=quiz,
+            bank=bank,
+            text=parsed.text,
+            question_type=parsed.question_type,
+            points=parsed.points,
+            difficulty=parsed.difficulty,
+            tags=parsed.tags,
+            order=order + index
+        )
+        for index, parsed in enumerate(batch)
+    ])
+    Answer.objects.bulk_create([
+        Answer(question=question, text=text, is_correct=is_correct, order=index)
+        for question, parsed in zip(questions, batch)
+        for index, (text, is_correct) in enumerate(parsed.answers)
+    ], batch_size=BATCH_SIZE)
+    return len(questions)
+
+
+def import_questions(lines, format, quiz=None, bank=None, skip_invalid=False, dry_run=False):
+    """Fayl qatorlaridan savollarni testga yoki bankka import qilish (bitta tranzaksiyada)
+
+    Qatorlar oqim sifatida o'qiladi, savollar BATCH_SIZE tadan yoziladi. Xato bo'lsa hech narsa
+    saqlanmaydi (`skip_invalid` - xatoli savollar o'tkazib yuboriladi). `dry_run` - faqat tekshirish.
+    """
+    report = ImportReport()
+    order = 0
+    if quiz is not None:
+        last_order = quiz.questions.aggregate(last=Max('order'))['last']
+        order = 0 if last_order is None else last_order + 1
+
+    with transaction.atomic():
+        batch = []
+        for parsed in PARSERS[format](lines):
+            if isinstance(parsed, LineError):
+                report.errors.append(parsed)
+                continue
+
+            errors = validate(parsed)
+            if errors:
+                report.errors.extend(LineError(parsed.line, message) for message in errors)
+                continue
+
+            batch.append(parsed)
+            if len(batch) >= BATCH_SIZE:
+                if not dry_run and (skip_invalid or not report.errors):
+                    write_batch(batch, quiz, bank, order + report.valid)
+                report.valid += len(batch)
+                batch = []
+
+        if batch and not dry_run and (skip_invalid or not report.errors):
+            write_batch(batch, quiz, bank, order + report.valid)
+        report.valid += len(batch)
+
+        if dry_run or not report.valid or (report.errors and not skip_invalid):
+            transaction.set_rollback(True)
+            return report
+
+        if quiz is not None:
+            recount_quiz_counters([quiz.pk])
+            invalidate_quiz(quiz.pk)
+        if bank is not None:
+            invalidate_bank(bank.pk)
+        report.saved = True
+
+    return report
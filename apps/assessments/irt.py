@@ -0,0 +1,288 @@
+# apps/assessments/irt.py
+
+import random
+from dataclasses import dataclass
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import Quiz, Question, ItemCalibration
+from .pools import pool_index
+from .analysis import load_responses, correct_matrix
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Qobiliyat shkalasi (θ) to'ri va standart normal apriori
+THETA = np.linspace(-4, 4, 81)
+LOG_PRIOR = -THETA ** 2 / 2
+
+# Kalibrovka qilinmagan savollar: a = 1, b qiyinlik darajasidan
+DEFAULT_DISCRIMINATION = 1.0
+DEFAULT_DIFFICULTY = {
+    Question.Difficulty.EASY: -1.0,
+    Question.Difficulty.MEDIUM: 0.0,
+    Question.Difficulty.HARD: 1.0,
+}
+
+# To'xtash qoidasi shuncha savoldan keyin tekshiriladi
+MIN_QUESTIONS = 5
+# Birinchi savollar hammaga bir xil bo'lmasligi uchun eng ma'lumotli N tadan biri tanlanadi
+RANDOMESQUE = 3
+
+# Kalibrovka
+MIN_RESPONSES = 30
+MAX_ITERATIONS = 200
+TOLERANCE = 1e-4
+DISCRIMINATION_RANGE = (0.2, 4.0)
+DIFFICULTY_RANGE = (-4.0, 4.0)
+# Parametrlar uchun kuchsiz apriori (kam javobli savollarda baho chetga qochmasligi uchun)
+DISCRIMINATION_PRIOR = (1.0, 0.75)
+DIFFICULTY_PRIOR_SD = 2.0
+
+
+def probability(discrimination, difficulty, theta=THETA):
+    """To'g'ri javob ehtimoli P(θ) = 1 / (1 + exp(-a(θ - b))), savollar x to'r"""
+    logits = discrimination[:, None] * (theta[None, :] - difficulty[:, None])
+    return np.clip(1 / (1 + np.exp(-logits)), 1e-9, 1 - 1e-9)
+
+
+# ===================== SAVOLLAR JADVALI =====================
+
+@dataclass(frozen=True)
+class ItemTable:
+    """Moslashuvchan test banki: parametrlar va θ to'rida oldindan hisoblangan jadvallar"""
+    quiz_id: int
+    version: int
+    question_ids: tuple
+    index: dict
+    discrimination: np.ndarray
+    difficulty: np.ndarray
+    points: np.ndarray
+    log_correct: np.ndarray
+    log_wrong: np.ndarray
+    information: np.ndarray
+
+
+def adaptive_pool(quiz):
+    """Moslashuvchan test banki: testning o'z savollari + qoidalardagi banklarning mos savollari"""
+    question_ids = list(quiz.questions.order_by('order', 'pk').values_list('pk', flat=True))
+    taken = set(question_ids)
+    for rule in quiz.pool_rules.select_related('bank').order_by('pk'):
+        for question_id in pool_index(rule):
+            if question_id not in taken:
+                question_ids.append(question_id)
+                taken.add(question_id)
+    return question_ids
+
+
+def build_item_table(quiz):
+    """Parametrlarni bitta so'rovda yuklab, log P, log (1 - P) va ma'lumot jadvallarini hisoblash"""
+    question_ids = adaptive_pool(quiz)
+    rows = {
+        row[0]: row[1:]
+        for row in Question.objects.filter(pk__in=question_ids).values_list(
+            'pk', 'difficulty', 'points', 'calibration__discrimination', 'calibration__difficulty'
+        )
+    }
+    question_ids = tuple(question_id for question_id in question_ids if question_id in rows)
+
+    discrimination = np.array([
+        DEFAULT_DISCRIMINATION if rows[question_id][2] is None else rows[question_id][2]
+        for question_id in question_ids
+    ], dtype=float)
+    difficulty = np.array([
+        DEFAULT_DIFFICULTY.get(rows[question_id][0], 0.0) if rows[question_id][3] is None else rows[question_id][3]
+        for question_id in question_ids
+    ], dtype=float)
+    points = np.array([rows[question_id][1] for question_id in question_ids], dtype=float)
+
+    correct = probability(discrimination, difficulty)
+    return ItemTable(
+        quiz_id=quiz.pk,
+        version=quiz.version,
+        question_ids=question_ids,
+        index={question_id: row for row, question_id in enumerate(question_ids)},
+        discrimination=discrimination,
+        difficulty=difficulty,
+        points=points,
+        log_correct=np.log(correct),
+        log_wrong=np.log(1 - correct),
+        information=discrimination[:, None] ** 2 * correct * (1 - correct)
+    )
+
+
+def get_item_table(quiz):
+    """Keshdan olish (test versiyasi bo'yicha: savollar, qoidalar yoki kalibrovka o'zgarsa yangilanadi)"""
+    key = f'assessments:irt_table:{quiz.pk}:v{quiz.version}'
+    table = cache.get(key)
+    if table is None:
+        table = build_item_table(quiz)
+        cache.set(key, table, CACHE_TIMEOUT)
+    return table
+
+
+# ===================== SAVOL TANLASH =====================
+
+def estimate_ability(table, responses):
+    """EAP qobiliyat bahosi va xatosi (posterior o'rtacha va standart chetlanishi)
+
+    `responses` - {savol_id: to'g'rimi}; bankda yo'q savollar hisobga olinmaydi.
+    """
+    rows = [table.index[question_id] for question_id in responses if question_id in table.index]
+    flags = np.array([responses[table.question_ids[row]] for row in rows], dtype=bool)
+
+    log_posterior = LOG_PRIOR + np.where(
+        flags[:, None], table.log_correct[rows], table.log_wrong[rows]
+    ).sum(axis=0)
+    weights = np.exp(log_posterior - log_posterior.max())
+    weights /= weights.sum()
+
+    theta = float(weights @ THETA)
+    return theta, float(np.sqrt(weights @ (THETA - theta) ** 2))
+
+
+def next_question(quiz, table, responses, delivered, seed=None):
+    """Keyingi savol: joriy θ bahosida eng ko'p ma'lumot beradigan, hali berilmagan savol
+
+    Savollar soni chegarasiga yetganda, baho xatosi `adaptive_target_se` dan kichik bo'lganda
+    yoki bank tugaganda None qaytadi (test yakunlanadi).
+    """
+    if len(delivered) >= quiz.adaptive_max_questions:
+        return None
+
+    theta, error = estimate_ability(table, responses)
+    if quiz.adaptive_target_se and len(responses) >= MIN_QUESTIONS and error <= quiz.adaptive_target_se:
+        return None
+
+    information = table.information[:, np.abs(THETA - theta).argmin()].copy()
+    used = [table.index[question_id] for question_id in delivered if question_id in table.index]
+    information[used] = -1
+    candidates = [row for row in np.argsort(-information, kind='stable')[:RANDOMESQUE] if information[row] >= 0]
+    if not candidates:
+        return None
+
+    row = random.Random(f'{seed}:{len(delivered)}').choice(candidates)
+    return table.question_ids[row]
+
+
+def adaptive_score(quiz, responses):
+    """Moslashuvchan urinish bali: θ bahosida butun bank bo'yicha kutilgan natija (%)
+
+    To'g'ri javoblar ulushi savollar qiyinligiga bog'liq bo'lgani uchun ball qobiliyatdan hisoblanadi.
+    """
+    table = get_item_table(quiz)
+    total_points = table.points.sum()
+    if not responses or total_points <= 0:
+        return 0
+
+    theta, _ = estimate_ability(table, responses)
+    expected = probability(table.discrimination, table.difficulty, np.array([theta]))[:, 0]
+    return int(expected @ table.points / total_points * 100)
+
+
+# ===================== KALIBROVKA =====================
+
+def estimate_parameters(correct, presented, model=ItemCalibration.Model.TWO_PL,
+                        max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """Savollar parametrlarini MML-EM bilan baholash (θ to'rida, vektorlashtirilgan)
+
+    `correct`, `presented` - urinish x savol mantiqiy matritsalari (berilmagan savol hisobga olinmaydi).
+    E-qadamda har bir urinish uchun θ posteriori, M-qadamda savollar bo'yicha bitta Fisher qadami.
+    (a, b) massivlari qaytadi; 1PL da a = 1.
+    """
+    right = correct.astype(float)
+    wrong = presented.astype(float) - right
+    shown = presented.sum(axis=0)
+
+    share = np.clip(right.sum(axis=0) / np.maximum(shown, 1), 0.02, 0.98)
+    discrimination = np.ones(correct.shape[1])
+    difficulty = np.clip(-np.log(share / (1 - share)), *DIFFICULTY_RANGE)
+    prior_mean, prior_sd = DISCRIMINATION_PRIOR
+
+    for _ in range(max_iterations):
+        correct_probability = probability(discrimination, difficulty)
+
+        # E-qadam: urinishlar x to'r posterior og'irliklari
+        log_posterior = right @ np.log(correct_probability) + wrong @ np.log(1 - correct_probability) + LOG_PRIOR
+        weights = np.exp(log_posterior - log_posterior.max(axis=1, keepdims=True))
+        weights /= weights.sum(axis=1, keepdims=True)
+        expected_correct = right.T @ weights
+        expected_total = (right + wrong).T @ weights
+
+        # M-qadam: log-o'xshashlik gradienti va kutilgan ma'lumot (apriori bilan)
+        residual = expected_correct - expected_total * correct_probability
+        information = expected_total * correct_probability * (1 - correct_probability)
+        deviation = THETA[None, :] - difficulty[:, None]
+
+        gradient_b = -discrimination * residual.sum(axis=1) - difficulty / DIFFICULTY_PRIOR_SD ** 2
+        information_bb = discrimination ** 2 * information.sum(axis=1) + 1 / DIFFICULTY_PRIOR_SD ** 2
+
+        if model == ItemCalibration.Model.TWO_PL:
+            gradient_a = (residual * deviation).sum(axis=1) - (discrimination - prior_mean) / prior_sd ** 2
+            information_aa = (information * deviation ** 2).sum(axis=1) + 1 / prior_sd ** 2
+            information_ab = -discrimination * (information * deviation).sum(axis=1)
+            determinant = information_aa * information_bb - information_ab ** 2
+            step_a = (information_bb * gradient_a - information_ab * gradient_b) / determinant
+            step_b = (information_aa * gradient_b - information_ab * gradient_a) / determinant
+        else:
+            step_a = np.zeros_like(discrimination)
+            step_b = gradient_b / information_bb
+
+        step_a = np.clip(step_a, -0.5, 0.5)
+        step_b = np.clip(step_b, -1.0, 1.0)
+        discrimination = np.clip(discrimination + step_a, *DISCRIMINATION_RANGE)
+        difficulty = np.clip(difficulty + step_b, *DIFFICULTY_RANGE)
+
+        if max(np.abs(step_a).max(), np.abs(step_b).max()) < tolerance:
+            break
+
+    return discrimination, difficulty
+
+
+def calibrate_quiz(quiz, model=ItemCalibration.Model.TWO_PL, min_responses=MIN_RESPONSES):
+    """Test urinishlaridan savollar parametrlarini baholab saqlash
+
+    Kamida `min_responses` marta berilgan savollar kalibrovka qilinadi; bu savollar ishlatiladigan
+    testlar versiyasi oshiriladi (savollar jadvali qayta quriladi). Saqlangan yozuvlar qaytadi.
+    """
+    responses = load_responses(quiz)
+    if responses is None:
+        return []
+
+    presented = responses.presented
+    shown = presented.sum(axis=0)
+    columns = np.flatnonzero(shown >= min_responses)
+    if not len(columns):
+        return []
+
+    discrimination, difficulty = estimate_parameters(
+        correct_matrix(responses)[:, columns], presented[:, columns], model
+    )
+    calibrations = [
+        ItemCalibration(
+            question_id=responses.questions[column][0],
+            model=model,
+            discrimination=float(discrimination[index]),
+            difficulty=float(difficulty[index]),
+            responses=int(shown[column])
+        )
+        for index, column in enumerate(columns)
+    ]
+    question_ids = [calibration.question_id for calibration in calibrations]
+
+    with transaction.atomic():
+        ItemCalibration.objects.bulk_create(
+            calibrations,
+            update_conflicts=True,
+            unique_fields=['question'],
+            update_fields=['model', 'discrimination', 'difficulty', 'responses', 'calibrated_at']
+        )
+        Quiz.objects.filter(
+            pk__in=Quiz.objects.filter(
+                Q(questions__pk__in=question_ids) | Q(pool_rules__bank__questions__pk__in=question_ids)
+            ).values('pk')
+        ).update(version=F('version') + 1)
+
+    return calibrations
@@ -0,0 +1,147 @@
+# apps/assessments/live.py
+
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.handlers.asgi import ASGIRequest
+
+from .models import QuizAttempt
+
+# Kesh hisoblagichlari shu muddatdan keyin DB dan qayta tiklanadi (kesh umumiy bo'lmasa ham to'g'rilanadi)
+LIVE_TIMEOUT = 60 * 5
+BUCKETS = 10
+COUNTERS = ('started', 'answered', 'submitted', 'graded')
+SCORE_COUNTERS = tuple(f'score_{index}' for index in range(BUCKETS))
+TOKEN_SALT = 'assessments.live'
+TOKEN_MAX_AGE = 60 * 60 * 12
+# Long-poll so'rovi ichida keshni tekshirish oralig'i (soniya)
+POLL_INTERVAL = 1
+
+
+def shared_cache():
+    """Kesh barcha ishchilar uchun umumiymi (LocMem va Dummy - yo'q)"""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def live_wait(request):
+    """Long-poll so'rovi o'zgarishni kutadigan eng ko'p vaqt (ASSESSMENTS_LIVE_WAIT, 0 - kutmaydi)
+
+    Faqat ASGI ostida va umumiy keshda yoqiladi: WSGI ishchisini kutish band qiladi,
+    jarayon ichidagi keshda esa boshqa ishchilar voqealari ko'rinmaydi.
+    """
+    wait = getattr(settings, 'ASSESSMENTS_LIVE_WAIT', 0)
+    if not wait or not isinstance(request, ASGIRequest) or not shared_cache():
+        return 0
+    return wait
+
+
+def counter_key(quiz_id, name):
+    return f'assessments:live:{quiz_id}:{name}'
+
+
+def score_counter(score):
+    """Ball oralig'i hisoblagichi: 0-9, 10-19, ..., 90-100"""
+    return SCORE_COUNTERS[min((score or 0) // BUCKETS, BUCKETS - 1)]
+
+
+# ===================== HISOBLAGICHLAR =====================
+
+def record(quiz_id, **deltas):
+    """Hisoblagichlarni oshirish; kesh bo'sh bo'lsa hech narsa qilinmaydi (o'qishda DB dan tiklanadi)"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    try:
+        for name, delta in deltas.items():
+            cache.incr(counter_key(quiz_id, name), delta)
+        cache.incr(counter_key(quiz_id, 'seq'))
+    except ValueError:
+        # Kalitlarning bir qismi muddati o'tgan - keyingi o'qish to'liq tiklaydi
+        invalidate(quiz_id)
+
+
+def record_attempts(attempts, submitted=False, graded=False, drafts=None):
+    """Urinishlar voqealarini test bo'yicha jamlab yozish
+
+    `drafts` - {urinish_id: yakunlanishdan oldingi qoralama}; ular endi ochiq urinishlar
+    javoblari hisobiga kirmaydi.
+    """
+    deltas = defaultdict(Counter)
+    for attempt in attempts:
+        quiz_deltas = deltas[attempt.quiz_id]
+        if submitted:
+            quiz_deltas['submitted'] += 1
+        if graded:
+            quiz_deltas['graded'] += 1
+            quiz_deltas[score_counter(attempt.score)] += 1
+        if drafts is not None:
+            quiz_deltas['answered'] -= len(drafts.get(attempt.pk) or {})
+
+    for quiz_id, quiz_deltas in deltas.items():
+        record(quiz_id, **quiz_deltas)
+
+
+def invalidate(quiz_id):
+    """Kamdan-kam voqealar (o'chirish, qayta baholash) - hisoblagichlar DB dan qayta tiklanadi"""
+    cache.delete(counter_key(quiz_id, 'seq'))
+
+
+def rebuild(quiz_id):
+    """Hisoblagichlarni DB dan tiklash (kesh bo'sh yoki eskirganda, bir necha so'rov)"""
+    attempts = QuizAttempt.objects.filter(quiz_id=quiz_id)
+    values = dict.fromkeys(COUNTERS + SCORE_COUNTERS, 0)
+    values['started'] = attempts.count()
+
+    for draft in attempts.filter(completed_at__isnull=True).values_list('draft', flat=True).iterator():
+        values['answered'] += len(draft or {})
+
+    for graded_at, score in attempts.filter(completed_at__isnull=False).values_list('graded_at', 'score').iterator():
+        values['submitted'] += 1
+        if graded_at is not None:
+            values['graded'] += 1
+            values[score_counter(score)] += 1
+
+    # Keyingi voqealar farqlanishi uchun ketma-ketlik raqami har safar yangi
+    values['seq'] = int(time.time() * 1000)
+    cache.set_many({counter_key(quiz_id, name): value for name, value in values.items()}, LIVE_TIMEOUT)
+    return values
+
+
+def snapshot(quiz_id):
+    """Joriy holat: hisoblagichlar keshdan (odatda bitta so'rovsiz o'qish)"""
+    names = ('seq',) + COUNTERS + SCORE_COUNTERS
+    cached = cache.get_many([counter_key(quiz_id, name) for name in names])
+    values = {name: cached.get(counter_key(quiz_id, name)) for name in names}
+    if any(value is None for value in values.values()):
+        values = rebuild(quiz_id)
+
+    return {
+        'seq': values['seq'],
+        'started': values['started'],
+        'in_progress': max(values['started'] - values['submitted'], 0),
+        'answered': max(values['answered'], 0),
+        'submitted': values['submitted'],
+        'graded': values['graded'],
+        'histogram': [values[name] for name in SCORE_COUNTERS],
+    }
+
+
+# ===================== KUZATUV TOKENI =====================
+
+def make_token(quiz_id, user_id):
+    """Kuzatuv sahifasi uchun imzolangan token (so'rovlarda sessiya va DB ga murojaat qilinmaydi)"""
+    return signing.dumps({'quiz': quiz_id, 'user': user_id}, salt=TOKEN_SALT)
+
+
+def check_token(token, quiz_id):
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT, max_age=TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return payload.get('quiz') == quiz_id
@@ -0,0 +1,324 @@
+# apps/assessments/loadtest.py
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+import requests
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from apps.accounts.models import User, Faculty, Department
+from apps.courses.models import Course, Enrollment
+from apps.courses.services import recount_course_counters
+from .models import Quiz, Question, Answer
+from .services import recount_quiz_counters
+
+# Hisobot formati o'zgarsa oshiriladi (relizlar orasida solishtirish uchun)
+REPORT_VERSION = 1
+STEPS = ('start', 'take', 'autosave', 'submit', 'result')
+PASSWORD = 'loadtest-password'
+MAX_ERROR_SAMPLES = 5
+
+
+@dataclass
+class Exam:
+    """Yuklama sinovi uchun yaratilgan kurs, test va talabalar"""
+    prefix: str
+    teacher: User
+    course: Course
+    quiz: Quiz
+    students: list
+    # {savol_id: [javob_id, ...]} - talabalar shu variantlardan tanlaydi
+    answers: dict
+
+
+# ===================== MA'LUMOTLAR =====================
+
+def seed_exam(students=50, questions=20, answers=4, time_limit=60):
+    """Kurs, N ta yozilgan talaba va test yaratish (bulk, signallarsiz; hisoblagichlar keyin tiklanadi)"""
+    prefix = f'lt{int(time.time())}'
+    now = timezone.now()
+
+    faculty, _ = Faculty.objects.get_or_create(code='LOADTEST', defaults={'name': 'Yuklama sinovi'})
+    department, _ = Department.objects.get_or_create(faculty=faculty, name='Yuklama sinovi')
+    teacher = User.objects.create(username=f'{prefix}-teacher', role=User.Role.TEACHER)
+    course = Course.objects.create(name=f'Yuklama sinovi {prefix}', code=prefix.upper(), department=department, teacher=teacher)
+
+    # Parol xeshi bir marta hisoblanadi
+    password = make_password(PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'{prefix}-s{index}', role=User.Role.STUDENT, password=password)
+        for index in range(students)
+    ], batch_size=500)
+    users = list(User.objects.filter(username__startswith=f'{prefix}-s').order_by('pk'))
+    Enrollment.objects.bulk_create([Enrollment(student=user, course=course) for user in users], batch_size=500)
+
+    quiz = Quiz.objects.create(
+        course=course,
+        title=f'Yuklama sinovi {prefix}',
+        time_limit_minutes=time_limit,
+        attempts_allowed=1,
+        available_from=now - timedelta(hours=1),
+        available_until=now + timedelta(days=1)
+    )
+    question_objects = Question.objects.bulk_create([
+        Question(quiz=quiz, text=f'Savol {index + 1}', order=index, points=1)
+        for index in range(questions)
+    ])
+    Answer.objects.bulk_create([
+        Answer(question=question, text=f'Variant {index + 1}', is_correct=index == 0, order=index)
+        for question in question_objects
+        for index in range(answers)
+    ], batch_size=500)
+
+    recount_course_counters([course.pk])
+    recount_quiz_counters([quiz.pk])
+
+    answer_ids = {}
+    for question_id, answer_id in Answer.objects.filter(question__quiz=quiz).values_list('question_id', 'pk'):
+        answer_ids.setdefault(question_id, []).append(answer_id)
+
+    return Exam(prefix=prefix, teacher=teacher, course=course, quiz=quiz, students=users, answers=answer_ids)
+
+
+def cleanup_exam(exam):
+    """Sinov ma'lumotlarini o'chirish (kurs bilan test, urinishlar va yozilishlar ham ketadi)"""
+    exam.course.delete()
+    User.objects.filter(username__startswith=f'{exam.prefix}-').delete()
+
+
+# ===================== MIJOZLAR =====================
+
+class InProcessClient:
+    """Django test mijozi: so'rovlar shu jarayonda, har bir qadamdagi SQL so'rovlar soni ham o'lchanadi"""
+
+    def __init__(self, user):
+        self.client = Client(raise_request_exception=False)
+        self.client.force_login(user)
+
+    def request(self, method, path, data=None, json_body=None):
+        with CaptureQueriesContext(connection) as queries:
+            if json_body is not None:
+                response = self.client.post(path, data=json_body, content_type='application/json')
+            elif method == 'POST':
+                response = self.client.post(path, data or {})
+            else:
+                response = self.client.get(path)
+        return response.status_code, response.get('Location'), len(queries)
+
+    def close(self):
+        # Har bir oqim o'z ulanishini ochadi
+        connection.close()
+
+
+class HttpClient:
+    """Ishlab turgan serverga HTTP so'rovlar (SQL so'rovlar sonini o'lchab bo'lmaydi)"""
+
+    def __init__(self, user, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        login_url = self.base_url + reverse('accounts:login')
+        self.session.get(login_url)
+        self.session.post(login_url, data={
+            'username': user.username,
+            'password': PASSWORD,
+            'csrfmiddlewaretoken': self.session.cookies.get('csrftoken', ''),
+        }, headers={'Referer': login_url}, allow_redirects=False)
+        # Kirgandan keyin CSRF token yangilanadi
+        self.session.headers.update({
+            'X-CSRFToken': self.session.cookies.get('csrftoken', ''),
+            'Referer': self.base_url + '/',
+        })
+
+    def request(self, method, path, data=None, json_body=None):
+        url = self.base_url + path
+        if json_body is not None:
+            response = self.session.post(url, json=json_body, allow_redirects=False)
+        elif method == 'POST':
+            response = self.session.post(url, data=data or {}, allow_redirects=False)
+        else:
+            response = self.session.get(url, allow_redirects=False)
+
+        location = response.headers.get('Location')
+        if location and location.startswith(self.base_url):
+            location = location[len(self.base_url):]
+        return response.status_code, location, None
+
+    def close(self):
+        self.session.close()
+
+
+# ===================== O'LCHASH =====================
+
+class Recorder:
+    """Qadamlar bo'yicha natijalar (oqimlar orasida xavfsiz)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {step: [] for step in STEPS}
+        self.errors = {step: [] for step in STEPS}
+        self.flows_completed = 0
+
+    def add(self, step, latency, queries, error=None):
+        with self.lock:
+            self.samples[step].append((latency, queries, error is None))
+            if error is not None:
+                self.errors[step].append(error)
+
+    def flow_completed(self):
+        with self.lock:
+            self.flows_completed += 1
+
+
+class StepFailed(Exception):
+    pass
+
+
+def timed(recorder, client, step, method, path, expected, **kwargs):
+    """So'rovni bajarish va o'lchash; kutilmagan javobda StepFailed"""
+    started = time.perf_counter()
+    try:
+        status, location, queries = client.request(method, path, **kwargs)
+    except Exception as exc:
+        recorder.add(step, (time.perf_counter() - started) * 1000, None, f'{type(exc).__name__}: {exc}')
+        raise StepFailed(step)
+
+    latency = (time.perf_counter() - started) * 1000
+    if status not in expected:
+        recorder.add(step, latency, queries, f'HTTP {status} {method} {path}')
+        raise StepFailed(step)
+
+    recorder.add(step, latency, queries)
+    return location
+
+
+def run_student(exam, student, recorder, autosaves, rng, base_url=None):
+    """Bitta talaba oqimi: start -> take -> autosave x N -> submit -> result"""
+    client = None
+    try:
+        client = HttpClient(student, base_url) if base_url else InProcessClient(student)
+
+        location = timed(recorder, client, 'start', 'GET', reverse('assessments:quiz_start', args=[exam.quiz.pk]), (302,))
+        match = resolve(location or '/')
+        if match.url_name != 'quiz_take':
+            recorder.add('take', 0, None, f'start redirected to {location}')
+            return
+        attempt_id = match.kwargs['pk']
+
+        timed(recorder, client, 'take', 'GET', reverse('assessments:quiz_take', args=[attempt_id]), (200,))
+
+        chosen = {question_id: rng.choice(answer_ids) for question_id, answer_ids in exam.answers.items()}
+        question_ids = list(chosen)
+        for question_id in rng.sample(question_ids, min(autosaves, len(question_ids))):
+            timed(
+                recorder, client, 'autosave', 'POST', reverse('assessments:quiz_autosave', args=[attempt_id]), (200,),
+                json_body={'answers': {str(question_id): [chosen[question_id]]}}
+            )
+
+        timed(
+            recorder, client, 'submit', 'POST', reverse('assessments:quiz_take', args=[attempt_id]), (302,),
+            data={f'question_{question_id}': answer_id for question_id, answer_id in chosen.items()}
+        )
+        timed(recorder, client, 'result', 'GET', reverse('assessments:quiz_result', args=[attempt_id]), (200,))
+        recorder.flow_completed()
+    except StepFailed:
+        pass
+    except Exception as exc:
+        # Mijozni yaratishda (masalan, kirish) xato
+        recorder.add('start', 0, None, f'{type(exc).__name__}: {exc}')
+    finally:
+        if client is not None:
+            client.close()
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values, dtype=float)
+    return {
+        'p50': round(float(np.percentile(values, 50)), 2),
+        'p95': round(float(np.percentile(values, 95)), 2),
+        'p99': round(float(np.percentile(values, 99)), 2),
+        'mean': round(float(values.mean()), 2),
+        'max': round(float(values.max()), 2),
+    }
+
+
+def build_report(recorder, config, duration):
+    """JSON ga yoziladigan hisobot (kalitlar tartibi barqaror)"""
+    steps = {}
+    requests_total = 0
+    errors_total = 0
+    for step in STEPS:
+        samples = recorder.samples[step]
+        errors = sum(1 for sample in samples if not sample[2])
+        queries = [sample[1] for sample in samples if sample[1] is not None and sample[2]]
+        requests_total += len(samples)
+        errors_total += errors
+        steps[step] = {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': round(errors / len(samples), 4) if samples else 0,
+            'latency_ms': percentiles([sample[0] for sample in samples if sample[2]]),
+            'queries': {
+                'mean': round(sum(queries) / len(queries), 2),
+                'max': max(queries),
+            } if queries else None,
+            'error_samples': recorder.errors[step][:MAX_ERROR_SAMPLES],
+        }
+
+    flows = config['students']
+    return {
+        'version': REPORT_VERSION,
+        'config': config,
+        'duration_seconds': round(duration, 3),
+        'flows': {
+            'total': flows,
+            'completed': recorder.flows_completed,
+            'error_rate': round(1 - recorder.flows_completed / flows, 4) if flows else 0,
+        },
+        'throughput': {
+            'requests_per_second': round(requests_total / duration, 2) if duration else None,
+            'flows_per_second': round(recorder.flows_completed / duration, 2) if duration else None,
+        },
+        'requests': {'total': requests_total, 'errors': errors_total},
+        'steps': steps,
+    }
+
+
+def simulate(exam, concurrency=10, autosaves=3, base_url=None, seed=0):
+    """Talabalar oqimini `concurrency` ta parallel oqimda bajarib, hisobot qaytarish"""
+    recorder = Recorder()
+    rng = random.Random(seed)
+    seeds = [rng.randrange(2 ** 31) for _ in exam.students]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        futures = [
+            pool.submit(run_student, exam, student, recorder, autosaves, random.Random(student_seed), base_url)
+            for student, student_seed in zip(exam.students, seeds)
+        ]
+        for future in futures:
+            future.result()
+    duration = time.perf_counter() - started
+
+    config = {
+        'mode': 'http' if base_url else 'in-process',
+        'base_url': base_url,
+        'database': connection.vendor,
+        'students': len(exam.students),
+        'questions': len(exam.answers),
+        'concurrency': concurrency,
+        'autosaves': autosaves,
+        'seed': seed,
+    }
+    return build_report(recorder, config, duration)
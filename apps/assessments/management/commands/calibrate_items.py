@@ -0,0 +1,47 @@
+# apps/assessments/management/commands/calibrate_items.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.assessments.models import Quiz, ItemCalibration
+from apps.assessments.irt import MIN_RESPONSES, calibrate_quiz
+
+
+class Command(BaseCommand):
+    help = "Yakunlangan urinishlar javoblaridan savollarning IRT parametrlarini (1PL/2PL) baholash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'quiz_ids',
+            nargs='*',
+            type=int,
+            help="Test ID lari (bo'sh - barcha moslashuvchan testlar)"
+        )
+        parser.add_argument(
+            '--model',
+            choices=ItemCalibration.Model.values,
+            default=ItemCalibration.Model.TWO_PL,
+            help="IRT modeli (standart: 2pl)"
+        )
+        parser.add_argument(
+            '--min-responses',
+            type=int,
+            default=MIN_RESPONSES,
+            help=f"Savol kalibrovka qilinishi uchun minimal javoblar soni (standart: {MIN_RESPONSES})"
+        )
+
+    def handle(self, *args, **options):
+        if options['quiz_ids']:
+            quizzes = list(Quiz.objects.filter(pk__in=options['quiz_ids']).order_by('pk'))
+            missing = set(options['quiz_ids']) - {quiz.pk for quiz in quizzes}
+            if missing:
+                raise CommandError(f"Test topilmadi: {', '.join(map(str, sorted(missing)))}")
+        else:
+            quizzes = list(Quiz.objects.filter(is_adaptive=True).order_by('pk'))
+
+        total = 0
+        for quiz in quizzes:
+            calibrations = calibrate_quiz(quiz, model=options['model'], min_responses=max(options['min_responses'], 1))
+            total += len(calibrations)
+            self.stdout.write(f"  {quiz}: {len(calibrations)} ta savol")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} ta savol kalibrovka qilindi."))
@@ -0,0 +1,38 @@
+# apps/assessments/management/commands/compact_selections.py
+
+from django.core.management.base import BaseCommand
+
+from apps.assessments.models import QuizAttempt
+from apps.assessments.services import compact_selections
+
+
+class Command(BaseCommand):
+    help = "Yakunlangan urinishlar javoblarini StudentAnswer qatorlaridan siqilgan shaklga o'tkazish"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help="O'tkazilgan urinishlarning StudentAnswer qatorlarini o'chirish"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Bitta tranzaksiyadagi urinishlar soni (standart: 500)"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+
+        attempts = QuizAttempt.objects.filter(completed_at__isnull=False)
+        if not options['purge']:
+            attempts = attempts.filter(selections__isnull=True)
+        attempt_ids = list(attempts.order_by('pk').values_list('pk', flat=True))
+
+        total = 0
+        for start in range(0, len(attempt_ids), batch_size):
+            total += compact_selections(attempt_ids[start:start + batch_size], purge=options['purge'])
+            self.stdout.write(f"{min(start + batch_size, len(attempt_ids))}/{len(attempt_ids)} urinish...")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} ta urinish siqilgan shaklga o'tkazildi."))
@@ -0,0 +1,56 @@
+# apps/assessments/management/commands/detect_similarity.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.models import User
+from apps.assessments.models import Quiz
+from apps.assessments.similarity import MAX_PAIRS, MIN_SCORE, MIN_SHARED_WRONG, find_similar_pairs
+
+
+class Command(BaseCommand):
+    help = "Test urinishlari orasida javoblari shubhali darajada o'xshash juftliklarni topish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int, help="Test ID si")
+        parser.add_argument(
+            '--min-score',
+            type=float,
+            default=MIN_SCORE,
+            help=f"Minimal o'xshashlik, 0..1 (standart: {MIN_SCORE})"
+        )
+        parser.add_argument(
+            '--min-shared-wrong',
+            type=int,
+            default=MIN_SHARED_WRONG,
+            help=f"Minimal umumiy noto'g'ri javoblar soni (standart: {MIN_SHARED_WRONG})"
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=MAX_PAIRS,
+            help=f"Ko'rsatiladigan juftliklar soni (standart: {MAX_PAIRS})"
+        )
+
+    def handle(self, *args, **options):
+        quiz = Quiz.objects.filter(pk=options['quiz_id']).first()
+        if quiz is None:
+            raise CommandError(f"Test topilmadi: {options['quiz_id']}")
+
+        report = find_similar_pairs(
+            quiz,
+            min_score=options['min_score'],
+            min_shared_wrong=options['min_shared_wrong'],
+            limit=max(options['limit'], 1)
+        )
+        users = User.objects.in_bulk(
+            {pair.student_a for pair in report.pairs} | {pair.student_b for pair in report.pairs}
+        )
+
+        self.stdout.write(f"{report.attempts} ta urinish solishtirildi.")
+        for pair in report.pairs:
+            self.stdout.write(
+                f"  {pair.score_percent}%  {users[pair.student_a].username} (#{pair.attempt_a}) - "
+                f"{users[pair.student_b].username} (#{pair.attempt_b}): "
+                f"{pair.shared_wrong} ta umumiy noto'g'ri, {pair.shared_correct} ta umumiy to'g'ri"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(report.pairs)} ta shubhali juftlik topildi."))
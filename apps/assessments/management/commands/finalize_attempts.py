@@ -0,0 +1,50 @@
+# apps/assessments/management/commands/finalize_attempts.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.assessments.services import finalize_expired_attempts
+
+
+class Command(BaseCommand):
+    help = "Muddati o'tgan test urinishlarini yakunlash va baholash (cron orqali davriy ishga tushiriladi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help="Bitta tranzaksiyadagi urinishlar soni (standart: 200)"
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=60,
+            help="Muddatdan keyin kutiladigan soniyalar (standart: 60)"
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help="Berilsa, har shuncha soniyada qayta tekshirib to'xtovsiz ishlaydi"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        grace = max(options['grace'], 0)
+        interval = options['interval']
+
+        while True:
+            total = 0
+            while True:
+                finalized = finalize_expired_attempts(batch_size=batch_size, grace_seconds=grace)
+                total += finalized
+                if finalized < batch_size:
+                    break
+
+            self.stdout.write(self.style.SUCCESS(f"{total} ta urinish yakunlandi."))
+
+            if interval <= 0:
+                break
+            time.sleep(interval)
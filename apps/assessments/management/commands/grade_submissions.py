@@ -0,0 +1,44 @@
+# apps/assessments/management/commands/grade_submissions.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.assessments.services import grade_submitted_attempts
+
+
+class Command(BaseCommand):
+    help = "Navbatdagi yuborilgan test urinishlarini baholash (ASSESSMENTS_ASYNC_GRADING yoqilganda ishchi sifatida)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help="Bitta tranzaksiyadagi urinishlar soni (standart: 200)"
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help="Berilsa, navbat bo'shaganda shuncha soniya kutib to'xtovsiz ishlaydi"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        interval = options['interval']
+
+        while True:
+            total = 0
+            while True:
+                graded = grade_submitted_attempts(batch_size=batch_size)
+                total += graded
+                if graded < batch_size:
+                    break
+
+            if total or interval <= 0:
+                self.stdout.write(self.style.SUCCESS(f"{total} ta urinish baholandi."))
+
+            if interval <= 0:
+                break
+            time.sleep(interval)
@@ -0,0 +1,65 @@
+# apps/assessments/management/commands/import_questions.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.assessments.models import Quiz, QuestionBank
+from apps.assessments.importers import FORMAT_CHOICES, detect_format, import_questions
+
+
+class Command(BaseCommand):
+    help = "Savollarni Aiken, GIFT yoki CSV fayldan testga yoki savollar bankiga import qilish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fayl yo'li (UTF-8)")
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--quiz', type=int, help="Test ID si")
+        target.add_argument('--bank', type=int, help="Savollar banki ID si")
+        parser.add_argument(
+            '--format',
+            choices=[value for value, _ in FORMAT_CHOICES],
+            help="Fayl formati (standart: kengaytmadan aniqlanadi)"
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help="Xatoli savollarni o'tkazib, qolganlarini saqlash"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Faqat tekshirish, hech narsa saqlanmaydi"
+        )
+
+    def handle(self, *args, **options):
+        quiz = bank = None
+        if options['quiz']:
+            quiz = Quiz.objects.filter(pk=options['quiz']).first()
+            if quiz is None:
+                raise CommandError(f"Test topilmadi: {options['quiz']}")
+        else:
+            bank = QuestionBank.objects.filter(pk=options['bank']).first()
+            if bank is None:
+                raise CommandError(f"Bank topilmadi: {options['bank']}")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                report = import_questions(
+                    lines,
+                    options['format'] or detect_format(options['path']),
+                    quiz=quiz,
+                    bank=bank,
+                    skip_invalid=options['skip_invalid'],
+                    dry_run=options['dry_run']
+                )
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f"Faylni o'qib bo'lmadi: {exc}")
+
+        for error in report.errors:
+            self.stderr.write(f"  {error.line}-qator: {error.message}")
+
+        if report.saved:
+            self.stdout.write(self.style.SUCCESS(f"{report.valid} ta savol import qilindi."))
+        elif options['dry_run'] and not report.has_errors:
+            self.stdout.write(self.style.SUCCESS(f"{report.valid} ta savol to'g'ri (saqlanmadi)."))
+        else:
+            raise CommandError(f"{len(report.errors)} ta xato, hech narsa saqlanmadi.")
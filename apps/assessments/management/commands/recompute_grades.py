@@ -0,0 +1,49 @@
+# apps/assessments/management/commands/recompute_grades.py
+
+from django.core.management.base import BaseCommand
+
+from apps.courses.models import Course
+from apps.assessments.grades import refresh_course_grades
+
+
+class Command(BaseCommand):
+    help = "Baholarni (test, davomat, jami, harf baho) kurs yoki fakultet bo'yicha qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=int,
+            action='append',
+            dest='course_ids',
+            help="Faqat shu kurs(lar) uchun (bir necha marta berish mumkin)"
+        )
+        parser.add_argument(
+            '--faculty',
+            type=int,
+            action='append',
+            dest='faculty_ids',
+            help="Faqat shu fakultet(lar) kurslari uchun"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help="Bitta tranzaksiyadagi kurslar soni (standart: 50)"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+
+        courses = Course.objects.order_by('pk')
+        if options['course_ids']:
+            courses = courses.filter(pk__in=options['course_ids'])
+        if options['faculty_ids']:
+            courses = courses.filter(department__faculty_id__in=options['faculty_ids'])
+        course_ids = list(courses.values_list('pk', flat=True))
+
+        total = 0
+        for start in range(0, len(course_ids), batch_size):
+            total += refresh_course_grades(course_ids[start:start + batch_size])
+            self.stdout.write(f"{min(start + batch_size, len(course_ids))}/{len(course_ids)} kurs...")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} ta baho qayta hisoblandi."))
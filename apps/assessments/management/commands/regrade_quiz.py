@@ -0,0 +1,87 @@
+# apps/assessments/management/commands/regrade_quiz.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.assessments.models import Quiz, RegradeRun
+from apps.assessments.regrade import CHUNK_SIZE, WORKERS, regrade_quiz, run_pending_regrades
+
+
+class Command(BaseCommand):
+    help = (
+        "Test(lar)ning barcha yakunlangan urinishlarini joriy javob kaliti bo'yicha qayta baholash; "
+        "--pending bilan o'qituvchilar navbatga qo'ygan qayta baholashlarni bajaradi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int, help="Test ID(lar)i")
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help="Navbatdagi qayta baholashlarni bajarish (ishchi rejimi)"
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help="--pending bilan: berilsa, har shuncha soniyada navbatni qayta tekshirib to'xtovsiz ishlaydi"
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=WORKERS,
+            help=f"Parallel jarayonlar soni (standart: {WORKERS}; SQLite da 1)"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help=f"Bitta bo'lakdagi urinishlar soni (standart: {CHUNK_SIZE})"
+        )
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            return self.handle_pending(options)
+        if not options['quiz_ids']:
+            raise CommandError("Test ID(lar)i yoki --pending berilishi kerak")
+
+        quizzes = Quiz.objects.filter(pk__in=options['quiz_ids']).order_by('pk')
+        missing = set(options['quiz_ids']) - set(quizzes.values_list('pk', flat=True))
+        if missing:
+            raise CommandError(f"Test topilmadi: {', '.join(map(str, sorted(missing)))}")
+
+        for quiz in quizzes:
+            self.stdout.write(f"{quiz.title} (#{quiz.pk}) qayta baholanmoqda...")
+            run = regrade_quiz(
+                quiz,
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                progress=lambda done, total: self.stdout.write(f"  {done}/{total} urinish...")
+            )
+            self.report(run)
+
+    def handle_pending(self, options):
+        while True:
+            runs = run_pending_regrades(chunk_size=options['chunk_size'], workers=options['workers'])
+            for run in runs:
+                self.stdout.write(f"{run.quiz.title} (#{run.quiz_id}):")
+                self.report(run)
+
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
+
+    def report(self, run):
+        if run.status == RegradeRun.Status.FAILED:
+            self.stderr.write(self.style.ERROR(f"  Xatolik: {run.error}"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"  {run.attempts_processed} ta urinish qayta baholandi, "
+            f"{run.attempts_changed} tasining bali o'zgardi, {run.passed_flipped} tasining natijasi o'zgardi."
+        ))
+        for change in run.changes.select_related('student'):
+            if change.passed_flipped():
+                status = "o'tdi" if change.new_passed else "o'tmadi"
+                self.stdout.write(f"    {change.student.username}: {change.old_score}% -> {change.new_score}% ({status})")
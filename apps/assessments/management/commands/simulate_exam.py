@@ -0,0 +1,59 @@
+# apps/assessments/management/commands/simulate_exam.py
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.assessments.loadtest import seed_exam, cleanup_exam, simulate
+
+
+class Command(BaseCommand):
+    help = (
+        "Imtihon kuni yuklamasini sinash: N ta talaba start -> take -> autosave -> submit -> result "
+        "oqimini parallel bajaradi va JSON hisobot chiqaradi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50, help="Talabalar soni (standart: 50)")
+        parser.add_argument('--questions', type=int, default=20, help="Testdagi savollar soni (standart: 20)")
+        parser.add_argument('--concurrency', type=int, default=10, help="Parallel oqimlar soni (standart: 10)")
+        parser.add_argument('--autosaves', type=int, default=3, help="Har bir talaba uchun avtomatik saqlashlar (standart: 3)")
+        parser.add_argument(
+            '--url',
+            help="Ishlab turgan server manzili (masalan, http://127.0.0.1:8000); berilmasa so'rovlar shu jarayonda "
+                 "bajariladi va SQL so'rovlar soni ham o'lchanadi"
+        )
+        parser.add_argument('--seed', type=int, default=0, help="Tasodifiy javoblar uchun seed")
+        parser.add_argument('--output', help="Hisobotni shu faylga yozish (berilmasa ekranga)")
+        parser.add_argument('--keep', action='store_true', help="Yaratilgan kurs va talabalarni o'chirmaslik")
+
+    def handle(self, *args, **options):
+        exam = seed_exam(students=max(options['students'], 1), questions=max(options['questions'], 1))
+        self.stderr.write(f"{len(exam.students)} ta talaba va {len(exam.answers)} ta savolli test yaratildi ({exam.prefix}).")
+
+        try:
+            report = simulate(
+                exam,
+                concurrency=options['concurrency'],
+                autosaves=max(options['autosaves'], 0),
+                base_url=options['url'],
+                seed=options['seed']
+            )
+        finally:
+            if not options['keep']:
+                cleanup_exam(exam)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Hisobot {options['output']} fayliga yozildi."))
+        else:
+            self.stdout.write(output)
+
+        for step, stats in report['steps'].items():
+            latency = stats['latency_ms'] or {}
+            self.stderr.write(
+                f"  {step:<9} p50={latency.get('p50')} p95={latency.get('p95')} p99={latency.get('p99')} ms, "
+                f"xatolar: {stats['errors']}/{stats['requests']}"
+            )
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:01
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_question_count(apps, schema_editor):
+    Quiz = apps.get_model('assessments', 'Quiz')
+    Question = apps.get_model('assessments', 'Question')
+
+    counts = Question.objects.filter(quiz=OuterRef('pk')).order_by().values('quiz').annotate(
+        total=Count('pk')
+    ).values('total')[:1]
+    Quiz.objects.update(question_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Savollar soni'),
+        ),
+        migrations.RunPython(fill_question_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0002_quiz_question_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versiya'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0003_quiz_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='draft',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Qoralama'),
+        ),
+    ]
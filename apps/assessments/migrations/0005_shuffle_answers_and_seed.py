@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0004_quizattempt_draft'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='shuffle_answers',
+            field=models.BooleanField(default=False, verbose_name='Javoblarni aralashtirish'),
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='shuffle_seed',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
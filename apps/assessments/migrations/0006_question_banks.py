@@ -0,0 +1,83 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0005_shuffle_answers_and_seed'),
+        ('courses', '0003_enrollment_completed_lessons'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizPoolRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=5, verbose_name='Savollar soni')),
+                ('difficulty', models.CharField(blank=True, choices=[('easy', 'Oson'), ('medium', "O'rtacha"), ('hard', 'Qiyin')], help_text="Bo'sh - har qanday", max_length=10, verbose_name='Qiyinlik')),
+                ('tag', models.CharField(blank=True, help_text="Bo'sh - har qanday", max_length=50, verbose_name='Teg')),
+            ],
+            options={
+                'verbose_name': 'Tanlash qoidasi',
+                'verbose_name_plural': 'Tanlash qoidalari',
+            },
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='difficulty',
+            field=models.CharField(choices=[('easy', 'Oson'), ('medium', "O'rtacha"), ('hard', 'Qiyin')], default='medium', max_length=10, verbose_name='Qiyinlik'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='tags',
+            field=models.CharField(blank=True, help_text='Vergul bilan ajrating', max_length=200, verbose_name='Teglar'),
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='question_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='quiz',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='assessments.quiz', verbose_name='Test'),
+        ),
+        migrations.CreateModel(
+            name='QuestionBank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Nomi')),
+                ('description', models.TextField(blank=True, verbose_name='Tavsif')),
+                ('version', models.PositiveIntegerField(default=1, editable=False, verbose_name='Versiya')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_banks', to='courses.course', verbose_name='Kurs')),
+            ],
+            options={
+                'verbose_name': 'Savollar banki',
+                'verbose_name_plural': 'Savollar banklari',
+                'ordering': ['title'],
+            },
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='bank',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='assessments.questionbank', verbose_name='Bank'),
+        ),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.CheckConstraint(condition=models.Q(('quiz__isnull', False), ('bank__isnull', False), _connector='OR'), name='question_quiz_or_bank'),
+        ),
+        migrations.AddField(
+            model_name='quizpoolrule',
+            name='bank',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pool_rules', to='assessments.questionbank', verbose_name='Bank'),
+        ),
+        migrations.AddField(
+            model_name='quizpoolrule',
+            name='quiz',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pool_rules', to='assessments.quiz', verbose_name='Test'),
+        ),
+    ]
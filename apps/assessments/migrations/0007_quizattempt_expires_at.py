@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:11
+
+from django.conf import settings
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_expires_at(apps, schema_editor):
+    QuizAttempt = apps.get_model('assessments', 'QuizAttempt')
+
+    # Faqat tugatilmagan urinishlar (ular kam) - yakunlanganlarga muddat kerak emas
+    attempts = list(
+        QuizAttempt.objects.filter(
+            completed_at__isnull=True,
+            quiz__time_limit_minutes__gt=0
+        ).select_related('quiz')
+    )
+    for attempt in attempts:
+        attempt.expires_at = attempt.started_at + timedelta(minutes=attempt.quiz.time_limit_minutes)
+    QuizAttempt.objects.bulk_update(attempts, ['expires_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0006_question_banks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['expires_at'], name='attempt_open_expires_idx'),
+        ),
+        migrations.RunPython(fill_expires_at, migrations.RunPython.noop),
+    ]
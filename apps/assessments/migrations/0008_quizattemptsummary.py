@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+
+
+def fill_summaries(apps, schema_editor):
+    QuizAttempt = apps.get_model('assessments', 'QuizAttempt')
+    QuizAttemptSummary = apps.get_model('assessments', 'QuizAttemptSummary')
+
+    rows = QuizAttempt.objects.order_by().values('quiz_id', 'student_id').annotate(
+        used=Count('pk'),
+        best=Max('score', filter=Q(completed_at__isnull=False)),
+        passed=Max(
+            Case(When(is_passed=True, then=Value(1)), default=Value(0), output_field=IntegerField()),
+            filter=Q(completed_at__isnull=False)
+        ),
+        ongoing=Max('pk', filter=Q(completed_at__isnull=True)),
+    )
+    QuizAttemptSummary.objects.bulk_create([
+        QuizAttemptSummary(
+            quiz_id=row['quiz_id'],
+            student_id=row['student_id'],
+            attempts_used=row['used'],
+            best_score=row['best'],
+            is_passed=None if row['passed'] is None else bool(row['passed']),
+            ongoing_attempt_id=row['ongoing'],
+        )
+        for row in rows.iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0007_quizattempt_expires_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttemptSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts_used', models.PositiveIntegerField(default=0, verbose_name='Urinishlar soni')),
+                ('best_score', models.PositiveIntegerField(blank=True, null=True, verbose_name='Eng yaxshi ball (%)')),
+                ('is_passed', models.BooleanField(null=True, verbose_name="O'tdimi")),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ongoing_attempt', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='assessments.quizattempt', verbose_name='Davom etayotgan urinish')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_summaries', to='assessments.quiz', verbose_name='Test')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_summaries', to=settings.AUTH_USER_MODEL, verbose_name='Talaba')),
+            ],
+            options={
+                'verbose_name': 'Urinishlar xulosasi',
+                'verbose_name_plural': 'Urinishlar xulosalari',
+                'unique_together': {('quiz', 'student')},
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0008_quizattemptsummary'),
+        ('courses', '0003_enrollment_completed_lessons'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quiz_weight', models.PositiveSmallIntegerField(default=50, verbose_name='Test ulushi (%)')),
+                ('assignment_weight', models.PositiveSmallIntegerField(default=30, verbose_name='Topshiriq ulushi (%)')),
+                ('attendance_weight', models.PositiveSmallIntegerField(default=20, verbose_name='Davomat ulushi (%)')),
+                ('grade_a', models.PositiveSmallIntegerField(default=90, verbose_name='A (minimal ball)')),
+                ('grade_b', models.PositiveSmallIntegerField(default=80, verbose_name='B (minimal ball)')),
+                ('grade_c', models.PositiveSmallIntegerField(default=70, verbose_name='C (minimal ball)')),
+                ('grade_d', models.PositiveSmallIntegerField(default=60, verbose_name='D (minimal ball)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grading_policy', to='courses.course', verbose_name='Kurs')),
+            ],
+            options={
+                'verbose_name': 'Baholash siyosati',
+                'verbose_name_plural': 'Baholash siyosatlari',
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0009_gradingpolicy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegradeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'Bajarilmoqda'), ('done', 'Yakunlandi'), ('failed', 'Xatolik')], default='running', max_length=20, verbose_name='Holat')),
+                ('attempts_total', models.PositiveIntegerField(default=0, verbose_name='Urinishlar')),
+                ('attempts_processed', models.PositiveIntegerField(default=0, verbose_name='Qayta baholangan')),
+                ('attempts_changed', models.PositiveIntegerField(default=0, verbose_name="Bali o'zgargan")),
+                ('passed_flipped', models.PositiveIntegerField(default=0, verbose_name="Natijasi o'zgargan")),
+                ('error', models.TextField(blank=True, verbose_name='Xatolik')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='regrade_runs', to='assessments.quiz', verbose_name='Test')),
+                ('started_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Boshlagan')),
+            ],
+            options={
+                'verbose_name': 'Qayta baholash',
+                'verbose_name_plural': 'Qayta baholashlar',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RegradeChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_score', models.PositiveIntegerField(null=True, verbose_name='Oldingi ball (%)')),
+                ('new_score', models.PositiveIntegerField(null=True, verbose_name='Yangi ball (%)')),
+                ('old_passed', models.BooleanField(null=True, verbose_name="Oldin o'tganmi")),
+                ('new_passed', models.BooleanField(null=True, verbose_name="Endi o'tganmi")),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='regrade_changes', to='assessments.quizattempt', verbose_name='Urinish')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Talaba')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='assessments.regraderun', verbose_name='Qayta baholash')),
+            ],
+            options={
+                'verbose_name': "Qayta baholash o'zgarishi",
+                'verbose_name_plural': "Qayta baholash o'zgarishlari",
+                'ordering': ['student__last_name', 'student__first_name', 'attempt'],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:26
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def fill_selections(apps, schema_editor):
+    QuizAttempt = apps.get_model('assessments', 'QuizAttempt')
+    StudentAnswer = apps.get_model('assessments', 'StudentAnswer')
+    through = StudentAnswer.selected_answers.through
+
+    # Eski qatorlar o'chirilmaydi - `compact_selections --purge` bilan alohida tozalanadi
+    attempt_ids = list(
+        QuizAttempt.objects.filter(completed_at__isnull=False, selections__isnull=True).order_by('pk').values_list('pk', flat=True)
+    )
+    for start in range(0, len(attempt_ids), BATCH_SIZE):
+        batch = attempt_ids[start:start + BATCH_SIZE]
+        selections = {attempt_id: {} for attempt_id in batch}
+        for attempt_id, question_id in StudentAnswer.objects.filter(attempt_id__in=batch).values_list(
+            'attempt_id', 'question_id'
+        ):
+            selections[attempt_id][str(question_id)] = []
+        for attempt_id, question_id, answer_id in through.objects.filter(
+            studentanswer__attempt_id__in=batch
+        ).order_by('answer_id').values_list('studentanswer__attempt_id', 'studentanswer__question_id', 'answer_id'):
+            selections[attempt_id][str(question_id)].append(answer_id)
+
+        QuizAttempt.objects.bulk_update(
+            [QuizAttempt(pk=attempt_id, selections=value) for attempt_id, value in selections.items()],
+            ['selections'],
+            batch_size=BATCH_SIZE
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0010_regrade_audit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='selections',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='Tanlangan javoblar'),
+        ),
+        migrations.RunPython(fill_selections, migrations.RunPython.noop),
+    ]
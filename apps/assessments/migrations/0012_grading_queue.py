@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_graded_at(apps, schema_editor):
+    QuizAttempt = apps.get_model('assessments', 'QuizAttempt')
+
+    # Mavjud yakunlangan urinishlar yuborilganda baholangan
+    QuizAttempt.objects.filter(completed_at__isnull=False).update(graded_at=models.F('completed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0011_quizattempt_selections'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='graded_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        # Indeks to'ldirilgandan keyin quriladi (navbat bo'sh bo'ladi)
+        migrations.RunPython(fill_graded_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('completed_at__isnull', False), ('graded_at__isnull', True)), fields=['completed_at'], name='attempt_grading_queue_idx'),
+        ),
+    ]
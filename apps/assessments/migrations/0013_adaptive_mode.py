@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0012_grading_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemCalibration',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calibration', serialize=False, to='assessments.question', verbose_name='Savol')),
+                ('model', models.CharField(choices=[('1pl', '1PL (Rasch)'), ('2pl', '2PL')], default='2pl', max_length=3, verbose_name='Model')),
+                ('discrimination', models.FloatField(default=1.0, verbose_name='Ajratish (a)')),
+                ('difficulty', models.FloatField(default=0.0, verbose_name='Qiyinlik (b)')),
+                ('responses', models.PositiveIntegerField(default=0, verbose_name='Javoblar soni')),
+                ('calibrated_at', models.DateTimeField(auto_now=True, verbose_name='Baholangan vaqt')),
+            ],
+            options={
+                'verbose_name': 'Savol kalibrovkasi',
+                'verbose_name_plural': 'Savollar kalibrovkasi',
+            },
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='adaptive_max_questions',
+            field=models.PositiveIntegerField(default=20, verbose_name="Savollar soni (ko'pi bilan)"),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='adaptive_target_se',
+            field=models.FloatField(blank=True, default=0.35, help_text="Qobiliyat bahosi xatosi shundan kichik bo'lganda test tugaydi (bo'sh - doim to'liq)", null=True, verbose_name="To'xtash aniqligi (SE)"),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='is_adaptive',
+            field=models.BooleanField(default=False, help_text="Savollar bittadan, eng ko'p ma'lumot beradigani tanlanadi; ball qobiliyat bahosidan hisoblanadi", verbose_name='Moslashuvchan rejim'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0013_adaptive_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='results',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='Savollar natijasi'),
+        ),
+    ]
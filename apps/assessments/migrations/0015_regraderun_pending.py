@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0014_quizattempt_results'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='regraderun',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Navbatda'), ('running', 'Bajarilmoqda'), ('done', 'Yakunlandi'), ('failed', 'Xatolik')], default='pending', max_length=20, verbose_name='Holat'),
+        ),
+    ]
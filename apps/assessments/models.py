@@ -1,5 +1,6 @@
 # apps/assessments/models.py
 
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from apps.accounts.models import User
@@ -35,16 +36,43 @@ class Quiz(models.Model):
         default=True,
         verbose_name="Savollarni aralashtirish"
     )
+    shuffle_answers = models.BooleanField(
+        default=False,
+        verbose_name="Javoblarni aralashtirish"
+    )
     show_correct_answers = models.BooleanField(
         default=False,
         verbose_name="To'g'ri javoblarni ko'rsatish"
     )
 
+    # Moslashuvchan rejim: keyingi savol talabaning javoblariga qarab tanlanadi (IRT)
+    is_adaptive = models.BooleanField(
+        default=False,
+        verbose_name="Moslashuvchan rejim",
+        help_text="Savollar bittadan, eng ko'p ma'lumot beradigani tanlanadi; ball qobiliyat bahosidan hisoblanadi"
+    )
+    adaptive_max_questions = models.PositiveIntegerField(
+        default=20,
+        verbose_name="Savollar soni (ko'pi bilan)"
+    )
+    adaptive_target_se = models.FloatField(
+        null=True,
+        blank=True,
+        default=0.35,
+        verbose_name="To'xtash aniqligi (SE)",
+        help_text="Qobiliyat bahosi xatosi shundan kichik bo'lganda test tugaydi (bo'sh - doim to'liq)"
+    )
+
     # Vaqt oralig'i
     available_from = models.DateTimeField(verbose_name="Boshlanish vaqti")
     available_until = models.DateTimeField(verbose_name="Tugash vaqti")
 
     is_active = models.BooleanField(default=True, verbose_name="Faol")
+
+    question_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Savollar soni")
+    # Savol/javob o'zgarganda oshadi (kompilyatsiya qilingan nusxa keshi kaliti)
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name="Versiya")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,9 +84,6 @@ class Quiz(models.Model):
     def __str__(self):
         return f"{self.course.code} - {self.title}"
 
-    def question_count(self):
-        return self.questions.count()
-
     def total_points(self):
         return self.questions.aggregate(total=models.Sum('points'))['total'] or 0
 
@@ -77,6 +102,31 @@ class Quiz(models.Model):
         return 'inactive'
 
 
+class QuestionBank(models.Model):
+    """Savollar banki"""
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='question_banks',
+        verbose_name="Kurs"
+    )
+    title = models.CharField(max_length=200, verbose_name="Nomi")
+    description = models.TextField(blank=True, verbose_name="Tavsif")
+
+    # Bank savollari o'zgarganda oshadi (tanlash indeksi keshi kaliti)
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name="Versiya")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Savollar banki"
+        verbose_name_plural = "Savollar banklari"
+        ordering = ['title']
+
+    def __str__(self):
+        return f"{self.course.code} - {self.title}"
+
+
 class Question(models.Model):
     """Savol"""
 
@@ -85,12 +135,40 @@ class Question(models.Model):
         MULTIPLE = 'multiple', 'Ko\'p tanlov'
         TRUE_FALSE = 'true_false', 'To\'g\'ri/Noto\'g\'ri'
 
+    class Difficulty(models.TextChoices):
+        EASY = 'easy', 'Oson'
+        MEDIUM = 'medium', 'O\'rtacha'
+        HARD = 'hard', 'Qiyin'
+
+    # Savol yoki testga, yoki bankka tegishli bo'ladi
     quiz = models.ForeignKey(
         Quiz,
         on_delete=models.CASCADE,
+        null=True,
+        blank=True,
         related_name='questions',
         verbose_name="Test"
     )
+    bank = models.ForeignKey(
+        QuestionBank,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='questions',
+        verbose_name="Bank"
+    )
+    difficulty = models.CharField(
+        max_length=10,
+        choices=Difficulty.choices,
+        default=Difficulty.MEDIUM,
+        verbose_name="Qiyinlik"
+    )
+    tags = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Teglar",
+        help_text="Vergul bilan ajrating"
+    )
     question_type = models.CharField(
         max_length=20,
         choices=Type.choices,
@@ -107,6 +185,12 @@ class Question(models.Model):
         verbose_name = "Savol"
         verbose_name_plural = "Savollar"
         ordering = ['order']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(quiz__isnull=False) | models.Q(bank__isnull=False),
+                name='question_quiz_or_bank'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.text[:50]}..."
@@ -114,6 +198,46 @@ class Question(models.Model):
     def correct_answers(self):
         return self.answers.filter(is_correct=True)
 
+    def tag_list(self):
+        return [tag.strip().lower() for tag in self.tags.split(',') if tag.strip()]
+
+
+class QuizPoolRule(models.Model):
+    """Bankdan har bir urinish uchun tasodifiy savollar tanlash qoidasi"""
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.CASCADE,
+        related_name='pool_rules',
+        verbose_name="Test"
+    )
+    bank = models.ForeignKey(
+        QuestionBank,
+        on_delete=models.CASCADE,
+        related_name='pool_rules',
+        verbose_name="Bank"
+    )
+    count = models.PositiveIntegerField(default=5, verbose_name="Savollar soni")
+    difficulty = models.CharField(
+        max_length=10,
+        choices=Question.Difficulty.choices,
+        blank=True,
+        verbose_name="Qiyinlik",
+        help_text="Bo'sh - har qanday"
+    )
+    tag = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Teg",
+        help_text="Bo'sh - har qanday"
+    )
+
+    class Meta:
+        verbose_name = "Tanlash qoidasi"
+        verbose_name_plural = "Tanlash qoidalari"
+
+    def __str__(self):
+        return f"{self.quiz.title}: {self.count} ta - {self.bank.title}"
+
 
 class Answer(models.Model):
     """Javob varianti"""
@@ -136,6 +260,39 @@ class Answer(models.Model):
         return self.text
 
 
+class ItemCalibration(models.Model):
+    """Savolning IRT parametrlari (tarixiy javoblardan oflayn baholanadi)"""
+
+    class Model(models.TextChoices):
+        ONE_PL = '1pl', '1PL (Rasch)'
+        TWO_PL = '2pl', '2PL'
+
+    question = models.OneToOneField(
+        Question,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='calibration',
+        verbose_name="Savol"
+    )
+    model = models.CharField(
+        max_length=3,
+        choices=Model.choices,
+        default=Model.TWO_PL,
+        verbose_name="Model"
+    )
+    discrimination = models.FloatField(default=1.0, verbose_name="Ajratish (a)")
+    difficulty = models.FloatField(default=0.0, verbose_name="Qiyinlik (b)")
+    responses = models.PositiveIntegerField(default=0, verbose_name="Javoblar soni")
+    calibrated_at = models.DateTimeField(auto_now=True, verbose_name="Baholangan vaqt")
+
+    class Meta:
+        verbose_name = "Savol kalibrovkasi"
+        verbose_name_plural = "Savollar kalibrovkasi"
+
+    def __str__(self):
+        return f"{self.question_id}: a={self.discrimination:.2f}, b={self.difficulty:.2f}"
+
+
 class QuizAttempt(models.Model):
     """Test urinishi"""
     quiz = models.ForeignKey(
@@ -153,6 +310,10 @@ class QuizAttempt(models.Model):
 
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Oxirgi baholangan vaqt (yakunlangan, lekin bo'sh - baholash navbatida)
+    graded_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Vaqt chegarasi (urinish boshida belgilanadi, chegarasiz testda bo'sh)
+    expires_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     score = models.PositiveIntegerField(null=True, blank=True, verbose_name="Ball (%)")
     points_earned = models.PositiveIntegerField(default=0, verbose_name="To'plangan ball")
@@ -160,58 +321,75 @@ class QuizAttempt(models.Model):
 
     is_passed = models.BooleanField(null=True, verbose_name="O'tdimi")
 
+    # Savol/javob tartibi uchun urinish boshida tanlanadi
+    shuffle_seed = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # Banklardan tanlangan savollar bilan urinish tarkibi (bo'sh - testning barcha savollari)
+    question_ids = models.JSONField(default=list, blank=True, editable=False)
+
+    # Avtomatik saqlangan javoblar: {"savol_id": [javob_id, ...]}
+    draft = models.JSONField(default=dict, blank=True, verbose_name="Qoralama")
+    # Yakunlangan urinish javoblari: {"savol_id": [javob_id, ...]} (bo'sh - StudentAnswer qatorlarida)
+    selections = models.JSONField(null=True, blank=True, editable=False, verbose_name="Tanlangan javoblar")
+    # Siqilgan usulda savollar natijasi: {"savol_id": [to'g'rimi, ball]} (baholangandagi kalit bo'yicha)
+    results = models.JSONField(null=True, blank=True, editable=False, verbose_name="Savollar natijasi")
+
     class Meta:
         verbose_name = "Test urinishi"
         verbose_name_plural = "Test urinishlari"
         ordering = ['-started_at']
+        indexes = [
+            # Muddati o'tgan, tugatilmagan urinishlarni topish uchun
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(completed_at__isnull=True),
+                name='attempt_open_expires_idx'
+            ),
+            # Baholash navbati (yuborilgan, hali baholanmagan urinishlar)
+            models.Index(
+                fields=['completed_at'],
+                condition=models.Q(completed_at__isnull=False, graded_at__isnull=True),
+                name='attempt_grading_queue_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.quiz.title}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.expires_at is None and self.quiz.time_limit_minutes:
+            self.expires_at = timezone.now() + timezone.timedelta(minutes=self.quiz.time_limit_minutes)
+        super().save(*args, **kwargs)
+
     def is_completed(self):
         return self.completed_at is not None
 
+    def is_graded(self):
+        return self.graded_at is not None
+
     def time_remaining(self):
-        if not self.quiz.time_limit_minutes or self.is_completed():
+        if self.is_completed():
+            return None
+        if self.expires_at is not None:
+            remaining = self.expires_at - timezone.now()
+        elif self.quiz.time_limit_minutes:
+            elapsed = timezone.now() - self.started_at
+            remaining = timezone.timedelta(minutes=self.quiz.time_limit_minutes) - elapsed
+        else:
             return None
-        elapsed = timezone.now() - self.started_at
-        limit = timezone.timedelta(minutes=self.quiz.time_limit_minutes)
-        remaining = limit - elapsed
         if remaining.total_seconds() <= 0:
             return 0
         return int(remaining.total_seconds())
 
     def calculate_score(self):
-        total_points = 0
-        earned_points = 0
-
-        for student_answer in self.student_answers.all():
-            question = student_answer.question
-            total_points += question.points
-
-            correct_answers = set(question.correct_answers().values_list('id', flat=True))
-            selected_answers = set(student_answer.selected_answers.values_list('id', flat=True))
-
-            if correct_answers == selected_answers:
-                student_answer.is_correct = True
-                student_answer.points_earned = question.points
-                earned_points += question.points
-            else:
-                student_answer.is_correct = False
-                student_answer.points_earned = 0
-
-            student_answer.save()
-
-        self.points_possible = total_points
-        self.points_earned = earned_points
-        self.score = int((earned_points / total_points) * 100) if total_points > 0 else 0
-        self.is_passed = self.score >= self.quiz.passing_score
+        """Urinishni baholash va yakunlash (savollar soniga bog'liq bo'lmagan so'rovlar soni)"""
+        from .grading import grade_attempts
+
         self.completed_at = timezone.now()
-        self.save()
+        grade_attempts([self])
 
 
 class StudentAnswer(models.Model):
-    """Talaba javobi"""
+    """Talaba javobi (eski saqlash usuli; siqilgan usulda javoblar QuizAttempt.selections da)"""
     attempt = models.ForeignKey(
         QuizAttempt,
         on_delete=models.CASCADE,
@@ -241,8 +419,183 @@ class StudentAnswer(models.Model):
         return f"{self.attempt.student.username} - {self.question}"
 
 
+class QuizAttemptSummary(models.Model):
+    """Talabaning test bo'yicha urinishlari xulosasi (urinishlardan hosil qilinadi)"""
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.CASCADE,
+        related_name='attempt_summaries',
+        verbose_name="Test"
+    )
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='quiz_summaries',
+        verbose_name="Talaba"
+    )
+
+    attempts_used = models.PositiveIntegerField(default=0, verbose_name="Urinishlar soni")
+    best_score = models.PositiveIntegerField(null=True, blank=True, verbose_name="Eng yaxshi ball (%)")
+    is_passed = models.BooleanField(null=True, verbose_name="O'tdimi")
+    ongoing_attempt = models.ForeignKey(
+        QuizAttempt,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Davom etayotgan urinish"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Urinishlar xulosasi"
+        verbose_name_plural = "Urinishlar xulosalari"
+        unique_together = ['quiz', 'student']
+
+    def __str__(self):
+        return f"{self.student.username} - {self.quiz.title}"
+
+    @property
+    def completed_count(self):
+        return self.attempts_used - (1 if self.ongoing_attempt_id else 0)
+
+
+class RegradeRun(models.Model):
+    """Testni qayta baholash (javob kaliti o'zgargandan keyin) - audit yozuvi"""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Navbatda'
+        RUNNING = 'running', 'Bajarilmoqda'
+        DONE = 'done', 'Yakunlandi'
+        FAILED = 'failed', 'Xatolik'
+
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.CASCADE,
+        related_name='regrade_runs',
+        verbose_name="Test"
+    )
+    started_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Boshlagan"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name="Holat"
+    )
+
+    attempts_total = models.PositiveIntegerField(default=0, verbose_name="Urinishlar")
+    attempts_processed = models.PositiveIntegerField(default=0, verbose_name="Qayta baholangan")
+    attempts_changed = models.PositiveIntegerField(default=0, verbose_name="Bali o'zgargan")
+    passed_flipped = models.PositiveIntegerField(default=0, verbose_name="Natijasi o'zgargan")
+    error = models.TextField(blank=True, verbose_name="Xatolik")
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Qayta baholash"
+        verbose_name_plural = "Qayta baholashlar"
+        ordering = ['-started_at']
+
+    def is_finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+    def __str__(self):
+        return f"{self.quiz.title} - {self.started_at:%d.%m.%Y %H:%M}"
+
+
+class RegradeChange(models.Model):
+    """Qayta baholashda natijasi o'zgargan urinish"""
+    run = models.ForeignKey(
+        RegradeRun,
+        on_delete=models.CASCADE,
+        related_name='changes',
+        verbose_name="Qayta baholash"
+    )
+    attempt = models.ForeignKey(
+        QuizAttempt,
+        on_delete=models.CASCADE,
+        related_name='regrade_changes',
+        verbose_name="Urinish"
+    )
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Talaba"
+    )
+
+    old_score = models.PositiveIntegerField(null=True, verbose_name="Oldingi ball (%)")
+    new_score = models.PositiveIntegerField(null=True, verbose_name="Yangi ball (%)")
+    old_passed = models.BooleanField(null=True, verbose_name="Oldin o'tganmi")
+    new_passed = models.BooleanField(null=True, verbose_name="Endi o'tganmi")
+
+    class Meta:
+        verbose_name = "Qayta baholash o'zgarishi"
+        verbose_name_plural = "Qayta baholash o'zgarishlari"
+        ordering = ['student__last_name', 'student__first_name', 'attempt']
+
+    def __str__(self):
+        return f"{self.student.username}: {self.old_score}% -> {self.new_score}%"
+
+    def passed_flipped(self):
+        return self.old_passed != self.new_passed
+
+
+class GradingPolicy(models.Model):
+    """Kurs baholash siyosati: ulushlar va harf baho chegaralari"""
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='grading_policy',
+        verbose_name="Kurs"
+    )
+
+    quiz_weight = models.PositiveSmallIntegerField(default=50, verbose_name="Test ulushi (%)")
+    assignment_weight = models.PositiveSmallIntegerField(default=30, verbose_name="Topshiriq ulushi (%)")
+    attendance_weight = models.PositiveSmallIntegerField(default=20, verbose_name="Davomat ulushi (%)")
+
+    grade_a = models.PositiveSmallIntegerField(default=90, verbose_name="A (minimal ball)")
+    grade_b = models.PositiveSmallIntegerField(default=80, verbose_name="B (minimal ball)")
+    grade_c = models.PositiveSmallIntegerField(default=70, verbose_name="C (minimal ball)")
+    grade_d = models.PositiveSmallIntegerField(default=60, verbose_name="D (minimal ball)")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Baholash siyosati"
+        verbose_name_plural = "Baholash siyosatlari"
+
+    def __str__(self):
+        return f"{self.course.code} - baholash siyosati"
+
+    def clean(self):
+        if self.quiz_weight + self.assignment_weight + self.attendance_weight != 100:
+            raise ValidationError("Ulushlar yig'indisi 100% bo'lishi kerak!")
+        if not (100 >= self.grade_a > self.grade_b > self.grade_c > self.grade_d):
+            raise ValidationError("Chegaralar kamayish tartibida bo'lishi kerak: A > B > C > D")
+
+    @classmethod
+    def for_course(cls, course):
+        """Kurs siyosati (belgilanmagan bo'lsa standart, saqlanmagan nusxa)"""
+        policy = getattr(course, 'grading_policy', None)
+        return policy if policy is not None else cls(course=course)
+
+
 class Grade(models.Model):
-    """Yakuniy baho"""
+    """Yakuniy baho
+
+    Test va davomat ballari, jami va harf baho kirishlar o'zgarganda `grades` moduli orqali
+    hisoblanadi; topshiriq bali qo'lda kiritiladi.
+    """
     student = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -296,25 +649,3 @@ class Grade(models.Model):
 
     def __str__(self):
         return f"{self.student.username} - {self.course.code} - {self.letter_grade}"
-
-    def calculate_total(self):
-        # 50% test, 30% topshiriq, 20% davomat
-        self.total_score = (
-                float(self.quiz_score) * 0.5 +
-                float(self.assignment_score) * 0.3 +
-                float(self.attendance_score) * 0.2
-        )
-        self.letter_grade = self.get_letter_grade()
-        self.save()
-
-    def get_letter_grade(self):
-        score = float(self.total_score)
-        if score >= 90:
-            return 'A'
-        elif score >= 80:
-            return 'B'
-        elif score >= 70:
-            return 'C'
-        elif score >= 60:
-            return 'D'
-        return 'F'
\ No newline at end of file
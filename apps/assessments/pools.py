@@ -0,0 +1,58 @@
+# apps/assessments/pools.py
+
+import random
+
+from django.core.cache import cache
+
+from .models import Question
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def pool_index(rule):
+    """Qoidaga mos savollar id lari (faqat id lar, bank versiyasi bo'yicha keshlanadi)"""
+    bank = rule.bank
+    tag = rule.tag.strip().lower()
+    key = f'assessments:pool:{bank.pk}:v{bank.version}:{rule.difficulty}:{tag}'
+
+    ids = cache.get(key)
+    if ids is None:
+        questions = Question.objects.filter(bank_id=bank.pk).order_by('pk')
+        if rule.difficulty:
+            questions = questions.filter(difficulty=rule.difficulty)
+
+        if tag:
+            questions = questions.filter(tags__icontains=tag)
+            ids = tuple(
+                pk for pk, tags in questions.values_list('pk', 'tags').iterator()
+                if tag in [item.strip().lower() for item in tags.split(',')]
+            )
+        else:
+            ids = tuple(questions.values_list('pk', flat=True).iterator())
+
+        cache.set(key, ids, CACHE_TIMEOUT)
+    return ids
+
+
+def sample_attempt_questions(quiz, seed):
+    """Urinish uchun savollar tarkibi: testning o'z savollari + banklardan tanlanganlar
+
+    Test qoidalari bo'lmasa bo'sh ro'yxat qaytadi (urinish testning barcha savollaridan foydalanadi).
+    """
+    rules = list(quiz.pool_rules.select_related('bank').order_by('pk'))
+    if not rules:
+        return []
+
+    rng = random.Random(seed)
+    chosen = list(quiz.questions.order_by('order', 'pk').values_list('pk', flat=True))
+    taken = set(chosen)
+
+    for rule in rules:
+        candidates = pool_index(rule)
+        # Oldingi qoidalar bilan takrorlanishlar sonidan ko'p bo'lmaydi
+        sample_size = min(len(candidates), rule.count + len(taken))
+        picked = [pk for pk in rng.sample(candidates, sample_size) if pk not in taken][:rule.count]
+        chosen += picked
+        taken.update(picked)
+
+    return chosen
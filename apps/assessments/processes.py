@@ -0,0 +1,14 @@
+# apps/assessments/processes.py
+
+import os
+
+import django
+
+
+def init_worker(settings_module):
+    """Yangi (spawn) jarayonda Django ni ota jarayon sozlamalari bilan ishga tushirish
+
+    Modul modellarni import qilmaydi - jarayon ochilganda ilovalar hali yuklanmagan.
+    """
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    django.setup()
@@ -0,0 +1,174 @@
+# apps/assessments/regrade.py
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Quiz, QuizAttempt, RegradeRun, RegradeChange
+from .grading import grade_attempts
+from .processes import init_worker
+from . import live
+
+CHUNK_SIZE = 200
+# Buyruq uchun standart jarayonlar soni - DB ulanishlari va xotira protsessorlar soniga bog'liq bo'lmasin
+WORKERS = 4
+
+
+def regrade_chunk(attempt_ids):
+    """Urinishlar bo'lagini qayta baholash
+
+    Natijasi o'zgarganlar uchun (urinish_id, talaba_id, eski_ball, eski_natija, yangi_ball, yangi_natija)
+    qaytadi. Jarayonlar havzasida ham ishlaydi (faqat id lar uzatiladi).
+    """
+    with transaction.atomic():
+        attempts = list(
+            QuizAttempt.objects.select_for_update(of=('self',)).select_related('quiz').filter(
+                pk__in=attempt_ids,
+                completed_at__isnull=False
+            ).order_by('pk')
+        )
+        before = {attempt.pk: (attempt.score, attempt.is_passed) for attempt in attempts}
+        grade_attempts(attempts)
+
+    return [
+        (attempt.pk, attempt.student_id, *before[attempt.pk], attempt.score, attempt.is_passed)
+        for attempt in attempts
+        if before[attempt.pk] != (attempt.score, attempt.is_passed)
+    ]
+
+
+def _run_chunks(chunks, workers):
+    """(bo'lak, o'zgarishlar) juftliklari - tugash tartibida"""
+    # SQLite bir vaqtda faqat bitta yozuvchini qo'llaydi
+    if workers <= 1 or len(chunks) <= 1 or connection.vendor == 'sqlite':
+        for chunk in chunks:
+            yield chunk, regrade_chunk(chunk)
+        return
+
+    # fork ga tayanmaslik uchun jarayonlar noldan ishga tushiriladi
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+        initargs=(settings.SETTINGS_MODULE,)
+    ) as pool:
+        futures = {pool.submit(regrade_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def queue_regrade(quiz, started_by=None):
+    """Qayta baholashni navbatga qo'yish - `regrade_quiz --pending` ishchisi bajaradi
+
+    Test uchun navbatda turgan qayta baholash bo'lsa yangisi yaratilmaydi, o'sha qaytadi.
+    """
+    with transaction.atomic():
+        # Bir vaqtda bosilgan tugmalar bitta yozuv yaratishi uchun test qatori qulflanadi
+        Quiz.objects.select_for_update().filter(pk=quiz.pk).first()
+        run = RegradeRun.objects.filter(quiz=quiz, status=RegradeRun.Status.PENDING).first()
+        if run is None:
+            run = RegradeRun.objects.create(
+                quiz=quiz,
+                started_by=started_by,
+                status=RegradeRun.Status.PENDING,
+                attempts_total=QuizAttempt.objects.filter(quiz=quiz, completed_at__isnull=False).count()
+            )
+    return run
+
+
+def claim_pending_run():
+    """Navbatdagi eng eski qayta baholashni olish (bir nechta ishchi bir yozuvni olmaydi)"""
+    with transaction.atomic():
+        run = RegradeRun.objects.select_for_update(skip_locked=True, of=('self',)).select_related('quiz').filter(
+            status=RegradeRun.Status.PENDING
+        ).order_by('started_at', 'pk').first()
+        if run is not None:
+            run.status = RegradeRun.Status.RUNNING
+            run.save(update_fields=['status'])
+    return run
+
+
+def regrade_quiz(quiz, started_by=None, chunk_size=CHUNK_SIZE, workers=1, progress=None):
+    """Testning barcha yakunlangan urinishlarini darhol qayta baholash (buyruq uchun)"""
+    run = RegradeRun.objects.create(quiz=quiz, started_by=started_by, status=RegradeRun.Status.RUNNING)
+    return run_regrade(run, chunk_size=chunk_size, workers=workers, progress=progress)
+
+
+def run_regrade(run, chunk_size=CHUNK_SIZE, workers=1, progress=None):
+    """Olingan qayta baholashni joriy javob kaliti bo'yicha bajarish
+
+    `progress(bajarilgan, jami)` har bir bo'lakdan keyin chaqiriladi; jarayon yozuvda ham
+    yangilanib boriladi (sahifa shuni so'raydi).
+    """
+    quiz = run.quiz
+    attempt_ids = list(
+        QuizAttempt.objects.filter(quiz=quiz, completed_at__isnull=False).order_by('pk').values_list('pk', flat=True)
+    )
+    run.attempts_total = len(attempt_ids)
+    RegradeRun.objects.filter(pk=run.pk).update(attempts_total=run.attempts_total)
+    chunk_size = max(chunk_size, 1)
+    chunks = [attempt_ids[start:start + chunk_size] for start in range(0, len(attempt_ids), chunk_size)]
+
+    changes = []
+    processed = 0
+    try:
+        for chunk, chunk_changes in _run_chunks(chunks, workers):
+            changes += chunk_changes
+            processed += len(chunk)
+            RegradeRun.objects.filter(pk=run.pk).update(attempts_processed=F('attempts_processed') + len(chunk))
+            if progress:
+                progress(processed, len(attempt_ids))
+    except Exception as exc:
+        RegradeRun.objects.filter(pk=run.pk).update(
+            status=RegradeRun.Status.FAILED,
+            error=str(exc),
+            finished_at=timezone.now()
+        )
+        raise
+
+    RegradeChange.objects.bulk_create([
+        RegradeChange(
+            run=run,
+            attempt_id=attempt_id,
+            student_id=student_id,
+            old_score=old_score,
+            old_passed=old_passed,
+            new_score=new_score,
+            new_passed=new_passed
+        )
+        for attempt_id, student_id, old_score, old_passed, new_score, new_passed in changes
+    ], batch_size=500)
+
+    run.attempts_processed = processed
+    run.attempts_changed = len(changes)
+    run.passed_flipped = sum(1 for change in changes if change[3] != change[5])
+    run.status = RegradeRun.Status.DONE
+    run.finished_at = timezone.now()
+    run.save(update_fields=[
+        'attempts_processed', 'attempts_changed', 'passed_flipped', 'status', 'finished_at'
+    ])
+    # Ballar taqsimoti o'zgargan bo'lishi mumkin
+    if changes:
+        live.invalidate(quiz.pk)
+    return run
+
+
+def run_pending_regrades(chunk_size=CHUNK_SIZE, workers=1, progress=None):
+    """Navbat bo'shaguncha qayta baholashlarni bajarish; bajarilganlar ro'yxati qaytadi
+
+    Xatolik bilan tugagan yozuv FAILED bo'lib qoladi, navbat davom etadi.
+    """
+    runs = []
+    while True:
+        run = claim_pending_run()
+        if run is None:
+            return runs
+        try:
+            run_regrade(run, chunk_size=chunk_size, workers=workers, progress=progress)
+        except Exception:
+            run.refresh_from_db()
+        runs.append(run)
@@ -0,0 +1,410 @@
+# apps/assessments/services.py
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.courses.services import count_subquery, shift_counter
+from .models import Quiz, Question, QuizPoolRule, QuizAttempt, StudentAnswer
+from .compiled import get_compiled_attempt
+from .grading import (
+    ATTEMPT_SCORE_FIELDS, COMPACT, async_grading, compiled_for_attempts, encode_selections, grade_attempts,
+    grading_timeout, load_selections, pack_results, score_attempt, selection_storage
+)
+from .summaries import refresh_for_attempts
+from .grades import refresh_grades_for_attempts
+from .irt import get_item_table, next_question
+from . import live
+
+
+# ===================== HISOBLAGICHLAR =====================
+
+def quiz_question_changed(quiz_id, delta):
+    shift_counter(Quiz.objects.filter(pk=quiz_id), 'question_count', delta)
+
+
+def recount_quiz_counters(quiz_ids=None):
+    """Test savollari sonini (banklardan tanlanadiganlar bilan) bitta UPDATE bilan tiklash"""
+    quizzes = Quiz.objects.all()
+    if quiz_ids is not None:
+        quizzes = quizzes.filter(pk__in=quiz_ids)
+
+    pooled = QuizPoolRule.objects.filter(quiz=OuterRef('pk')).order_by().values('quiz').annotate(
+        total=Sum('count')
+    ).values('total')[:1]
+
+    return quizzes.update(
+        question_count=count_subquery(Question.objects.filter(quiz=OuterRef('pk')), 'quiz') + Coalesce(
+            Subquery(pooled, output_field=IntegerField()), Value(0)
+        ),
+    )
+
+
+# ===================== TOPSHIRISH =====================
+
+def clean_selections_for(question, values):
+    """Bitta savol uchun yuborilgan id larni tekshirish"""
+    valid_ids = {answer.pk for answer in question.answers}
+    selected_ids = set()
+    for value in values or ():
+        try:
+            answer_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if answer_id in valid_ids:
+            selected_ids.add(answer_id)
+    return selected_ids
+
+
+def clean_selections(compiled, posted):
+    """Yuborilgan javob id larini test tarkibi bo'yicha tekshirish (so'rovsiz)
+
+    `posted` - {savol_id: [javob_id, ...]}; begona yoki noto'g'ri id lar tashlanadi.
+    """
+    selections = {}
+    for question in compiled.questions:
+        selected_ids = clean_selections_for(question, posted.get(question.pk))
+        if selected_ids:
+            selections[question.pk] = selected_ids
+    return selections
+
+
+def merge_draft(draft, posted):
+    """Qoralama + yuborilgan forma: formadagi savollar (bo'sh bo'lsa ham) formadan, qolganlari qoralamadan
+
+    Forma asosiy manba - talaba tozalagan javob eski qoralamaga qaytmaydi. Bo'sh `posted`
+    (vaqt tugagan, yakunlovchi) - qoralamaning o'zi.
+    """
+    merged = {int(question_id): ids for question_id, ids in (draft or {}).items()}
+    merged.update(posted)
+    return merged
+
+
+def pack_selections(attempt, selections, results=None):
+    """Siqilgan usulda javoblar va savollar natijasi urinishning o'ziga yoziladi (eski usulda None qoladi)"""
+    attempt.selections = encode_selections(selections) if selection_storage() == COMPACT else None
+    pack_results(attempt, results or {})
+
+
+def write_answer_rows(attempts, selections, results=None):
+    """Eski usuldagi urinishlar uchun StudentAnswer va M2M qatorlari
+
+    `selections`, `results` - {urinish_id: {savol_id: ...}}; natijasiz qatorlar baholanmagan bo'ladi.
+    Siqilgan urinishlar o'tkazib yuboriladi.
+    """
+    attempts = [attempt for attempt in attempts if attempt.selections is None]
+    if not attempts:
+        return
+
+    student_answers = []
+    for attempt in attempts:
+        attempt_results = (results or {}).get(attempt.pk, {})
+        for question_id in selections[attempt.pk]:
+            is_correct, points = attempt_results.get(question_id, (None, 0))
+            student_answers.append(StudentAnswer(
+                attempt_id=attempt.pk,
+                question_id=question_id,
+                is_correct=is_correct,
+                points_earned=points
+            ))
+    StudentAnswer.objects.filter(attempt__in=attempts).delete()
+    StudentAnswer.objects.bulk_create(student_answers, batch_size=500)
+
+    through = StudentAnswer.selected_answers.through
+    through.objects.bulk_create([
+        through(studentanswer_id=student_answer.pk, answer_id=answer_id)
+        for student_answer in student_answers
+        for answer_id in selections[student_answer.attempt_id][student_answer.question_id]
+    ], batch_size=500)
+
+
+def submit_attempt(attempt, posted):
+    """Javoblarni saqlash va baholash: bitta tranzaksiyada o'zgarmas sonli so'rovlar
+
+    Forma asosiy manba; qoralamadan faqat formada bo'lmagan savollar olinadi (vaqt tugaganda `posted` bo'sh).
+    Urinish allaqachon yakunlangan bo'lsa (masalan, ikki marta yuborilgan) False qaytadi.
+    Navbatli baholash yoqilgan bo'lsa javoblar saqlanib, urinish navbatga qo'yiladi.
+    """
+    if async_grading():
+        return queue_attempt(attempt, posted)
+
+    compiled = get_compiled_attempt(attempt)
+    drafts = {attempt.pk: attempt.draft}
+    selections = clean_selections(compiled, merge_draft(attempt.draft, posted))
+    results = score_attempt(attempt, compiled, selections)
+    pack_selections(attempt, selections, results)
+    attempt.completed_at = timezone.now()
+
+    with transaction.atomic():
+        # Shartli UPDATE parallel yuborishlarni ham bir marta o'tkazadi
+        attempt.draft = {}
+        updated = QuizAttempt.objects.filter(pk=attempt.pk, completed_at__isnull=True).update(
+            draft={},
+            selections=attempt.selections,
+            **{field: getattr(attempt, field) for field in ATTEMPT_SCORE_FIELDS}
+        )
+        if not updated:
+            return False
+
+        write_answer_rows([attempt], {attempt.pk: selections}, {attempt.pk: results})
+        refresh_for_attempts([attempt])
+        refresh_grades_for_attempts([attempt])
+        transaction.on_commit(lambda: live.record_attempts([attempt], submitted=True, graded=True, drafts=drafts))
+
+    return True
+
+
+def queue_attempt(attempt, posted):
+    """Javoblarni baholamasdan saqlab, urinishni yakunlash (baholash navbatiga qo'yish)
+
+    Xulosa va baholar ham ishchida yangilanadi - so'rov vaqti bir vaqtda yuborayotganlar
+    soniga bog'liq emas. Urinish allaqachon yakunlangan bo'lsa False qaytadi.
+    """
+    compiled = get_compiled_attempt(attempt)
+    drafts = {attempt.pk: attempt.draft}
+    selections = clean_selections(compiled, merge_draft(attempt.draft, posted))
+    pack_selections(attempt, selections)
+    attempt.completed_at = timezone.now()
+    attempt.graded_at = None
+
+    with transaction.atomic():
+        attempt.draft = {}
+        updated = QuizAttempt.objects.filter(pk=attempt.pk, completed_at__isnull=True).update(
+            draft={},
+            selections=attempt.selections,
+            completed_at=attempt.completed_at,
+            graded_at=None
+        )
+        if not updated:
+            return False
+
+        write_answer_rows([attempt], {attempt.pk: selections})
+        transaction.on_commit(lambda: live.record_attempts([attempt], submitted=True, drafts=drafts))
+
+    return True
+
+
+def grade_submitted_attempts(batch_size=200):
+    """Navbatdagi (yuborilgan, baholanmagan) urinishlarning bir partiyasini baholash
+
+    Qatorlar SKIP LOCKED bilan qulflanadi - bir necha ishchi parallel ishlay oladi.
+    Baholangan urinishlar soni qaytadi.
+    """
+    with transaction.atomic():
+        attempts = list(
+            QuizAttempt.objects.select_for_update(skip_locked=True, of=('self',)).select_related('quiz').filter(
+                completed_at__isnull=False,
+                graded_at__isnull=True
+            ).order_by('completed_at')[:batch_size]
+        )
+        grade_attempts(attempts)
+
+    return len(attempts)
+
+
+def grade_stalled_attempt(attempt_id):
+    """Navbatda ASSESSMENTS_GRADING_TIMEOUT dan ortiq turgan urinishni so'rov ichida baholash
+
+    Ishchi ishlamayotgan bo'lsa ham talaba natijani oladi. Qator SKIP LOCKED bilan qulflanadi -
+    ishchi hozir baholayotgan urinishga tegilmaydi. Baholandimi qaytadi.
+    """
+    timeout = grading_timeout()
+    if timeout <= 0:
+        return False
+
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.select_for_update(skip_locked=True, of=('self',)).select_related('quiz').filter(
+            pk=attempt_id,
+            completed_at__lte=timezone.now() - timedelta(seconds=timeout),
+            graded_at__isnull=True
+        ).first()
+        if attempt is None:
+            return False
+        grade_attempts([attempt])
+
+    return True
+
+
+def autosave_attempt(attempt_id, student, delta):
+    """Qoralamaga o'zgarishlarni qo'shish (M2M jadvaliga tegmaydi)
+
+    `delta` - {"savol_id": [javob_id, ...]}; bo'sh ro'yxat javobni olib tashlaydi.
+    (urinish, saqlandimi) qaytaradi; urinish topilmasa urinish None bo'ladi.
+    """
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.select_for_update(of=('self',)).select_related('quiz').filter(
+            pk=attempt_id,
+            student=student
+        ).first()
+
+        if attempt is None:
+            return None, False
+        # Moslashuvchan testda javoblar faqat savol sahifasi orqali (berilgan javob o'zgarmaydi)
+        if attempt.is_completed() or attempt.time_remaining() == 0 or attempt.quiz.is_adaptive:
+            return attempt, False
+
+        questions = get_compiled_attempt(attempt).question_map
+        draft = dict(attempt.draft or {})
+
+        for key, values in delta.items():
+            try:
+                question = questions.get(int(key))
+            except (TypeError, ValueError):
+                continue
+            if question is None:
+                continue
+
+            selected = clean_selections_for(question, values)
+            if selected:
+                draft[str(question.pk)] = sorted(selected)
+            else:
+                draft.pop(str(question.pk), None)
+
+        if draft != attempt.draft:
+            answered = len(draft) - len(attempt.draft or {})
+            attempt.draft = draft
+            QuizAttempt.objects.filter(pk=attempt.pk).update(draft=draft)
+            transaction.on_commit(lambda: live.record(attempt.quiz_id, answered=answered))
+
+    return attempt, True
+
+
+# ===================== MOSLASHUVCHAN TEST =====================
+
+def adaptive_step(attempt, posted):
+    """Moslashuvchan urinish: joriy savolga javobni saqlash va kerak bo'lsa keyingi savolni tanlash
+
+    Joriy savol - oxirgi berilgan, hali javobsiz savol; `posted` - {savol_id: [javob_id, ...]}.
+    Keyingi savol keshdagi savollar jadvalidan tanlanadi (so'rovsiz), javob va yangi savol
+    bitta UPDATE bilan yoziladi. Joriy savol id si qaytadi; None - test yakunlanishi kerak
+    yoki urinish allaqachon yopilgan.
+    """
+    with transaction.atomic():
+        locked = QuizAttempt.objects.select_for_update().filter(
+            pk=attempt.pk, completed_at__isnull=True
+        ).values_list('question_ids', 'draft').first()
+        if locked is None:
+            return None
+
+        attempt.question_ids, attempt.draft = locked[0] or [], locked[1] or {}
+        delivered = list(attempt.question_ids)
+        draft = dict(attempt.draft)
+        compiled = get_compiled_attempt(attempt)
+
+        current = delivered[-1] if delivered and str(delivered[-1]) not in draft else None
+        if current is not None and current in compiled.question_map:
+            selected = clean_selections_for(compiled.question_map[current], posted.get(current))
+            if selected:
+                draft[str(current)] = sorted(selected)
+                current = None
+
+        if current is None:
+            responses = {
+                question.pk: question.correct_ids == frozenset(draft[str(question.pk)])
+                for question in compiled.questions
+                if str(question.pk) in draft
+            }
+            current = next_question(
+                attempt.quiz, get_item_table(attempt.quiz), responses, delivered, attempt.shuffle_seed
+            )
+            if current is not None:
+                delivered.append(current)
+
+        if delivered != attempt.question_ids or draft != attempt.draft:
+            answered = len(draft) - len(attempt.draft)
+            QuizAttempt.objects.filter(pk=attempt.pk).update(question_ids=delivered, draft=draft)
+            attempt.question_ids, attempt.draft = delivered, draft
+            transaction.on_commit(lambda: live.record(attempt.quiz_id, answered=answered))
+
+    return current
+
+
+# ===================== MUDDATI O'TGAN URINISHLAR =====================
+
+def finalize_attempts(attempts):
+    """Tugatilmagan urinishlarni qoralamasi bilan yakunlash (so'rovlar soni urinishlarga bog'liq emas)
+
+    Yakunlash vaqti - urinish muddati (bo'lmasa hozirgi vaqt).
+    Chaqiruvchi urinishlarni qulflagan bo'lishi kerak.
+    """
+    attempts = list(attempts)
+    if not attempts:
+        return attempts
+
+    now = timezone.now()
+    compiled = compiled_for_attempts(attempts)
+    drafts = {attempt.pk: attempt.draft for attempt in attempts}
+    selections = {}
+    results = {}
+
+    for attempt in attempts:
+        selections[attempt.pk] = clean_selections(compiled[attempt.pk], merge_draft(attempt.draft, {}))
+        results[attempt.pk] = score_attempt(attempt, compiled[attempt.pk], selections[attempt.pk])
+        pack_selections(attempt, selections[attempt.pk], results[attempt.pk])
+        attempt.completed_at = attempt.expires_at or now
+        attempt.draft = {}
+
+    with transaction.atomic():
+        write_answer_rows(attempts, selections, results)
+        QuizAttempt.objects.bulk_update(attempts, ATTEMPT_SCORE_FIELDS + ['draft', 'selections'], batch_size=500)
+        refresh_for_attempts(attempts)
+        refresh_grades_for_attempts(attempts)
+        transaction.on_commit(lambda: live.record_attempts(attempts, submitted=True, graded=True, drafts=drafts))
+
+    return attempts
+
+
+def finalize_expired_attempts(batch_size=200, grace_seconds=60):
+    """Muddati o'tgan urinishlarning bir partiyasini yakunlash; yakunlanganlar soni qaytadi
+
+    Qatorlar SKIP LOCKED bilan qulflanadi - bir necha server parallel ishlatsa ham
+    har bir urinish bir marta yakunlanadi, talabaning o'zi yuborayotgani esa kutib turadi.
+    `grace_seconds` - brauzer avtomatik yuborishiga ulgurishi uchun qo'shimcha vaqt.
+    """
+    cutoff = timezone.now() - timedelta(seconds=grace_seconds)
+
+    with transaction.atomic():
+        attempts = list(
+            QuizAttempt.objects.select_for_update(skip_locked=True, of=('self',)).select_related('quiz').filter(
+                completed_at__isnull=True,
+                expires_at__lte=cutoff
+            ).order_by('expires_at')[:batch_size]
+        )
+        finalize_attempts(attempts)
+
+    return len(attempts)
+
+
+# ===================== SIQILGAN SAQLASH =====================
+
+def compact_selections(attempt_ids, purge=False):
+    """Yakunlangan urinishlar javoblarini StudentAnswer qatorlaridan `selections` maydoniga o'tkazish
+
+    Allaqachon o'tkazilganlar tegilmaydi. `purge` - o'tkazilgan urinishlarning StudentAnswer
+    va M2M qatorlari o'chiriladi. O'tkazilgan urinishlar soni qaytadi.
+    """
+    with transaction.atomic():
+        attempts = list(
+            QuizAttempt.objects.select_for_update(of=('self',)).filter(
+                pk__in=attempt_ids,
+                completed_at__isnull=False
+            ).only('pk', 'selections', 'results')
+        )
+        legacy = [attempt for attempt in attempts if attempt.selections is None]
+        selections, rows = load_selections(legacy)
+        for attempt in legacy:
+            attempt.selections = encode_selections(selections[attempt.pk])
+            # Qatorlardagi natijalar ham ko'chiriladi - ko'rish sahifasi saqlangan ballni ko'rsatadi
+            pack_results(attempt, {
+                question_id: (rows[attempt.pk, question_id].is_correct, rows[attempt.pk, question_id].points_earned)
+                for question_id in selections[attempt.pk]
+            })
+        QuizAttempt.objects.bulk_update(legacy, ['selections', 'results'], batch_size=500)
+
+        if purge:
+            StudentAnswer.objects.filter(attempt__in=attempts).delete()
+
+    return len(legacy)
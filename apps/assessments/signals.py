@@ -0,0 +1,89 @@
+# apps/assessments/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Question, Answer, QuizPoolRule, QuizAttempt, GradingPolicy, Grade
+from . import services, live
+from .compiled import invalidate_quiz, invalidate_bank, invalidate_question
+from .summaries import refresh_for_attempts
+from .grades import refresh_grades_for_attempts, refresh_course_grades, recompute_grades
+
+
+# ===================== SAVOL =====================
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created, **kwargs):
+    if instance.quiz_id:
+        if created:
+            services.quiz_question_changed(instance.quiz_id, 1)
+        invalidate_quiz(instance.quiz_id)
+    if instance.bank_id:
+        invalidate_bank(instance.bank_id)
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, **kwargs):
+    if instance.quiz_id:
+        services.quiz_question_changed(instance.quiz_id, -1)
+        invalidate_quiz(instance.quiz_id)
+    if instance.bank_id:
+        invalidate_bank(instance.bank_id)
+
+
+# ===================== JAVOB =====================
+
+@receiver(post_save, sender=Answer)
+def answer_saved(sender, instance, **kwargs):
+    invalidate_question(instance.question_id)
+
+
+@receiver(post_delete, sender=Answer)
+def answer_deleted(sender, instance, **kwargs):
+    invalidate_question(instance.question_id)
+
+
+# ===================== BANK QOIDALARI =====================
+
+@receiver(post_save, sender=QuizPoolRule)
+@receiver(post_delete, sender=QuizPoolRule)
+def pool_rule_changed(sender, instance, **kwargs):
+    services.recount_quiz_counters([instance.quiz_id])
+    invalidate_quiz(instance.quiz_id)
+
+
+# ===================== URINISH =====================
+
+@receiver(post_save, sender=QuizAttempt)
+def attempt_saved(sender, instance, created, **kwargs):
+    if created:
+        live.record(instance.quiz_id, started=1)
+    refresh_for_attempts([instance])
+    if instance.is_completed():
+        refresh_grades_for_attempts([instance])
+
+
+@receiver(post_delete, sender=QuizAttempt)
+def attempt_deleted(sender, instance, **kwargs):
+    live.invalidate(instance.quiz_id)
+    refresh_for_attempts([instance])
+    refresh_grades_for_attempts([instance], create=False)
+
+
+# ===================== BAHO =====================
+
+@receiver(post_save, sender=GradingPolicy)
+def policy_saved(sender, instance, **kwargs):
+    refresh_course_grades([instance.course_id])
+
+
+@receiver(post_delete, sender=GradingPolicy)
+def policy_deleted(sender, instance, **kwargs):
+    # Standart siyosatga qaytish (kurs o'chirilayotgan bo'lishi mumkin - yangi qator yaratilmaydi)
+    recompute_grades(Grade.objects.filter(course_id=instance.course_id))
+
+
+@receiver(post_save, sender=Grade)
+def grade_saved(sender, instance, **kwargs):
+    # Qo'lda kiritilgan topshiriq bali bilan jami va harf bahoni yangilash
+    recompute_grades(Grade.objects.filter(pk=instance.pk))
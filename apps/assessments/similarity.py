@@ -0,0 +1,118 @@
+# apps/assessments/similarity.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .analysis import load_responses, cached_report
+
+# Bir xil noto'g'ri variant tanlash to'g'ri variantdan shuncha marta og'irroq
+WRONG_WEIGHT = 3.0
+MIN_SHARED_WRONG = 3
+MIN_SCORE = 0.6
+MAX_PAIRS = 50
+BLOCK_SIZE = 512
+
+
+@dataclass(frozen=True)
+class SuspiciousPair:
+    """Javoblari shubhali darajada o'xshash ikki urinish"""
+    attempt_a: int
+    attempt_b: int
+    student_a: int
+    student_b: int
+    score: float
+    shared_wrong: int
+    shared_correct: int
+
+    @property
+    def score_percent(self):
+        return round(self.score * 100)
+
+
+@dataclass(frozen=True)
+class SimilarityReport:
+    quiz_id: int
+    attempts: int
+    pairs: tuple
+
+
+def option_weights(responses):
+    """To'g'ri variant - 1; noto'g'ri variant 1 dan (hamma tanlagan) WRONG_WEIGHT gacha (hech kim tanlamagan)
+
+    Ommabop noto'g'ri variant to'g'ri variantdan yengil bo'lmaydi - og'irlik hech qachon 1 dan kichik emas.
+    """
+    shown = np.maximum(responses.presented.sum(axis=0)[responses.answer_column], 1)
+    share = responses.selected.sum(axis=0) / shown
+    return np.where(responses.answer_key, 1.0, 1.0 + (WRONG_WEIGHT - 1.0) * (1.0 - share))
+
+
+def find_similar_pairs(quiz, min_score=MIN_SCORE, min_shared_wrong=MIN_SHARED_WRONG, limit=MAX_PAIRS):
+    """Barcha urinishlar juftliklari uchun og'irlikli Jakkard o'xshashligi (bloklab, matritsa ko'paytmasi bilan)
+
+    Har bir urinish - javob variantlari bo'yicha bit vektor. Ikki urinish o'xshashligi -
+    umumiy tanlangan variantlar og'irligi / birlashmasi og'irligi.
+    """
+    responses = load_responses(quiz)
+    if responses is None:
+        return SimilarityReport(quiz_id=quiz.pk, attempts=0, pairs=())
+
+    selected = responses.selected.astype(np.float32)
+    wrong = selected * ~responses.answer_key
+    weighted = selected * option_weights(responses).astype(np.float32)
+    totals = weighted.sum(axis=1)
+    students = responses.student_ids
+    count = len(selected)
+
+    found = []
+    for start in range(0, count, BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, count)
+        intersection = weighted[start:stop] @ selected.T
+        union = totals[start:stop, None] + totals[None, :] - intersection
+        shared_wrong = wrong[start:stop] @ wrong.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(union > 0, intersection / union, 0.0)
+
+        # Har bir juftlik bir marta (j > i), bir talabaning urinishlari solishtirilmaydi
+        mask = (
+            (np.arange(count)[None, :] > np.arange(start, stop)[:, None]) &
+            (students[start:stop, None] != students[None, :]) &
+            (shared_wrong >= min_shared_wrong) &
+            (score >= min_score)
+        )
+        rows, columns = np.nonzero(mask)
+        if not len(rows):
+            continue
+
+        block_scores = score[rows, columns]
+        if len(block_scores) > limit:
+            top = np.argpartition(-block_scores, limit)[:limit]
+            rows, columns, block_scores = rows[top], columns[top], block_scores[top]
+        found.append((rows + start, columns, block_scores, shared_wrong[rows, columns]))
+
+    if not found:
+        return SimilarityReport(quiz_id=quiz.pk, attempts=count, pairs=())
+
+    rows, columns, scores, wrongs = (np.concatenate(parts) for parts in zip(*found))
+    order = np.lexsort((-wrongs, -scores))[:limit]
+    rows, columns, scores, wrongs = rows[order], columns[order], scores[order], wrongs[order]
+    correct = selected * responses.answer_key
+    shared_correct = (correct[rows] * correct[columns]).sum(axis=1)
+
+    pairs = tuple(
+        SuspiciousPair(
+            attempt_a=int(responses.attempt_ids[i]),
+            attempt_b=int(responses.attempt_ids[j]),
+            student_a=int(students[i]),
+            student_b=int(students[j]),
+            score=float(pair_score),
+            shared_wrong=int(pair_wrong),
+            shared_correct=int(pair_correct)
+        )
+        for i, j, pair_score, pair_wrong, pair_correct in zip(rows, columns, scores, wrongs, shared_correct)
+    )
+    return SimilarityReport(quiz_id=quiz.pk, attempts=count, pairs=pairs)
+
+
+def get_similarity(quiz):
+    return cached_report('similarity', quiz, find_similar_pairs)
@@ -0,0 +1,89 @@
+# apps/assessments/summaries.py
+
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+
+from .models import QuizAttempt, QuizAttemptSummary
+
+
+def get_summary(quiz, student):
+    """Talabaning test bo'yicha xulosasi (urinish bo'lmasa saqlanmagan bo'sh nusxa)"""
+    summary = QuizAttemptSummary.objects.filter(quiz=quiz, student=student).first()
+    if summary is None:
+        summary = QuizAttemptSummary(quiz=quiz, student=student)
+    return summary
+
+
+def refresh_summaries(pairs):
+    """(test_id, talaba_id) juftliklari xulosalarini urinishlardan qayta hosil qilish (3 ta so'rov)"""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+
+    quiz_ids = {quiz_id for quiz_id, student_id in pairs}
+    student_ids = {student_id for quiz_id, student_id in pairs}
+    rows = QuizAttempt.objects.filter(
+        quiz_id__in=quiz_ids,
+        student_id__in=student_ids
+    ).order_by().values('quiz_id', 'student_id').annotate(
+        used=Count('pk'),
+        best=Max('score', filter=Q(completed_at__isnull=False)),
+        passed=Max(
+            Case(When(is_passed=True, then=Value(1)), default=Value(0), output_field=IntegerField()),
+            filter=Q(completed_at__isnull=False)
+        ),
+        ongoing=Max('pk', filter=Q(completed_at__isnull=True)),
+    )
+
+    summaries = [
+        QuizAttemptSummary(
+            quiz_id=row['quiz_id'],
+            student_id=row['student_id'],
+            attempts_used=row['used'],
+            best_score=row['best'],
+            is_passed=None if row['passed'] is None else bool(row['passed']),
+            ongoing_attempt_id=row['ongoing'],
+        )
+        for row in rows
+        if (row['quiz_id'], row['student_id']) in pairs
+    ]
+    emptied = pairs - {(summary.quiz_id, summary.student_id) for summary in summaries}
+
+    with transaction.atomic():
+        QuizAttemptSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['quiz', 'student'],
+            update_fields=['attempts_used', 'best_score', 'is_passed', 'ongoing_attempt', 'updated_at'],
+            batch_size=500
+        )
+        if emptied:
+            # Urinishlari qolmagan juftliklar
+            condition = Q()
+            for quiz_id, student_id in emptied:
+                condition |= Q(quiz_id=quiz_id, student_id=student_id)
+            QuizAttemptSummary.objects.filter(condition).delete()
+
+    return len(summaries)
+
+
+def refresh_for_attempts(attempts):
+    return refresh_summaries((attempt.quiz_id, attempt.student_id) for attempt in attempts)
+
+
+def rebuild_summaries(quiz_ids=None):
+    """Testlar bo'yicha barcha xulosalarni qayta hosil qilish"""
+    attempts = QuizAttempt.objects.all()
+    summaries = QuizAttemptSummary.objects.all()
+    if quiz_ids is not None:
+        attempts = attempts.filter(quiz_id__in=quiz_ids)
+        summaries = summaries.filter(quiz_id__in=quiz_ids)
+
+    pairs = set(attempts.order_by().values_list('quiz_id', 'student_id').distinct())
+    pairs |= set(summaries.values_list('quiz_id', 'student_id'))
+
+    pairs = sorted(pairs)
+    total = 0
+    for start in range(0, len(pairs), 500):
+        total += refresh_summaries(pairs[start:start + 500])
+    return total
@@ -1,3 +1,1078 @@
-from django.test import TestCase
+# apps/assessments/tests.py
 
-# Create your tests here.
+import io
+import random
+import statistics
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User, Faculty, Department
+from apps.courses.models import Course, Enrollment
+from .models import (
+    Quiz, Question, Answer, QuizAttempt, QuestionBank, QuizPoolRule, QuizAttemptSummary, GradingPolicy, Grade,
+    RegradeRun
+)
+from .analysis import analyze
+from .checks import async_grading_check
+from .compiled import get_compiled_quiz, get_compiled_attempt, attempt_questions
+from .grading import grade_attempts, load_selections, review_attempt
+from .importers import AIKEN, CSV, GIFT, import_questions
+from .irt import adaptive_score, estimate_ability, estimate_parameters, get_item_table, probability
+from .pools import sample_attempt_questions
+from .regrade import regrade_quiz, run_pending_regrades
+from .similarity import WRONG_WEIGHT, find_similar_pairs
+from .summaries import rebuild_summaries
+from . import live, services, similarity
+
+
+def legacy_score(attempt):
+    """Eski har-javob baholovchi (StudentAnswer qatorlari va joriy kalit bo'yicha, taqqoslash uchun)"""
+    results = {}
+    for student_answer in attempt.student_answers.select_related('question'):
+        question = student_answer.question
+        correct = set(question.answers.filter(is_correct=True).values_list('pk', flat=True))
+        selected = set(student_answer.selected_answers.values_list('pk', flat=True))
+        results[question.pk] = (correct == selected, question.points if correct == selected else 0)
+
+    total = sum(question.points for question in Question.objects.filter(pk__in=results))
+    earned = sum(points for is_correct, points in results.values())
+    return results, int((earned / total) * 100) if total > 0 else 0
+
+
+def wrong_answer(question):
+    """Savolning birinchi noto'g'ri varianti"""
+    return [next(answer.pk for answer in question.answers if not answer.is_correct)]
+
+
+def stored_selections(attempt):
+    """Saqlangan tanlovlar {savol_id: {javob_id}} (qatorlar yoki siqilgan shakl)"""
+    selections, rows = load_selections([attempt])
+    return {question_id: ids for question_id, ids in selections[attempt.pk].items() if ids}
+
+
+class QuizTestCase(TestCase):
+    """Kurs, yozilgan talabalar va 8 savolli test (yakka va ko'p tanlovli savollar aralash)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='D', faculty=Faculty.objects.create(name='F', code='F'))
+        cls.teacher = User.objects.create(username='teacher', role='teacher')
+        cls.course = Course.objects.create(name='C', code='C', department=department, teacher=cls.teacher)
+        cls.students = [User.objects.create(username=f'student{index}', role='student') for index in range(5)]
+        for student in cls.students:
+            Enrollment.objects.create(student=student, course=cls.course)
+
+        now = timezone.now()
+        cls.quiz = Quiz.objects.create(
+            course=cls.course,
+            title='Q',
+            available_from=now - timezone.timedelta(days=1),
+            available_until=now + timezone.timedelta(days=1),
+            shuffle_questions=False
+        )
+        for index in range(8):
+            question = Question.objects.create(
+                quiz=cls.quiz,
+                text=f'Q{index}',
+                points=index % 3 + 1,
+                question_type='multiple' if index % 2 else 'single',
+                order=index
+            )
+            for number in range(4):
+                Answer.objects.create(
+                    question=question,
+                    text=f'A{number}',
+                    is_correct=number == 0 or (index % 2 == 1 and number == 2),
+                    order=number
+                )
+
+    def setUp(self):
+        # Kompilyatsiya qilingan testlar (test_id, versiya) bo'yicha keshlanadi - testlar orasida qolmasin
+        cache.clear()
+
+    def questions(self):
+        return list(self.quiz.questions.order_by('order').prefetch_related('answers'))
+
+    def first_answers(self):
+        """Har bir savolning birinchi varianti: yakka tanlovlilarda to'g'ri, ko'p tanlovlilarda to'liq emas"""
+        return {question.pk: {question.answers.get(order=0).pk} for question in self.questions()}
+
+    def correct_answers(self):
+        return {question.pk: set(question.correct_ids) for question in get_compiled_quiz(self.quiz).questions}
+
+    def set_key(self, question, order):
+        """To'g'ri javobni almashtirish (save - test versiyasi oshadi)"""
+        for answer in question.answers.all():
+            answer.is_correct = answer.order == order
+            answer.save()
+
+    def submit(self, student, selections, storage='rows'):
+        with override_settings(ASSESSMENTS_SELECTION_STORAGE=storage, ASSESSMENTS_ASYNC_GRADING=False):
+            attempt = QuizAttempt.objects.create(quiz=self.quiz, student=student)
+            services.submit_attempt(attempt, selections)
+        return QuizAttempt.objects.select_related('quiz').get(pk=attempt.pk)
+
+    def random_selections(self, rng):
+        """Tasodifiy javoblar: o'tkazib yuborilgan, to'g'ri va noto'g'ri savollar aralash"""
+        selections = {}
+        for question in self.questions():
+            if rng.random() < 0.2:
+                continue
+            answer_ids = [answer.pk for answer in question.answers.all()]
+            count = 1 if question.question_type == 'single' else rng.randint(1, 3)
+            selections[question.pk] = set(rng.sample(answer_ids, count))
+        return selections
+
+
+# ===================== BAHOLASH =====================
+
+class GradingParityTests(QuizTestCase):
+    """To'plamli baholovchi eski har-javob baholovchi bilan bir xil natija berishi"""
+
+    def assertMatchesLegacy(self, attempt):
+        results, score = legacy_score(attempt)
+        rows = {row.question_id: (row.is_correct, row.points_earned) for row in attempt.student_answers.all()}
+        self.assertEqual(rows, results)
+        self.assertEqual(attempt.score, score)
+
+    def test_parity_on_random_corpus(self):
+        rng = random.Random(4)
+        attempts = [
+            self.submit(self.students[index % len(self.students)], self.random_selections(rng))
+            for index in range(20)
+        ]
+        for attempt in attempts:
+            self.assertMatchesLegacy(attempt)
+
+        # Kalit o'zgargach qayta baholash ham mos kelishi
+        self.set_key(self.questions()[0], 1)
+        for attempt in grade_attempts(QuizAttempt.objects.select_related('quiz').filter(pk__in=[a.pk for a in attempts])):
+            self.assertMatchesLegacy(attempt)
+
+    def test_query_count_does_not_grow_with_answers(self):
+        answers = list(self.first_answers().items())
+        attempts = [self.submit(self.students[0], dict(answers[:2])), self.submit(self.students[1], dict(answers))]
+        # Birinchi chaqiruv kompilyatsiya qilingan testni keshga yozadi
+        grade_attempts(attempts)
+        counts = []
+        for attempt in attempts:
+            with CaptureQueriesContext(connection) as context:
+                attempt.calculate_score()
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
+
+
+# ===================== QORALAMA =====================
+
+class DraftMergeTests(QuizTestCase):
+    """Avtomatik saqlangan qoralama va yuborilgan forma birlashtirilishi"""
+
+    def start(self, student, draft):
+        attempt = QuizAttempt.objects.create(quiz=self.quiz, student=student)
+        attempt, saved = services.autosave_attempt(
+            attempt.pk, student, {str(question_id): sorted(ids) for question_id, ids in draft.items()}
+        )
+        self.assertTrue(saved)
+        return attempt
+
+    def finish(self, attempt, posted):
+        with override_settings(ASSESSMENTS_ASYNC_GRADING=False):
+            services.submit_attempt(attempt, posted)
+        attempt = QuizAttempt.objects.select_related('quiz').get(pk=attempt.pk)
+        return stored_selections(attempt)
+
+    def test_cleared_question_stays_cleared(self):
+        question = self.questions()[0]
+        attempt = self.start(self.students[0], {question.pk: {question.answers.get(order=1).pk}})
+
+        # Talaba javobni tozalab yubordi: forma bo'sh ro'yxat beradi, eski qoralama qaytmaydi
+        posted = {item.pk: [] for item in self.questions()}
+        self.assertEqual(self.finish(attempt, posted), {})
+
+    def test_form_overrides_draft(self):
+        question = self.questions()[0]
+        wrong, right = question.answers.get(order=1).pk, question.answers.get(order=0).pk
+        attempt = self.start(self.students[0], {question.pk: {wrong}})
+
+        self.assertEqual(self.finish(attempt, {question.pk: [str(right)]}), {question.pk: {right}})
+
+    def test_question_missing_from_form_uses_draft(self):
+        first, second = self.questions()[:2]
+        draft = {first.pk: {first.answers.get(order=1).pk}, second.pk: {second.answers.get(order=0).pk}}
+        attempt = self.start(self.students[0], draft)
+
+        chosen = first.answers.get(order=0).pk
+        self.assertEqual(
+            self.finish(attempt, {first.pk: [str(chosen)]}),
+            {first.pk: {chosen}, second.pk: draft[second.pk]}
+        )
+
+    def test_timeout_submits_draft(self):
+        draft = self.first_answers()
+        attempt = self.start(self.students[0], draft)
+        self.assertEqual(self.finish(attempt, {}), draft)
+
+# ===================== ARALASHTIRISH =====================
+
+class ShuffleTests(QuizTestCase):
+    """Savol va javoblar tartibi urinish seed'i bo'yicha, ma'lumotlar bazasida tasodifiy saralashsiz"""
+
+    def order(self, seed, **options):
+        for name, value in options.items():
+            setattr(self.quiz, name, value)
+        attempt = QuizAttempt(quiz=self.quiz, student=self.students[0], shuffle_seed=seed)
+        return [
+            (question.pk, [answer.pk for answer in question.answers])
+            for question in attempt_questions(get_compiled_quiz(self.quiz), attempt)
+        ]
+
+    def test_same_seed_same_order(self):
+        self.assertEqual(
+            self.order(7, shuffle_questions=True, shuffle_answers=True),
+            self.order(7, shuffle_questions=True, shuffle_answers=True)
+        )
+
+    def test_seeds_differ(self):
+        orders = {tuple(question for question, answers in self.order(seed, shuffle_questions=True)) for seed in range(10)}
+        self.assertGreater(len(orders), 1)
+
+    def test_no_shuffle_keeps_quiz_order(self):
+        original = [question.pk for question in self.questions()]
+        self.assertEqual([question for question, answers in self.order(7)], original)
+
+    def test_answer_order_independent_of_question_order(self):
+        # Javoblar tartibi faqat (seed, savol) ga bog'liq
+        plain = dict(self.order(7, shuffle_answers=True))
+        shuffled = dict(self.order(7, shuffle_questions=True, shuffle_answers=True))
+        self.assertEqual(plain, shuffled)
+
+    def test_reload_shows_same_order_without_random_sort(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(shuffle_questions=True, shuffle_answers=True)
+        self.client.force_login(self.students[0])
+        response = self.client.post(reverse('assessments:quiz_start', args=[self.quiz.pk]))
+        url = response['Location']
+
+        orders = []
+        for index in range(2):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertFalse(any('RANDOM' in query['sql'].upper() for query in context.captured_queries))
+            orders.append([
+                (question.pk, [answer.pk for answer in question.answers])
+                for question in response.context['questions']
+            ])
+        self.assertEqual(orders[0], orders[1])
+
+
+# ===================== SAVOLLAR BANKI =====================
+
+class PoolSamplingTests(QuizTestCase):
+    """Bankdan har bir urinish uchun savollar tanlash"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bank = QuestionBank.objects.create(course=cls.course, title='B')
+        difficulties = [choice for choice, label in Question.Difficulty.choices]
+        for index in range(30):
+            question = Question.objects.create(
+                bank=cls.bank,
+                text=f'B{index}',
+                difficulty=difficulties[index % 3],
+                tags='algebra' if index % 2 else 'linear-algebra, matrix',
+                order=index
+            )
+            for number in range(2):
+                Answer.objects.create(question=question, text=f'A{number}', is_correct=number == 0, order=number)
+
+    def add_rule(self, count, **filters):
+        return QuizPoolRule.objects.create(quiz=self.quiz, bank=self.bank, count=count, **filters)
+
+    def sampled(self, seed):
+        own = {question.pk for question in self.questions()}
+        return [pk for pk in sample_attempt_questions(self.quiz, seed) if pk not in own]
+
+    def test_without_rules_uses_quiz_questions(self):
+        self.assertEqual(sample_attempt_questions(self.quiz, 1), [])
+
+    def test_same_seed_same_sample(self):
+        self.add_rule(5)
+        self.assertEqual(self.sampled(3), self.sampled(3))
+        self.assertGreater(len({tuple(self.sampled(seed)) for seed in range(10)}), 1)
+
+    def test_quiz_questions_come_first(self):
+        self.add_rule(5)
+        own = [question.pk for question in self.questions()]
+        self.assertEqual(sample_attempt_questions(self.quiz, 3)[:len(own)], own)
+
+    def test_filters_and_counts(self):
+        self.add_rule(3, difficulty=Question.Difficulty.HARD)
+        self.add_rule(4, tag='Algebra')
+        for seed in range(10):
+            sampled = self.sampled(seed)
+            self.assertEqual(len(sampled), 7)
+            self.assertEqual(len(set(sampled)), 7)
+
+            questions = Question.objects.in_bulk(sampled)
+            self.assertTrue(all(questions[pk].difficulty == Question.Difficulty.HARD for pk in sampled[:3]))
+            # Teg butunlay mos kelishi kerak ("linear-algebra" emas)
+            self.assertTrue(all(questions[pk].tag_list() == ['algebra'] for pk in sampled[3:]))
+
+    def test_count_capped_by_bank(self):
+        self.add_rule(50, difficulty=Question.Difficulty.EASY)
+        self.assertEqual(len(self.sampled(1)), 10)
+
+    def test_warm_index_does_not_load_bank(self):
+        self.add_rule(5)
+        self.add_rule(5, tag='matrix')
+        sample_attempt_questions(self.quiz, 1)
+        # Qoidalar va testning o'z savollari - bank hajmiga bog'liq emas
+        with self.assertNumQueries(2):
+            sample_attempt_questions(self.quiz, 2)
+
+    def test_sampled_attempt_is_graded(self):
+        self.add_rule(5)
+        attempt = QuizAttempt.objects.create(
+            quiz=self.quiz,
+            student=self.students[0],
+            shuffle_seed=9,
+            question_ids=sample_attempt_questions(self.quiz, 9)
+        )
+        correct = {
+            question.pk: [str(answer_id) for answer_id in question.correct_ids]
+            for question in get_compiled_attempt(attempt).questions
+        }
+        self.assertEqual(len(correct), 13)
+
+        with override_settings(ASSESSMENTS_ASYNC_GRADING=False):
+            services.submit_attempt(attempt, correct)
+        self.assertEqual(QuizAttempt.objects.get(pk=attempt.pk).score, 100)
+
+
+# ===================== MUDDATI O'TGAN URINISHLAR =====================
+
+class FinalizeExpiredTests(QuizTestCase):
+    """Muddati o'tgan urinishlarni partiyalab yakunlash"""
+
+    def start(self, student, expired_seconds, draft=None):
+        return QuizAttempt.objects.create(
+            quiz=self.quiz,
+            student=student,
+            expires_at=timezone.now() - timezone.timedelta(seconds=expired_seconds),
+            draft={str(question_id): sorted(ids) for question_id, ids in (draft or {}).items()}
+        )
+
+    def test_expired_attempt_graded_from_draft(self):
+        attempt = self.start(self.students[0], 120, self.first_answers())
+        self.assertEqual(services.finalize_expired_attempts(), 1)
+
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.completed_at, attempt.expires_at)
+        self.assertEqual(attempt.draft, {})
+        self.assertEqual(stored_selections(attempt), self.first_answers())
+        self.assertEqual(attempt.score, self.submit(self.students[1], self.first_answers()).score)
+
+    def test_grace_and_open_attempts_untouched(self):
+        within_grace = self.start(self.students[0], 30)
+        running = self.start(self.students[1], -600)
+        completed = self.submit(self.students[2], {})
+
+        self.assertEqual(services.finalize_expired_attempts(grace_seconds=60), 0)
+        for attempt in (within_grace, running):
+            attempt.refresh_from_db()
+            self.assertIsNone(attempt.completed_at)
+        self.assertEqual(QuizAttempt.objects.get(pk=completed.pk).completed_at, completed.completed_at)
+
+    def test_batches(self):
+        for student in self.students:
+            self.start(student, 300)
+        self.assertEqual(services.finalize_expired_attempts(batch_size=2), 2)
+        self.assertEqual(QuizAttempt.objects.filter(completed_at__isnull=True).count(), 3)
+
+        call_command('finalize_attempts', batch_size=2, stdout=io.StringIO())
+        self.assertFalse(QuizAttempt.objects.filter(completed_at__isnull=True).exists())
+
+    def test_late_submit_is_noop(self):
+        attempt = self.start(self.students[0], 120, self.first_answers())
+        services.finalize_expired_attempts()
+
+        with override_settings(ASSESSMENTS_ASYNC_GRADING=False):
+            self.assertFalse(services.submit_attempt(attempt, {}))
+        self.assertEqual(stored_selections(QuizAttempt.objects.get(pk=attempt.pk)), self.first_answers())
+
+
+# ===================== URINISHLAR XULOSASI =====================
+
+class AttemptSummaryTests(QuizTestCase):
+    """Talaba va test bo'yicha xulosa qatorlari urinishlar bilan mos turishi"""
+
+    def summary(self, student):
+        return QuizAttemptSummary.objects.filter(quiz=self.quiz, student=student).first()
+
+    def snapshot(self):
+        return sorted(QuizAttemptSummary.objects.values_list(
+            'quiz_id', 'student_id', 'attempts_used', 'best_score', 'is_passed', 'ongoing_attempt_id'
+        ))
+
+    def assertMatchesRebuild(self):
+        before = self.snapshot()
+        rebuild_summaries()
+        self.assertEqual(before, self.snapshot())
+
+    def test_start_and_submit(self):
+        student = self.students[0]
+        attempt = QuizAttempt.objects.create(quiz=self.quiz, student=student)
+        summary = self.summary(student)
+        self.assertEqual((summary.attempts_used, summary.ongoing_attempt_id, summary.completed_count), (1, attempt.pk, 0))
+
+        with override_settings(ASSESSMENTS_ASYNC_GRADING=False):
+            services.submit_attempt(attempt, self.first_answers())
+        attempt.refresh_from_db()
+        summary = self.summary(student)
+        self.assertEqual(
+            (summary.attempts_used, summary.ongoing_attempt_id, summary.best_score, summary.is_passed),
+            (1, None, attempt.score, attempt.is_passed)
+        )
+        self.assertMatchesRebuild()
+
+    def test_best_score_and_delete(self):
+        student = self.students[1]
+        answers = self.first_answers()
+        weak = self.submit(student, dict(list(answers.items())[:1]))
+        strong = self.submit(student, answers)
+        self.assertEqual(self.summary(student).best_score, max(weak.score, strong.score))
+
+        strong.delete()
+        self.assertEqual((self.summary(student).attempts_used, self.summary(student).best_score), (1, weak.score))
+        weak.delete()
+        self.assertIsNone(self.summary(student))
+        self.assertMatchesRebuild()
+
+    def test_quiz_list_is_one_query_per_page(self):
+        self.submit(self.students[0], self.first_answers())
+        self.client.force_login(self.students[0])
+        url = reverse('assessments:quiz_list')
+
+        counts = []
+        for extra in (0, 10):
+            for index in range(extra):
+                Quiz.objects.create(
+                    course=self.course,
+                    title=f'E{index}',
+                    available_from=self.quiz.available_from,
+                    available_until=self.quiz.available_until
+                )
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
+
+        row = next(row for row in response.context['quiz_data'] if row['quiz'].pk == self.quiz.pk)
+        self.assertEqual(row['attempts_count'], 1)
+        self.assertEqual(row['attempts_left'], self.quiz.attempts_allowed - 1)
+
+
+# ===================== BAHOLAR =====================
+
+class GradeMaterializationTests(QuizTestCase):
+    """Baho qatorlari kirishlar o'zgarganda qayta hisoblanishi, jadval sahifasi esa faqat o'qishi"""
+
+    def grade(self, student):
+        return Grade.objects.get(student=student, course=self.course)
+
+    def test_attempt_completion_updates_grade(self):
+        student = self.students[0]
+        answers = self.first_answers()
+        first = self.submit(student, answers)
+        second = self.submit(student, dict(list(answers.items())[:2]))
+
+        grade = self.grade(student)
+        quiz_score = Decimal(first.score + second.score) / 2
+        self.assertEqual(grade.quiz_score, quiz_score.quantize(Decimal('0.01')))
+        self.assertEqual(grade.total_score, (grade.quiz_score * Decimal('0.5')).quantize(Decimal('0.01')))
+
+        second.delete()
+        self.assertEqual(self.grade(student).quiz_score, first.score)
+
+    def test_policy_and_assignment_score(self):
+        student = self.students[1]
+        attempt = self.submit(student, self.correct_answers())
+        self.assertEqual(attempt.score, 100)
+        self.assertEqual((self.grade(student).total_score, self.grade(student).letter_grade), (50, 'F'))
+
+        policy = GradingPolicy.objects.create(course=self.course, quiz_weight=70, assignment_weight=30, attendance_weight=0)
+        self.assertEqual((self.grade(student).total_score, self.grade(student).letter_grade), (70, 'C'))
+
+        grade = self.grade(student)
+        grade.assignment_score = 90
+        grade.save()
+        self.assertEqual((self.grade(student).total_score, self.grade(student).letter_grade), (97, 'A'))
+
+        policy.grade_a = 98
+        policy.grade_b = 95
+        policy.save()
+        self.assertEqual(self.grade(student).letter_grade, 'B')
+
+    def test_gradebook_does_not_write(self):
+        self.submit(self.students[2], self.first_answers())
+        self.client.force_login(self.students[2])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('assessments:gradebook'))
+        self.assertEqual(response.status_code, 200)
+        writes = [query['sql'] for query in context.captured_queries if query['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')]
+        # Sessiya yozuvlaridan tashqari
+        self.assertEqual([sql for sql in writes if 'django_session' not in sql], [])
+
+
+# ===================== QAYTA BAHOLASH =====================
+
+class RegradeTests(QuizTestCase):
+    """Javob kaliti o'zgargandan keyin qayta baholash va uning navbati"""
+
+    def change_key(self):
+        # 15 balldan 8 tasi noto'g'ri bo'lib qoladi: to'liq to'g'ri urinish 100% dan 46% ga tushadi
+        questions = self.questions()
+        for index in (1, 2, 5):
+            self.set_key(questions[index], 1)
+
+    def test_flips_are_recorded(self):
+        passed = self.submit(self.students[0], self.correct_answers())
+        empty = self.submit(self.students[1], {})
+        self.assertTrue(passed.is_passed)
+
+        self.change_key()
+        run = regrade_quiz(self.quiz, chunk_size=1)
+
+        self.assertEqual(
+            (run.status, run.attempts_total, run.attempts_processed, run.attempts_changed, run.passed_flipped),
+            (RegradeRun.Status.DONE, 2, 2, 1, 1)
+        )
+        change = run.changes.get()
+        self.assertEqual(
+            (change.attempt_id, change.old_score, change.old_passed, change.new_score, change.new_passed),
+            (passed.pk, 100, True, 46, False)
+        )
+        passed.refresh_from_db()
+        self.assertEqual((passed.score, passed.is_passed), (46, False))
+        self.assertEqual(QuizAttempt.objects.get(pk=empty.pk).score, 0)
+
+    def test_view_queues_without_grading(self):
+        attempt = self.submit(self.students[0], self.correct_answers())
+        self.change_key()
+        self.client.force_login(self.teacher)
+
+        url = reverse('assessments:teacher_quiz_regrade', args=[self.quiz.pk])
+        self.client.post(url)
+        self.client.post(url)
+        run = RegradeRun.objects.get()
+        self.assertEqual((run.status, run.attempts_total, run.attempts_processed), (RegradeRun.Status.PENDING, 1, 0))
+        self.assertEqual(QuizAttempt.objects.get(pk=attempt.pk).score, 100)
+
+        status_url = reverse('assessments:teacher_regrade_status', args=[run.pk])
+        self.assertFalse(self.client.get(status_url).json()['finished'])
+        self.assertContains(self.client.get(reverse('assessments:teacher_regrade_detail', args=[run.pk])), 'regrade-progress')
+
+        call_command('regrade_quiz', pending=True, stdout=io.StringIO())
+        self.assertEqual(
+            self.client.get(status_url).json(),
+            {'status': 'done', 'status_display': 'Yakunlandi', 'processed': 1, 'total': 1, 'finished': True}
+        )
+        self.assertEqual(QuizAttempt.objects.get(pk=attempt.pk).score, 46)
+        self.assertEqual(run_pending_regrades(), [])
+
+
+# ===================== SAVOLLAR TAHLILI =====================
+
+class ItemAnalysisTests(QuizTestCase):
+    """NumPy tahlili oddiy Python hisobi bilan bir xil natija berishi"""
+
+    def reference(self, corpus):
+        questions = self.questions()
+        key = self.correct_answers()
+        correct = [[int(selections.get(question.pk, set()) == key[question.pk]) for question in questions] for selections in corpus]
+        scores = [[mark * question.points for mark, question in zip(row, questions)] for row in correct]
+        totals = [sum(row) for row in scores]
+
+        items = {}
+        for j, question in enumerate(questions):
+            column = [row[j] for row in correct]
+            rest = [total - row[j] for total, row in zip(totals, scores)]
+            try:
+                discrimination = statistics.correlation(column, rest)
+            except statistics.StatisticsError:
+                discrimination = None
+            counts = {
+                answer.pk: sum(answer.pk in selections.get(question.pk, set()) for selections in corpus)
+                for answer in question.answers.all()
+            }
+            items[question.pk] = (sum(column) / len(corpus), discrimination, counts)
+
+        k = len(questions)
+        item_variance = sum(statistics.variance([row[j] for row in scores]) for j in range(k))
+        alpha = k / (k - 1) * (1 - item_variance / statistics.variance(totals))
+        return items, alpha
+
+    def test_matches_reference(self):
+        rng = random.Random(13)
+        corpus = [self.random_selections(rng) for index in range(30)]
+        for index, selections in enumerate(corpus):
+            self.submit(self.students[index % len(self.students)], selections)
+
+        analysis = analyze(self.quiz)
+        items, alpha = self.reference(corpus)
+
+        self.assertEqual(analysis.attempts, 30)
+        self.assertAlmostEqual(analysis.alpha, alpha)
+        for item in analysis.items:
+            difficulty, discrimination, counts = items[item.pk]
+            self.assertEqual(item.presented, 30)
+            self.assertAlmostEqual(item.difficulty, difficulty)
+            if discrimination is None:
+                self.assertIsNone(item.discrimination)
+            else:
+                self.assertAlmostEqual(item.discrimination, discrimination)
+            self.assertEqual({distractor.pk: distractor.count for distractor in item.distractors}, counts)
+
+    def test_without_attempts(self):
+        self.assertEqual((analyze(self.quiz).attempts, analyze(self.quiz).items), (0, ()))
+
+
+# ===================== O'XSHASH JAVOBLAR =====================
+
+class SimilarityTests(QuizTestCase):
+    """Og'irlikli Jakkard o'xshashligi bo'yicha shubhali juftliklar"""
+
+    def option(self, order):
+        return {question.pk: {question.answers.get(order=order).pk} for question in self.questions()}
+
+    def reference(self, attempts):
+        """Barcha juftliklar uchun to'g'ridan-to'g'ri hisob: {(urinish_a, urinish_b): (o'xshashlik, umumiy noto'g'ri)}"""
+        key = {answer.pk: answer.is_correct for answer in Answer.objects.filter(question__quiz=self.quiz)}
+        chosen = {attempt.pk: set().union(*stored_selections(attempt).values()) for attempt in attempts}
+        weights = {
+            answer_id: 1.0 if is_correct else 1.0 + (WRONG_WEIGHT - 1.0) * (
+                1.0 - sum(answer_id in ids for ids in chosen.values()) / len(attempts)
+            )
+            for answer_id, is_correct in key.items()
+        }
+
+        pairs = {}
+        for index, first in enumerate(attempts):
+            for second in attempts[index + 1:]:
+                if first.student_id == second.student_id:
+                    continue
+                a, b = chosen[first.pk], chosen[second.pk]
+                union = sum(weights[pk] for pk in a | b)
+                score = sum(weights[pk] for pk in a & b) / union if union else 0.0
+                pairs[first.pk, second.pk] = (score, sum(not key[pk] for pk in a & b))
+        return pairs
+
+    def test_copied_wrong_answers_are_flagged(self):
+        copied = [self.submit(student, self.option(1)) for student in self.students[:2]]
+        for student in self.students[2:]:
+            self.submit(student, self.correct_answers())
+        # Bir talabaning o'z urinishlari solishtirilmaydi
+        self.submit(self.students[0], self.option(1))
+
+        report = find_similar_pairs(self.quiz)
+        self.assertEqual(
+            {(frozenset((pair.student_a, pair.student_b)), pair.shared_wrong) for pair in report.pairs},
+            {(frozenset((copied[0].student_id, copied[1].student_id)), 8)}
+        )
+        self.assertEqual(len(report.pairs), 2)
+        self.assertTrue(all(pair.score == 1.0 for pair in report.pairs))
+
+    def test_matches_reference_across_blocks(self):
+        rng = random.Random(14)
+        attempts = [
+            self.submit(self.students[index % len(self.students)], self.random_selections(rng))
+            for index in range(20)
+        ]
+        expected = self.reference(attempts)
+
+        for block_size in (similarity.BLOCK_SIZE, 3):
+            with mock.patch.object(similarity, 'BLOCK_SIZE', block_size):
+                report = find_similar_pairs(self.quiz, min_score=0, min_shared_wrong=0, limit=len(expected))
+            self.assertEqual(len(report.pairs), len(expected))
+            for pair in report.pairs:
+                score, shared_wrong = expected[pair.attempt_a, pair.attempt_b]
+                self.assertAlmostEqual(pair.score, score, places=5)
+                self.assertEqual(pair.shared_wrong, shared_wrong)
+
+    def test_limit_keeps_best_pairs(self):
+        rng = random.Random(15)
+        attempts = [
+            self.submit(self.students[index % len(self.students)], self.random_selections(rng))
+            for index in range(20)
+        ]
+        best = sorted((score for score, shared_wrong in self.reference(attempts).values()), reverse=True)[:5]
+
+        with mock.patch.object(similarity, 'BLOCK_SIZE', 4):
+            report = find_similar_pairs(self.quiz, min_score=0, min_shared_wrong=0, limit=5)
+        for pair, score in zip(report.pairs, best):
+            self.assertAlmostEqual(pair.score, score, places=5)
+
+
+# ===================== SIQILGAN SAQLASH =====================
+
+class CompactStorageTests(QuizTestCase):
+    """Siqilgan `selections` maydonidagi urinishlar qatorlardagi bilan bir xil baholanishi"""
+
+    def assertTwins(self, attempt, twin):
+        results, score = legacy_score(attempt)
+        self.assertEqual(twin.score, score)
+        self.assertEqual({int(pk): tuple(value) for pk, value in twin.results.items()}, results)
+        self.assertFalse(twin.student_answers.exists())
+        self.assertEqual(stored_selections(twin), stored_selections(attempt))
+
+    def test_parity_with_rows(self):
+        rng = random.Random(5)
+        pairs = []
+        for index in range(20):
+            selections = self.random_selections(rng)
+            student = self.students[index % len(self.students)]
+            pairs.append((self.submit(student, selections), self.submit(student, selections, storage='compact')))
+        for attempt, twin in pairs:
+            self.assertTwins(attempt, twin)
+
+        # Kalit o'zgargach qayta baholash ham mos kelishi
+        self.set_key(self.questions()[1], 1)
+        graded = {
+            attempt.pk: attempt
+            for attempt in grade_attempts(QuizAttempt.objects.select_related('quiz').filter(
+                pk__in=[pk for pair in pairs for pk in (pair[0].pk, pair[1].pk)]
+            ))
+        }
+        for attempt, twin in pairs:
+            self.assertTwins(graded[attempt.pk], graded[twin.pk])
+
+    def test_compact_existing_rows(self):
+        attempt = self.submit(self.students[0], self.first_answers())
+        results, score = legacy_score(attempt)
+
+        self.assertEqual(services.compact_selections([attempt.pk], purge=True), 1)
+        self.assertEqual(services.compact_selections([attempt.pk]), 0)
+        attempt = QuizAttempt.objects.select_related('quiz').get(pk=attempt.pk)
+        self.assertFalse(attempt.student_answers.exists())
+        self.assertEqual(stored_selections(attempt), self.first_answers())
+        self.assertEqual({int(pk): tuple(value) for pk, value in attempt.results.items()}, results)
+
+    def test_review_matches_stored_score(self):
+        attempts = [
+            self.submit(self.students[0], self.first_answers()),
+            self.submit(self.students[1], self.first_answers(), storage='compact')
+        ]
+
+        # Kalit o'zgardi, qayta baholanmadi - ko'rish sahifasi saqlangan ballni ko'rsatadi
+        for question in self.questions():
+            self.set_key(question, 1)
+        for attempt in attempts:
+            attempt = QuizAttempt.objects.select_related('quiz').get(pk=attempt.pk)
+            self.assertGreater(attempt.points_earned, 0)
+            self.assertEqual(sum(review.points_earned for review in review_attempt(attempt)), attempt.points_earned)
+
+
+# ===================== NAVBATLI BAHOLASH =====================
+
+@override_settings(ASSESSMENTS_ASYNC_GRADING=True, ASSESSMENTS_GRADING_TIMEOUT=30)
+class AsyncGradingTests(QuizTestCase):
+    """Yuborilgan urinishlar navbat orqali baholanishi va ishchi kechikkandagi zaxira"""
+
+    def queue(self, student, selections):
+        attempt = QuizAttempt.objects.create(quiz=self.quiz, student=student)
+        self.assertTrue(services.submit_attempt(attempt, selections))
+        return QuizAttempt.objects.get(pk=attempt.pk)
+
+    def test_worker_grades_queue(self):
+        attempt = self.queue(self.students[0], self.first_answers())
+        self.assertIsNotNone(attempt.completed_at)
+        self.assertFalse(attempt.is_graded())
+        self.assertFalse(services.submit_attempt(attempt, {}))
+
+        self.assertEqual(services.grade_submitted_attempts(), 1)
+        self.assertEqual(services.grade_submitted_attempts(), 0)
+        attempt.refresh_from_db()
+        self.assertTrue(attempt.is_graded())
+        self.assertEqual(attempt.score, self.submit(self.students[1], self.first_answers()).score)
+
+    def test_result_page_waits_then_falls_back(self):
+        attempt = self.queue(self.students[0], self.first_answers())
+        self.client.force_login(self.students[0])
+        status_url = reverse('assessments:quiz_result_status', args=[attempt.pk])
+
+        response = self.client.get(reverse('assessments:quiz_result', args=[attempt.pk]))
+        self.assertTemplateUsed(response, 'assessments/quiz_result_pending.html')
+        self.assertEqual(self.client.get(status_url).json(), {'completed': True, 'ready': False})
+
+        # Ishchi vaqtida olmadi - so'rov ichida baholanadi
+        QuizAttempt.objects.filter(pk=attempt.pk).update(completed_at=timezone.now() - timezone.timedelta(minutes=1))
+        self.assertEqual(self.client.get(status_url).json(), {'completed': True, 'ready': True})
+        self.assertTrue(QuizAttempt.objects.get(pk=attempt.pk).is_graded())
+
+    @override_settings(ASSESSMENTS_GRADING_TIMEOUT=0)
+    def test_fallback_disabled(self):
+        attempt = self.queue(self.students[0], {})
+        QuizAttempt.objects.filter(pk=attempt.pk).update(completed_at=timezone.now() - timezone.timedelta(hours=1))
+        self.assertFalse(services.grade_stalled_attempt(attempt.pk))
+        self.assertIn('assessments.W001', [warning.id for warning in async_grading_check(None)])
+
+
+# ===================== JONLI KUZATUV =====================
+
+class LiveCounterTests(QuizTestCase):
+    """Kesh hisoblagichlari voqealar bilan yuritilib, DB dan qayta tiklangani bilan bir xil turishi"""
+
+    def counters(self):
+        state = live.snapshot(self.quiz.pk)
+        state.pop('seq')
+        return state
+
+    def test_events_match_rebuild(self):
+        live.rebuild(self.quiz.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            attempts = [QuizAttempt.objects.create(quiz=self.quiz, student=student) for student in self.students[:4]]
+        for attempt in attempts[:3]:
+            with self.captureOnCommitCallbacks(execute=True):
+                services.autosave_attempt(attempt.pk, attempt.student, {
+                    str(question_id): sorted(ids) for question_id, ids in self.first_answers().items()
+                })
+        for attempt in attempts[:2]:
+            with self.captureOnCommitCallbacks(execute=True), override_settings(ASSESSMENTS_ASYNC_GRADING=False):
+                services.submit_attempt(QuizAttempt.objects.select_related('quiz').get(pk=attempt.pk), {})
+
+        counted = self.counters()
+        self.assertEqual(
+            (counted['started'], counted['in_progress'], counted['answered'], counted['submitted'], counted['graded']),
+            (4, 2, 8, 2, 2)
+        )
+        live.invalidate(self.quiz.pk)
+        self.assertEqual(counted, self.counters())
+
+    def test_snapshot_rebuilds_empty_cache(self):
+        self.submit(self.students[0], self.correct_answers())
+        cache.clear()
+        state = self.counters()
+        self.assertEqual((state['submitted'], state['histogram'][-1]), (1, 1))
+
+    def test_token(self):
+        token = live.make_token(self.quiz.pk, self.teacher.pk)
+        self.assertTrue(live.check_token(token, self.quiz.pk))
+        self.assertFalse(live.check_token(token, self.quiz.pk + 1))
+        self.assertFalse(live.check_token(token + 'x', self.quiz.pk))
+
+    @override_settings(ASSESSMENTS_LIVE_WAIT=25)
+    def test_long_poll_only_under_asgi_with_shared_cache(self):
+        wsgi = RequestFactory().get('/')
+        asgi = ASGIRequest({'type': 'http', 'method': 'GET', 'path': '/', 'headers': []}, io.BytesIO())
+
+        # Test sozlamalarida jarayon ichidagi kesh
+        self.assertEqual((live.live_wait(wsgi), live.live_wait(asgi)), (0, 0))
+        with mock.patch.object(live, 'shared_cache', return_value=True):
+            self.assertEqual((live.live_wait(wsgi), live.live_wait(asgi)), (0, 25))
+
+
+# ===================== MOSLASHUVCHAN TEST =====================
+
+class AdaptiveTests(QuizTestCase):
+    """Savollar bittadan, qobiliyat bahosi bo'yicha tanlanishi va kalibrovka"""
+
+    def setUp(self):
+        super().setUp()
+        Quiz.objects.filter(pk=self.quiz.pk).update(is_adaptive=True, adaptive_max_questions=5, adaptive_target_se=None)
+        self.quiz.refresh_from_db()
+
+    def take(self, student, answer):
+        """Testni oxirigacha topshirish; `answer(savol)` - tanlangan javob id lari"""
+        attempt = QuizAttempt.objects.create(quiz=self.quiz, student=student, shuffle_seed=student.pk)
+        questions = get_compiled_quiz(self.quiz).question_map
+        delivered = []
+        current = services.adaptive_step(attempt, {})
+        while current is not None:
+            self.assertNotIn(current, delivered)
+            delivered.append(current)
+            current = services.adaptive_step(attempt, {current: [str(pk) for pk in answer(questions[current])]})
+
+        with override_settings(ASSESSMENTS_ASYNC_GRADING=False):
+            services.submit_attempt(QuizAttempt.objects.select_related('quiz').get(pk=attempt.pk), {})
+        return QuizAttempt.objects.select_related('quiz').get(pk=attempt.pk), delivered
+
+    def test_delivers_one_question_at_a_time(self):
+        attempt, delivered = self.take(self.students[0], lambda question: question.correct_ids)
+        self.assertEqual(len(delivered), 5)
+        self.assertEqual(attempt.question_ids, delivered)
+        self.assertEqual(attempt.score, adaptive_score(self.quiz, dict.fromkeys(delivered, True)))
+
+        # Javob berilgandan keyin o'zgartirib bo'lmaydi
+        attempt = QuizAttempt.objects.create(quiz=self.quiz, student=self.students[1])
+        self.assertEqual(services.autosave_attempt(attempt.pk, self.students[1], {})[1], False)
+
+    def test_ability_orders_scores(self):
+        strong, strong_delivered = self.take(self.students[0], lambda question: question.correct_ids)
+        weak, weak_delivered = self.take(self.students[1], wrong_answer)
+        self.assertGreater(strong.score, weak.score)
+
+        table = get_item_table(self.quiz)
+        self.assertGreater(
+            estimate_ability(table, dict.fromkeys(strong_delivered, True))[0],
+            estimate_ability(table, dict.fromkeys(weak_delivered, False))[0]
+        )
+
+    def test_calibration_recovers_parameters(self):
+        rng = np.random.default_rng(19)
+        discrimination = rng.uniform(0.7, 2.0, 15)
+        difficulty = rng.uniform(-2, 2, 15)
+        theta = rng.normal(size=2000)
+
+        correct = rng.random((2000, 15)) < probability(discrimination, difficulty, theta).T
+        presented = rng.random((2000, 15)) < 0.8
+        estimated_a, estimated_b = estimate_parameters(correct & presented, presented)
+
+        self.assertGreater(np.corrcoef(difficulty, estimated_b)[0, 1], 0.95)
+        self.assertGreater(np.corrcoef(discrimination, estimated_a)[0, 1], 0.7)
+        self.assertLess(np.abs(estimated_b - difficulty).mean(), 0.3)
+
+
+# ===================== SAVOLLAR IMPORTI =====================
+
+AIKEN_SOURCE = """Poytaxt qaysi?
+A) Toshkent
+B) Samarqand
+ANSWER: A
+
+Xato javob harfi
+A) Bir
+B) Ikki
+ANSWER: D
+
+Variantdan keyin matn
+A) Bir
+bu qator ortiqcha
+B) Ikki
+ANSWER: B
+
+2 + 2 = ?
+A. 3
+B. 4
+ANSWER: b
+
+ANSWER qatorisiz
+A) Bir
+"""
+
+GIFT_SOURCE = """// izoh
+$CATEGORY: $course$/Matematika
+
+::Q1:: 2 + 2 = {=4 ~3 ~5 #izoh}
+
+Yer yumaloq {T}
+
+Tub sonlar {~%50%2 ~%50%3 ~%-100%4}
+
+Belgi \\{ ekranlangan {=a\\=b ~c}
+
+Sonli savol {#4}
+
+Moslashtirish {=a -> b =c -> d}
+
+Qisqa javob {=Toshkent}
+
+::Sarlavha yopilmagan {=a ~b}
+
+Javoblar bloki yo'q
+"""
+
+CSV_SOURCE = """question,answer_1,answer_2,answer_3,correct,type,points,difficulty,tags
+Poytaxt?,Toshkent,Samarqand,,1,,,,geo
+Juft sonlar?,2,3,4,"A,C",multiple,2,Qiyin,math
+Noto'g'ri ko'rsatkich,a,b,,5,,,,
+Ball xato,a,b,,1,,0,,
+Tur xato,a,b,,1,essay,,,
+"""
+
+
+class ImporterTests(QuizTestCase):
+    """Aiken, GIFT va CSV fayllaridan import: xatolar qator raqami bilan, xato bo'lsa hech narsa saqlanmaydi"""
+
+    def run_import(self, source, format, **options):
+        return import_questions(io.StringIO(source), format, quiz=self.quiz, **options)
+
+    def imported(self):
+        return [
+            (question.text, question.question_type, [(answer.text, answer.is_correct) for answer in question.answers.all()])
+            for question in self.quiz.questions.filter(order__gte=8).order_by('order').prefetch_related('answers')
+        ]
+
+    def assertErrors(self, report, expected):
+        self.assertEqual([(error.line, error.message) for error in report.errors], expected)
+
+    def test_aiken(self):
+        report = self.run_import(AIKEN_SOURCE, AIKEN)
+        self.assertErrors(report, [
+            (9, "To'g'ri javob harfi variantlarda yo'q: D"),
+            (13, "Variant yoki ANSWER qatori kutilgan edi"),
+            (22, "Savol ANSWER qatorisiz tugadi"),
+        ])
+        self.assertEqual((report.valid, report.saved), (2, False))
+        self.assertEqual(self.imported(), [])
+
+        report = self.run_import(AIKEN_SOURCE, AIKEN, skip_invalid=True)
+        self.assertTrue(report.saved)
+        self.assertEqual(self.imported(), [
+            ('Poytaxt qaysi?', 'single', [('Toshkent', True), ('Samarqand', False)]),
+            ('2 + 2 = ?', 'single', [('3', False), ('4', True)]),
+        ])
+
+    def test_gift(self):
+        report = self.run_import(GIFT_SOURCE, GIFT, skip_invalid=True)
+        self.assertErrors(report, [
+            (12, "Sonli javobli savollar qo'llab-quvvatlanmaydi"),
+            (14, "Moslashtirish savollari qo'llab-quvvatlanmaydi"),
+            (16, "Qisqa javobli savollar qo'llab-quvvatlanmaydi (noto'g'ri variantlar yo'q)"),
+            (18, "Sarlavha :: bilan yopilmagan"),
+            (20, "Javoblar bloki { ... } topilmadi"),
+        ])
+        self.assertEqual(self.imported(), [
+            ('2 + 2 =', 'single', [('4', True), ('3', False), ('5', False)]),
+            ('Yer yumaloq', 'true_false', [("To'g'ri", True), ("Noto'g'ri", False)]),
+            ('Tub sonlar', 'multiple', [('2', True), ('3', True), ('4', False)]),
+            ('Belgi { ekranlangan', 'single', [('a=b', True), ('c', False)]),
+        ])
+        self.assertEqual(set(self.quiz.questions.filter(order__gte=8).values_list('tags', flat=True)), {'Matematika'})
+
+    def test_csv(self):
+        report = self.run_import(CSV_SOURCE, CSV, skip_invalid=True)
+        self.assertErrors(report, [
+            (4, "To'g'ri javob ko'rsatkichi noto'g'ri: 5"),
+            (5, "Ball musbat butun son bo'lishi kerak: 0"),
+            (6, "Noma'lum savol turi: essay"),
+        ])
+        self.assertEqual(self.imported(), [
+            ('Poytaxt?', 'single', [('Toshkent', True), ('Samarqand', False)]),
+            ('Juft sonlar?', 'multiple', [('2', True), ('3', False), ('4', True)]),
+        ])
+        question = self.quiz.questions.get(text='Juft sonlar?')
+        self.assertEqual((question.points, question.difficulty, question.tags), (2, 'hard', 'math'))
+
+        report = self.run_import("question,answer_1\nQ,a\n", CSV)
+        self.assertErrors(report, [(1, "Sarlavhada ustunlar yo'q: correct")])
+
+    def test_dry_run_saves_nothing(self):
+        version = self.quiz.version
+        report = self.run_import(CSV_SOURCE.split('Noto')[0], CSV, dry_run=True)
+        self.assertEqual((report.valid, report.saved, report.has_errors), (2, False, False))
+        self.assertEqual(self.imported(), [])
+
+        self.assertTrue(self.run_import(CSV_SOURCE.split('Noto')[0], CSV).saved)
+        self.quiz.refresh_from_db()
+        self.assertGreater(self.quiz.version, version)
@@ -11,7 +11,9 @@ urlpatterns = [
     path('<int:pk>/', views.quiz_detail, name='quiz_detail'),
     path('<int:pk>/start/', views.quiz_start, name='quiz_start'),
     path('take/<int:pk>/', views.quiz_take, name='quiz_take'),
+    path('take/<int:pk>/autosave/', views.quiz_autosave, name='quiz_autosave'),
     path('result/<int:pk>/', views.quiz_result, name='quiz_result'),
+    path('result/<int:pk>/status/', views.quiz_result_status, name='quiz_result_status'),
     path('gradebook/', views.gradebook, name='gradebook'),
 
     # O'qituvchi
@@ -21,9 +23,17 @@ urlpatterns = [
     path('teacher/<int:pk>/edit/', views.teacher_quiz_edit, name='teacher_quiz_edit'),
     path('teacher/<int:pk>/delete/', views.teacher_quiz_delete, name='teacher_quiz_delete'),
     path('teacher/<int:pk>/results/', views.teacher_quiz_results, name='teacher_quiz_results'),
+    path('teacher/<int:pk>/live/', views.teacher_quiz_live, name='teacher_quiz_live'),
+    path('teacher/<int:pk>/live/poll/', views.teacher_quiz_live_poll, name='teacher_quiz_live_poll'),
+    path('teacher/<int:pk>/analysis/', views.teacher_quiz_analysis, name='teacher_quiz_analysis'),
+    path('teacher/<int:pk>/similarity/', views.teacher_quiz_similarity, name='teacher_quiz_similarity'),
+    path('teacher/<int:pk>/regrade/', views.teacher_quiz_regrade, name='teacher_quiz_regrade'),
+    path('teacher/regrade/<int:pk>/', views.teacher_regrade_detail, name='teacher_regrade_detail'),
+    path('teacher/regrade/<int:pk>/status/', views.teacher_regrade_status, name='teacher_regrade_status'),
 
     # O'qituvchi - Savol
     path('teacher/quiz/<int:quiz_pk>/question/create/', views.teacher_question_create, name='teacher_question_create'),
+    path('teacher/quiz/<int:quiz_pk>/question/import/', views.teacher_question_import, name='teacher_question_import'),
     path('teacher/question/<int:pk>/edit/', views.teacher_question_edit, name='teacher_question_edit'),
     path('teacher/question/<int:pk>/delete/', views.teacher_question_delete, name='teacher_question_delete'),
 ]
\ No newline at end of file
@@ -1,13 +1,33 @@
 # apps/assessments/views.py
 
+import asyncio
+import io
+import json
+import secrets
+import time
+
+from asgiref.sync import sync_to_async
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Avg
-
-from .models import Quiz, Question, Answer, QuizAttempt, StudentAnswer, Grade
-from .forms import QuizForm, QuestionForm, AnswerFormSet, QuizTakeForm
+from django.db.models import Avg, F, FilteredRelation, Q, Value
+from django.db.models.functions import Coalesce
+
+from .models import Quiz, Question, Answer, QuizAttempt, RegradeRun, GradingPolicy, Grade
+from .forms import QuizForm, QuestionForm, AnswerFormSet, QuizTakeForm, QuestionImportForm
+from .compiled import get_compiled_attempt, attempt_questions
+from .pools import sample_attempt_questions
+from .grading import review_attempt
+from .summaries import get_summary
+from .regrade import queue_regrade
+from .analysis import get_analysis
+from .similarity import get_similarity
+from .importers import ERRORS_SHOWN, detect_format, import_questions
+from . import services, live
+from apps.accounts.models import User
 from apps.courses.models import Course, Enrollment
 
 
@@ -16,33 +36,31 @@ from apps.courses.models import Course, Enrollment
 @login_required
 def quiz_list(request):
     """Talaba uchun testlar ro'yxati"""
-    enrollments = Enrollment.objects.filter(
-        student=request.user,
-        status='active'
-    ).values_list('course_id', flat=True)
-
+    # Bitta so'rov: yozilgan kurslar testlari + talabaning xulosa qatori (LEFT JOIN)
     quizzes = Quiz.objects.filter(
-        course_id__in=enrollments,
+        course__enrollments__student=request.user,
+        course__enrollments__status='active',
         is_active=True
-    ).select_related('course')
+    ).select_related('course').annotate(
+        summary=FilteredRelation(
+            'attempt_summaries',
+            condition=Q(attempt_summaries__student=request.user)
+        ),
+        attempts_count=Coalesce(F('summary__attempts_used'), Value(0)),
+        best_score=F('summary__best_score'),
+        is_passed=F('summary__is_passed'),
+    )
 
-    # Har bir test uchun urinishlar sonini olish
-    quiz_data = []
-    for quiz in quizzes:
-        attempts = QuizAttempt.objects.filter(
-            quiz=quiz,
-            student=request.user
-        )
-        attempts_count = attempts.count()
-        best_score = attempts.order_by('-score').first()
-
-        quiz_data.append({
+    quiz_data = [
+        {
             'quiz': quiz,
-            'attempts_count': attempts_count,
-            'attempts_left': quiz.attempts_allowed - attempts_count,
-            'best_score': best_score.score if best_score else None,
-            'is_passed': best_score.is_passed if best_score else None
-        })
+            'attempts_count': quiz.attempts_count,
+            'attempts_left': quiz.attempts_allowed - quiz.attempts_count,
+            'best_score': quiz.best_score,
+            'is_passed': quiz.is_passed
+        }
+        for quiz in quizzes
+    ]
 
     return render(request, 'assessments/quiz_list.html', {
         'quiz_data': quiz_data
@@ -71,10 +89,11 @@ def quiz_detail(request, pk):
         student=request.user
     ).order_by('-started_at')
 
-    attempts_left = quiz.attempts_allowed - attempts.count()
+    summary = get_summary(quiz, request.user)
+    attempts_left = quiz.attempts_allowed - summary.attempts_used
 
     # Davom etayotgan urinish bormi?
-    ongoing_attempt = attempts.filter(completed_at__isnull=True).first()
+    ongoing_attempt = summary.ongoing_attempt
 
     return render(request, 'assessments/quiz_detail.html', {
         'quiz': quiz,
@@ -106,30 +125,24 @@ def quiz_start(request, pk):
         return redirect('assessments:quiz_detail', pk=pk)
 
     # Urinishlar sonini tekshirish
-    attempts_count = QuizAttempt.objects.filter(
-        quiz=quiz,
-        student=request.user,
-        completed_at__isnull=False
-    ).count()
+    summary = get_summary(quiz, request.user)
 
-    if attempts_count >= quiz.attempts_allowed:
+    if summary.completed_count >= quiz.attempts_allowed:
         messages.error(request, 'Urinishlar soni tugagan!')
         return redirect('assessments:quiz_detail', pk=pk)
 
     # Davom etayotgan urinish bormi?
-    ongoing_attempt = QuizAttempt.objects.filter(
-        quiz=quiz,
-        student=request.user,
-        completed_at__isnull=True
-    ).first()
+    if summary.ongoing_attempt_id:
+        return redirect('assessments:quiz_take', pk=summary.ongoing_attempt_id)
 
-    if ongoing_attempt:
-        return redirect('assessments:quiz_take', pk=ongoing_attempt.pk)
-
-    # Yangi urinish yaratish
+    # Yangi urinish yaratish (bank savollari shu yerda bir marta tanlanadi;
+    # moslashuvchan testda savollar topshirish davomida qo'shiladi)
+    seed = secrets.randbits(31)
     attempt = QuizAttempt.objects.create(
         quiz=quiz,
-        student=request.user
+        student=request.user,
+        shuffle_seed=seed,
+        question_ids=[] if quiz.is_adaptive else sample_attempt_questions(quiz, seed)
     )
 
     return redirect('assessments:quiz_take', pk=attempt.pk)
@@ -138,7 +151,11 @@ def quiz_start(request, pk):
 @login_required
 def quiz_take(request, pk):
     """Testni topshirish"""
-    attempt = get_object_or_404(QuizAttempt, pk=pk, student=request.user)
+    attempt = get_object_or_404(
+        QuizAttempt.objects.select_related('quiz', 'quiz__course'),
+        pk=pk,
+        student=request.user
+    )
 
     # Tugatilganmi?
     if attempt.is_completed():
@@ -147,43 +164,95 @@ def quiz_take(request, pk):
     # Vaqt tugaganmi?
     time_remaining = attempt.time_remaining()
     if time_remaining is not None and time_remaining <= 0:
-        attempt.calculate_score()
+        # Avtomatik saqlangan javoblar bilan yakunlash
+        services.submit_attempt(attempt, {})
         messages.warning(request, 'Vaqt tugadi! Test avtomatik yakunlandi.')
         return redirect('assessments:quiz_result', pk=pk)
 
     quiz = attempt.quiz
-    questions = quiz.questions.prefetch_related('answers').all()
+    if quiz.is_adaptive:
+        return adaptive_take(request, attempt, time_remaining)
 
-    if quiz.shuffle_questions:
-        questions = questions.order_by('?')
+    # Savollar keshdan (kompilyatsiya qilingan nusxa), urinishga xos tartibda
+    questions = attempt_questions(get_compiled_attempt(attempt), attempt)
 
     if request.method == 'POST':
-        # Javoblarni saqlash
-        for question in questions:
-            field_name = f'question_{question.pk}'
-            selected_ids = request.POST.getlist(field_name)
-
-            if selected_ids:
-                student_answer, created = StudentAnswer.objects.get_or_create(
-                    attempt=attempt,
-                    question=question
-                )
-                student_answer.selected_answers.clear()
-                student_answer.selected_answers.add(*selected_ids)
-
-        # Testni yakunlash
-        attempt.calculate_score()
-        messages.success(request, 'Test yakunlandi!')
+        # Javoblarni saqlash va testni yakunlash
+        posted = {
+            question.pk: request.POST.getlist(f'question_{question.pk}')
+            for question in questions
+        }
+        if services.submit_attempt(attempt, posted):
+            messages.success(request, 'Test yakunlandi!')
         return redirect('assessments:quiz_result', pk=pk)
 
     return render(request, 'assessments/quiz_take.html', {
         'attempt': attempt,
         'quiz': quiz,
         'questions': questions,
+        'time_remaining': time_remaining,
+        'draft': attempt.draft
+    })
+
+
+def adaptive_take(request, attempt, time_remaining):
+    """Moslashuvchan test: savollar bittadan, javobdan keyin keyingisi tanlanadi"""
+    posted = {}
+    if request.method == 'POST' and attempt.question_ids:
+        current = attempt.question_ids[-1]
+        posted = {current: request.POST.getlist(f'question_{current}')}
+
+    question_id = services.adaptive_step(attempt, posted)
+    if question_id is None or (request.method == 'POST' and 'finish' in request.POST):
+        if services.submit_attempt(attempt, {}):
+            messages.success(request, 'Test yakunlandi!')
+        return redirect('assessments:quiz_result', pk=attempt.pk)
+
+    if request.method == 'POST':
+        if question_id in posted:
+            messages.error(request, 'Javobni tanlang!')
+        return redirect('assessments:quiz_take', pk=attempt.pk)
+
+    question = next(
+        question for question in attempt_questions(get_compiled_attempt(attempt), attempt)
+        if question.pk == question_id
+    )
+    return render(request, 'assessments/quiz_take_adaptive.html', {
+        'attempt': attempt,
+        'quiz': attempt.quiz,
+        'question': question,
+        'number': len(attempt.question_ids),
         'time_remaining': time_remaining
     })
 
 
+@login_required
+def quiz_autosave(request, pk):
+    """Javoblarni avtomatik saqlash (JSON API)"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST method required'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        delta = data['answers']
+        if not isinstance(delta, dict):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    attempt, saved = services.autosave_attempt(pk, request.user, delta)
+
+    if attempt is None:
+        return JsonResponse({'error': 'Not found'}, status=404)
+    if not saved:
+        return JsonResponse({'error': 'Attempt closed'}, status=409)
+
+    return JsonResponse({
+        'saved': len(attempt.draft),
+        'time_remaining': attempt.time_remaining()
+    })
+
+
 @login_required
 def quiz_result(request, pk):
     """Test natijasi"""
@@ -192,9 +261,14 @@ def quiz_result(request, pk):
     if not attempt.is_completed():
         return redirect('assessments:quiz_take', pk=pk)
 
-    student_answers = attempt.student_answers.select_related(
-        'question'
-    ).prefetch_related('selected_answers', 'question__answers').all()
+    # Navbatda - baholash tugaguncha kutish sahifasi (ishchi kechiksa shu yerda baholanadi)
+    if not attempt.is_graded():
+        if not services.grade_stalled_attempt(attempt.pk):
+            return render(request, 'assessments/quiz_result_pending.html', {'attempt': attempt})
+        attempt.refresh_from_db()
+
+    # Javoblar qaysi usulda saqlanganidan qat'i nazar bir xil ko'rinishda
+    student_answers = review_attempt(attempt)
 
     return render(request, 'assessments/quiz_result.html', {
         'attempt': attempt,
@@ -203,37 +277,47 @@ def quiz_result(request, pk):
     })
 
 
+@login_required
+def quiz_result_status(request, pk):
+    """Natija tayyormi (JSON API, kutish sahifasi so'raydi)"""
+    attempt = QuizAttempt.objects.filter(pk=pk, student=request.user).values('completed_at', 'graded_at').first()
+    if attempt is None:
+        return JsonResponse({'error': 'Not found'}, status=404)
+
+    completed = attempt['completed_at'] is not None
+    ready = attempt['graded_at'] is not None
+    if completed and not ready:
+        # Ishchi vaqtida olmagan bo'lsa - so'rov ichida baholanadi
+        ready = services.grade_stalled_attempt(pk)
+
+    return JsonResponse({
+        'completed': completed,
+        'ready': ready
+    })
+
+
 @login_required
 def gradebook(request):
     """Talaba baholar jadvali"""
+    # Faqat o'qish: baholar kirishlar o'zgarganda hisoblanadi
     enrollments = Enrollment.objects.filter(
         student=request.user
-    ).select_related('course')
+    ).select_related('course', 'course__grading_policy')
+
+    grades = {
+        grade.course_id: grade
+        for grade in Grade.objects.filter(student=request.user)
+    }
 
-    grades_data = []
-    for enrollment in enrollments:
-        grade, created = Grade.objects.get_or_create(
-            student=request.user,
-            course=enrollment.course
-        )
-
-        # Test balini hisoblash
-        attempts = QuizAttempt.objects.filter(
-            student=request.user,
-            quiz__course=enrollment.course,
-            completed_at__isnull=False
-        )
-
-        if attempts.exists():
-            avg_score = attempts.aggregate(avg=Avg('score'))['avg']
-            grade.quiz_score = avg_score or 0
-            grade.calculate_total()
-
-        grades_data.append({
+    grades_data = [
+        {
             'course': enrollment.course,
-            'grade': grade,
+            'grade': grades.get(enrollment.course_id) or Grade(student=request.user, course=enrollment.course),
+            'policy': GradingPolicy.for_course(enrollment.course),
             'enrollment': enrollment
-        })
+        }
+        for enrollment in enrollments
+    ]
 
     return render(request, 'assessments/gradebook.html', {
         'grades_data': grades_data
@@ -340,6 +424,42 @@ def teacher_quiz_detail(request, pk):
     })
 
 
+@login_required
+def teacher_quiz_analysis(request, pk):
+    """Savollar tahlili (qiyinlik, ajratish, variantlar, ishonchlilik)"""
+    quiz = get_object_or_404(Quiz.objects.select_related('course'), pk=pk, course__teacher=request.user)
+
+    return render(request, 'assessments/teacher/quiz_analysis.html', {
+        'quiz': quiz,
+        'analysis': get_analysis(quiz)
+    })
+
+
+@login_required
+def teacher_quiz_similarity(request, pk):
+    """Javoblari shubhali darajada o'xshash urinishlar"""
+    quiz = get_object_or_404(Quiz.objects.select_related('course'), pk=pk, course__teacher=request.user)
+    report = get_similarity(quiz)
+
+    students = User.objects.in_bulk(
+        {pair.student_a for pair in report.pairs} | {pair.student_b for pair in report.pairs}
+    )
+    pairs = [
+        {
+            'pair': pair,
+            'student_a': students.get(pair.student_a),
+            'student_b': students.get(pair.student_b)
+        }
+        for pair in report.pairs
+    ]
+
+    return render(request, 'assessments/teacher/quiz_similarity.html', {
+        'quiz': quiz,
+        'report': report,
+        'pairs': pairs
+    })
+
+
 @login_required
 def teacher_question_create(request, quiz_pk):
     """Savol qo'shish"""
@@ -360,7 +480,7 @@ def teacher_question_create(request, quiz_pk):
             messages.success(request, 'Savol qo\'shildi!')
             return redirect('assessments:teacher_quiz_detail', pk=quiz_pk)
     else:
-        last_order = quiz.questions.count()
+        last_order = quiz.question_count
         form = QuestionForm(initial={'order': last_order})
         formset = AnswerFormSet()
 
@@ -372,6 +492,44 @@ def teacher_question_create(request, quiz_pk):
     })
 
 
+@login_required
+def teacher_question_import(request, quiz_pk):
+    """Savollarni Aiken/GIFT/CSV fayldan import qilish"""
+    quiz = get_object_or_404(Quiz, pk=quiz_pk, course__teacher=request.user)
+    report = None
+
+    if request.method == 'POST':
+        form = QuestionImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            # Fayl qatorma-qator o'qiladi (butunicha xotiraga yuklanmaydi)
+            lines = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+            try:
+                report = import_questions(
+                    lines,
+                    form.cleaned_data['format'] or detect_format(upload.name),
+                    quiz=quiz,
+                    skip_invalid=form.cleaned_data['skip_invalid']
+                )
+            except UnicodeDecodeError:
+                form.add_error('file', "Fayl UTF-8 kodlashda bo'lishi kerak")
+            else:
+                if report.saved:
+                    messages.success(request, f'{report.valid} ta savol import qilindi!')
+                    if not report.has_errors:
+                        return redirect('assessments:teacher_quiz_detail', pk=quiz_pk)
+    else:
+        form = QuestionImportForm()
+
+    return render(request, 'assessments/teacher/question_import.html', {
+        'form': form,
+        'quiz': quiz,
+        'report': report,
+        'errors': report.errors[:ERRORS_SHOWN] if report else [],
+        'hidden_errors': len(report.errors) - ERRORS_SHOWN if report else 0
+    })
+
+
 @login_required
 def teacher_question_edit(request, pk):
     """Savolni tahrirlash"""
@@ -382,9 +540,17 @@ def teacher_question_edit(request, pk):
         formset = AnswerFormSet(request.POST, instance=question)
 
         if form.is_valid() and formset.is_valid():
+            old_key = set(question.answers.filter(is_correct=True).values_list('pk', flat=True))
             form.save()
             formset.save()
             messages.success(request, 'Savol yangilandi!')
+
+            new_key = set(question.answers.filter(is_correct=True).values_list('pk', flat=True))
+            if old_key != new_key and question.quiz.attempts.filter(completed_at__isnull=False).exists():
+                messages.warning(
+                    request,
+                    'Javob kaliti o\'zgardi. Mavjud natijalarni yangilash uchun testni qayta baholang.'
+                )
             return redirect('assessments:teacher_quiz_detail', pk=question.quiz.pk)
     else:
         form = QuestionForm(instance=question)
@@ -427,5 +593,87 @@ def teacher_quiz_results(request, pk):
 
     return render(request, 'assessments/teacher/quiz_results.html', {
         'quiz': quiz,
-        'attempts': attempts
+        'attempts': attempts,
+        'regrade_runs': quiz.regrade_runs.all()[:5]
+    })
+
+
+@login_required
+def teacher_quiz_live(request, pk):
+    """Test jarayonini jonli kuzatish"""
+    quiz = get_object_or_404(Quiz.objects.select_related('course'), pk=pk, course__teacher=request.user)
+
+    return render(request, 'assessments/teacher/quiz_live.html', {
+        'quiz': quiz,
+        'state': live.snapshot(quiz.pk),
+        'token': live.make_token(quiz.pk, request.user.pk),
+        'live_wait': live.live_wait(request)
+    })
+
+
+async def teacher_quiz_live_poll(request, pk):
+    """Kuzatuv holati (long-poll JSON API): o'zgarish bo'lguncha yoki kutish vaqti tugaguncha javob qaytmaydi
+
+    Sessiya va DB ga murojaat qilinmaydi - ruxsat sahifadagi imzolangan token bilan,
+    hisoblagichlar keshdan o'qiladi.
+    """
+    if not live.check_token(request.GET.get('token', ''), pk):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+
+    try:
+        since = int(request.GET.get('since', 0))
+    except ValueError:
+        since = 0
+
+    deadline = time.monotonic() + live.live_wait(request)
+    while True:
+        state = await sync_to_async(live.snapshot)(pk)
+        if state['seq'] != since or time.monotonic() >= deadline:
+            return JsonResponse(state)
+        await asyncio.sleep(live.POLL_INTERVAL)
+
+
+@login_required
+def teacher_quiz_regrade(request, pk):
+    """Testni joriy javob kaliti bo'yicha qayta baholash"""
+    quiz = get_object_or_404(Quiz, pk=pk, course__teacher=request.user)
+
+    if request.method != 'POST':
+        return redirect('assessments:teacher_quiz_results', pk=pk)
+
+    # So'rov ichida bajarilmaydi - `regrade_quiz --pending` ishchisi oladi, sahifa jarayonni so'raydi
+    run = queue_regrade(quiz, started_by=request.user)
+    messages.success(request, 'Qayta baholash navbatga qo\'yildi!')
+    return redirect('assessments:teacher_regrade_detail', pk=run.pk)
+
+
+@login_required
+def teacher_regrade_detail(request, pk):
+    """Qayta baholash natijasi: o'zgargan urinishlar"""
+    run = get_object_or_404(
+        RegradeRun.objects.select_related('quiz', 'quiz__course', 'started_by'),
+        pk=pk,
+        quiz__course__teacher=request.user
+    )
+
+    return render(request, 'assessments/teacher/regrade_detail.html', {
+        'run': run,
+        'quiz': run.quiz,
+        'changes': run.changes.select_related('student', 'attempt')
+    })
+
+
+@login_required
+def teacher_regrade_status(request, pk):
+    """Qayta baholash jarayoni (JSON API, natija sahifasi so'raydi)"""
+    run = RegradeRun.objects.filter(pk=pk, quiz__course__teacher=request.user).first()
+    if run is None:
+        return JsonResponse({'error': 'Not found'}, status=404)
+
+    return JsonResponse({
+        'status': run.status,
+        'status_display': run.get_status_display(),
+        'processed': run.attempts_processed,
+        'total': run.attempts_total,
+        'finished': run.is_finished()
     })
\ No newline at end of file
@@ -1,7 +1,10 @@
 # apps/attendance/admin.py
 
 from django.contrib import admin
-from .models import Session, Attendance
+from django.db import transaction
+
+from .models import Holiday, Session, TimetableSlot, Attendance, AttendanceSummary
+from .timetable import sessions_deleted
 
 
 class AttendanceInline(admin.TabularInline):
@@ -10,6 +13,20 @@ class AttendanceInline(admin.TabularInline):
     readonly_fields = ('marked_at',)
 
 
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'name')
+    search_fields = ('name',)
+    date_hierarchy = 'date'
+
+
+@admin.register(TimetableSlot)
+class TimetableSlotAdmin(admin.ModelAdmin):
+    list_display = ('course', 'weekday', 'session_type', 'start_time', 'end_time', 'date_from', 'date_to')
+    list_filter = ('weekday', 'session_type', 'course')
+    search_fields = ('course__name', 'course__code', 'title')
+
+
 @admin.register(Session)
 class SessionAdmin(admin.ModelAdmin):
     list_display = ('course', 'title', 'session_type', 'date', 'start_time', 'end_time', 'present_count',
@@ -21,6 +38,13 @@ class SessionAdmin(admin.ModelAdmin):
 
     inlines = [AttendanceInline]
 
+    def delete_queryset(self, request, queryset):
+        # Ommaviy o'chirish: xulosalar va baholar kurslar bo'yicha bir marta yangilanadi
+        with transaction.atomic():
+            course_ids = set(queryset.values_list('course_id', flat=True))
+            queryset.delete()
+            sessions_deleted(course_ids)
+
     fieldsets = (
         (None, {
             'fields': ('course', 'title', 'session_type')
@@ -38,4 +62,17 @@ class AttendanceAdmin(admin.ModelAdmin):
     search_fields = ('student__username', 'student__first_name', 'session__course__name')
     list_editable = ('status',)
     readonly_fields = ('marked_at',)
-    ordering = ['-session__date']
\ No newline at end of file
+    ordering = ['-session__date']
+
+
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('student', 'course', 'present_count', 'late_count', 'absent_count', 'excused_count',
+                    'total_sessions', 'updated_at')
+    list_filter = ('course',)
+    search_fields = ('student__username', 'student__first_name', 'course__code')
+    readonly_fields = ('student', 'course', 'present_count', 'late_count', 'absent_count', 'excused_count',
+                       'total_sessions', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
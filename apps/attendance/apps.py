@@ -6,3 +6,5 @@ class AttendanceConfig(AppConfig):
     name = 'apps.attendance'
     verbose_name = 'Davomat'
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,173 @@
+# apps/attendance/checkin.py
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string, salted_hmac
+
+from .models import Attendance, CheckinEntry
+from . import services
+
+CODE_DIGITS = 6
+CODE_SALT = 'attendance.checkin'
+
+
+def code_period():
+    """Kod almashish oralig'i, soniya (ATTENDANCE_CHECKIN_CODE_PERIOD)"""
+    return getattr(settings, 'ATTENDANCE_CHECKIN_CODE_PERIOD', 30)
+
+
+def checkin_window():
+    """Check-in oynasi standart uzunligi, daqiqa (ATTENDANCE_CHECKIN_WINDOW)"""
+    return getattr(settings, 'ATTENDANCE_CHECKIN_WINDOW', 10)
+
+
+def flush_batch():
+    """Navbatda shuncha yozuv to'planganda Attendance ga tushiriladi (ATTENDANCE_CHECKIN_BATCH)"""
+    return getattr(settings, 'ATTENDANCE_CHECKIN_BATCH', 50)
+
+
+def max_attempts():
+    """Ketma-ket noto'g'ri kodlar chegarasi (ATTENDANCE_CHECKIN_MAX_ATTEMPTS)"""
+    return getattr(settings, 'ATTENDANCE_CHECKIN_MAX_ATTEMPTS', 5)
+
+
+def lockout_seconds():
+    """Chegaradan keyin kod kiritish bloklanadigan vaqt, soniya (ATTENDANCE_CHECKIN_LOCKOUT)"""
+    return getattr(settings, 'ATTENDANCE_CHECKIN_LOCKOUT', 5 * 60)
+
+
+def attempts_key(user_id):
+    return f'attendance:checkin:attempts:{user_id}'
+
+
+# ===================== AYLANUVCHI KOD =====================
+
+def code_for_step(session, step):
+    """Sessiya kaliti va vaqt qadami bo'yicha HMAC kod (DB ga yozilmaydi)"""
+    digest = salted_hmac(CODE_SALT, f'{session.pk}:{session.checkin_secret}:{step}').hexdigest()
+    return str(int(digest[:8], 16) % 10 ** CODE_DIGITS).zfill(CODE_DIGITS)
+
+
+def current_code(session, now=None):
+    """Joriy kod va u almashguncha qolgan soniyalar"""
+    now = time.time() if now is None else now
+    step, elapsed = divmod(now, code_period())
+    return code_for_step(session, int(step)), int(code_period() - elapsed)
+
+
+def verify_code(session, code, now=None):
+    """Kod joriy yoki oldingi qadamga mos keladimi (kiritish kechikishi uchun)"""
+    if not session.checkin_secret or not session.is_checkin_open:
+        return False
+    code = (code or '').strip()
+    step = int((time.time() if now is None else now) // code_period())
+    return any(constant_time_compare(code, code_for_step(session, candidate)) for candidate in (step, step - 1))
+
+
+def open_checkin(session, minutes=None):
+    """Check-in ni ochish: yangi kalit (eski kodlar yaroqsiz) va tugash vaqti"""
+    session.checkin_secret = get_random_string(32)
+    session.checkin_until = timezone.now() + timedelta(minutes=minutes or checkin_window())
+    session.save(update_fields=['checkin_secret', 'checkin_until'])
+
+
+def close_checkin(session):
+    """Check-in ni yopish va navbatni tushirish"""
+    session.checkin_until = timezone.now()
+    session.save(update_fields=['checkin_until'])
+    return flush_checkins(session)
+
+
+# ===================== URINISHLAR CHEGARASI =====================
+
+def is_locked_out(user_id):
+    """Talaba noto'g'ri kodlar chegarasiga yetganmi (blok muddati tugaguncha)"""
+    return (cache.get(attempts_key(user_id)) or 0) >= max_attempts()
+
+
+def record_failed_attempt(user_id):
+    """Noto'g'ri kodni sanash; chegaraga yetganda blok muddati shu paytdan boshlanadi
+
+    Hisoblagich umumiy keshda - barcha ishchilar uchun bitta. Qolgan urinishlar soni qaytadi.
+    """
+    key = attempts_key(user_id)
+    cache.add(key, 0, lockout_seconds())
+    try:
+        attempts = cache.incr(key)
+    except ValueError:
+        # Kalit shu orada muddati o'tib o'chgan - qayta yaratiladi
+        cache.add(key, 0, lockout_seconds())
+        attempts = cache.incr(key)
+    if attempts >= max_attempts():
+        cache.touch(key, lockout_seconds())
+    return max(max_attempts() - attempts, 0)
+
+
+def reset_attempts(user_id):
+    cache.delete(attempts_key(user_id))
+
+
+# ===================== NAVBAT =====================
+
+def check_in(session, student_id):
+    """Talabani check-in navbatiga qo'shish (Attendance ga darhol yozilmaydi)
+
+    Navbat DB jadvali - barcha ishchilar uchun umumiy. Har bir check-in bitta
+    ignore_conflicts INSERT: qulf kutilmaydi, takroriy yuborish e'tiborsiz qoladi.
+    Navbat ATTENDANCE_CHECKIN_BATCH ga yetganda shu so'rov uni tushiradi.
+    Talaba avval belgilangan yoki navbatda bo'lsa False qaytadi.
+    """
+    if Attendance.objects.filter(session=session, student_id=student_id).exclude(status=Attendance.Status.ABSENT).exists():
+        return False
+    entries = CheckinEntry.objects.filter(session=session)
+    if entries.filter(student_id=student_id).exists():
+        return False
+
+    CheckinEntry.objects.bulk_create([CheckinEntry(session=session, student_id=student_id)], ignore_conflicts=True)
+    if entries.count() >= flush_batch():
+        flush_checkins(session)
+    return True
+
+
+def pending_count(session):
+    """Navbatda tushirilishini kutayotgan yozuvlar soni"""
+    return CheckinEntry.objects.filter(session=session).count()
+
+
+def flush_checkins(session):
+    """Navbatdagi yozuvlarni bitta mark_attendance bilan Attendance ga tushirish
+
+    Yozuvlar skip_locked bilan qulflanadi - parallel tushirish ularni o'tkazib yuboradi,
+    check-in INSERT lari esa kutmaydi. O'qituvchi qo'lda "Qatnashdi"dan boshqa holat
+    (kechikdi, sababli) qo'ygan talabalar o'zgartirilmaydi. Tushirilgan yozuvlar
+    o'chiriladi. Davomatga yozilgan talabalar soni qaytadi.
+    """
+    with transaction.atomic():
+        entries = dict(
+            CheckinEntry.objects.select_for_update(skip_locked=True)
+            .filter(session=session)
+            .values_list('pk', 'student_id')
+        )
+        if not entries:
+            return 0
+
+        existing = {
+            attendance.student_id: attendance
+            for attendance in Attendance.objects.select_for_update().filter(
+                session=session,
+                student_id__in=list(entries.values())
+            )
+        }
+        marks = {
+            student_id: (Attendance.Status.PRESENT, existing[student_id].notes if student_id in existing else '')
+            for student_id in entries.values()
+            if student_id not in existing or existing[student_id].status == Attendance.Status.ABSENT
+        }
+        services.mark_attendance(session, marks)
+        CheckinEntry.objects.filter(pk__in=list(entries)).delete()
+    return len(marks)
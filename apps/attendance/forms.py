@@ -1,7 +1,7 @@
 # apps/attendance/forms.py
 
 from django import forms
-from .models import Session, Attendance
+from .models import Session, Attendance, TimetableSlot
 
 
 class SessionForm(forms.ModelForm):
@@ -32,6 +32,41 @@ class SessionForm(forms.ModelForm):
         }
 
 
+class TimetableSlotForm(forms.ModelForm):
+    """Haftalik jadval bandi formasi"""
+    class Meta:
+        model = TimetableSlot
+        fields = ('weekday', 'session_type', 'title', 'start_time', 'end_time', 'date_from', 'date_to')
+        widgets = {
+            'weekday': forms.Select(attrs={
+                'class': 'form-select'
+            }),
+            'session_type': forms.Select(attrs={
+                'class': 'form-select'
+            }),
+            'title': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Mavzu (ixtiyoriy)'
+            }),
+            'start_time': forms.TimeInput(attrs={
+                'class': 'form-control',
+                'type': 'time'
+            }),
+            'end_time': forms.TimeInput(attrs={
+                'class': 'form-control',
+                'type': 'time'
+            }),
+            'date_from': forms.DateInput(attrs={
+                'class': 'form-control',
+                'type': 'date'
+            }, format='%Y-%m-%d'),
+            'date_to': forms.DateInput(attrs={
+                'class': 'form-control',
+                'type': 'date'
+            }, format='%Y-%m-%d'),
+        }
+
+
 class AttendanceForm(forms.ModelForm):
     """Davomat formasi"""
     class Meta:
@@ -45,4 +80,58 @@ class AttendanceForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'Izoh (ixtiyoriy)'
             }),
-        }
\ No newline at end of file
+        }
+
+
+class AttendanceReportFilterForm(forms.Form):
+    """Davomat hisoboti filtrlari"""
+    date_from = forms.DateField(
+        required=False,
+        label="Boshlanish",
+        widget=forms.DateInput(attrs={
+            'class': 'form-control form-control-sm',
+            'type': 'date'
+        })
+    )
+    date_to = forms.DateField(
+        required=False,
+        label="Tugash",
+        widget=forms.DateInput(attrs={
+            'class': 'form-control form-control-sm',
+            'type': 'date'
+        })
+    )
+    session_type = forms.ChoiceField(
+        required=False,
+        label="Turi",
+        choices=[('', 'Barchasi')] + Session.Type.choices,
+        widget=forms.Select(attrs={
+            'class': 'form-select form-select-sm'
+        })
+    )
+
+
+class CheckinOpenForm(forms.Form):
+    """Check-in oynasini ochish"""
+    minutes = forms.IntegerField(
+        min_value=1,
+        max_value=90,
+        label="Davomiyligi (daqiqa)",
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control'
+        })
+    )
+
+
+class CheckinCodeForm(forms.Form):
+    """Talaba check-in kodi"""
+    code = forms.CharField(
+        max_length=6,
+        label="Kod",
+        widget=forms.TextInput(attrs={
+            'class': 'form-control form-control-lg text-center',
+            'inputmode': 'numeric',
+            'autocomplete': 'off',
+            'placeholder': '000000'
+        })
+    )
@@ -0,0 +1,57 @@
+# apps/attendance/management/commands/generate_sessions.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from apps.attendance.models import TimetableSlot
+from apps.attendance.timetable import generate_sessions, reschedule_slot
+
+
+class Command(BaseCommand):
+    help = "Haftalik dars jadvalidan sessiyalarni kurs yoki fakultet bo'yicha hosil qilish (qayta ishga tushirish xavfsiz)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=int,
+            action='append',
+            dest='course_ids',
+            help="Faqat shu kurs(lar) uchun (bir necha marta berish mumkin)"
+        )
+        parser.add_argument(
+            '--faculty',
+            type=int,
+            action='append',
+            dest='faculty_ids',
+            help="Faqat shu fakultet(lar) kurslari uchun"
+        )
+        parser.add_argument(
+            '--reschedule',
+            action='store_true',
+            help="Kelgusi sessiyalarni ham jadvalga moslash (vaqt, kun, dam olish kunlari o'zgargandan keyin)"
+        )
+
+    def handle(self, *args, **options):
+        slots = TimetableSlot.objects.order_by('pk')
+        if options['course_ids']:
+            slots = slots.filter(course_id__in=options['course_ids'])
+        if options['faculty_ids']:
+            slots = slots.filter(course__department__faculty_id__in=options['faculty_ids'])
+
+        if options['reschedule']:
+            updated = created = removed = 0
+            for slot in slots:
+                counts = reschedule_slot(slot)
+                updated += counts[0]
+                created += counts[1]
+                removed += counts[2]
+            self.stdout.write(self.style.SUCCESS(
+                f"{updated} ta sessiya yangilandi, {created} ta yaratildi, {removed} ta o'chirildi."
+            ))
+            return
+
+        try:
+            created = generate_sessions(slots)
+        except IntegrityError:
+            raise CommandError("Sessiyalar parallel yaratilmoqda - hech narsa saqlanmadi, qayta ishga tushiring.")
+        self.stdout.write(self.style.SUCCESS(f"{created} ta sessiya yaratildi."))
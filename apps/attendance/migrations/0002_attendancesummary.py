@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_summaries(apps, schema_editor):
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    Session = apps.get_model('attendance', 'Session')
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceSummary = apps.get_model('attendance', 'AttendanceSummary')
+
+    statuses = {
+        'present': 'present_count',
+        'late': 'late_count',
+        'absent': 'absent_count',
+        'excused': 'excused_count',
+    }
+    counts = {
+        (row['student_id'], row['session__course_id']): row
+        for row in Attendance.objects.order_by().values('student_id', 'session__course_id').annotate(**{
+            field: Count('pk', filter=Q(status=status)) for status, field in statuses.items()
+        })
+    }
+    totals = dict(
+        Session.objects.order_by().values('course_id').annotate(total=Count('pk')).values_list('course_id', 'total')
+    )
+    pairs = set(counts) | set(Enrollment.objects.filter(status='active').values_list('student_id', 'course_id'))
+
+    AttendanceSummary.objects.bulk_create([
+        AttendanceSummary(
+            student_id=student_id,
+            course_id=course_id,
+            total_sessions=totals.get(course_id, 0),
+            **{field: counts.get((student_id, course_id), {}).get(field, 0) for field in statuses.values()}
+        )
+        for student_id, course_id in pairs
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+        ('courses', '0003_enrollment_completed_lessons'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present_count', models.PositiveIntegerField(default=0, verbose_name='Qatnashdi')),
+                ('late_count', models.PositiveIntegerField(default=0, verbose_name='Kechikdi')),
+                ('absent_count', models.PositiveIntegerField(default=0, verbose_name='Qatnashmadi')),
+                ('excused_count', models.PositiveIntegerField(default=0, verbose_name='Sababli')),
+                ('total_sessions', models.PositiveIntegerField(default=0, verbose_name='Sessiyalar soni')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='courses.course', verbose_name='Kurs')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to=settings.AUTH_USER_MODEL, verbose_name='Talaba')),
+            ],
+            options={
+                'verbose_name': 'Davomat xulosasi',
+                'verbose_name_plural': 'Davomat xulosalari',
+                'unique_together': {('student', 'course')},
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='checkin_secret',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='checkin_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Check-in tugash vaqti'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_session_checkin'),
+        ('courses', '0003_enrollment_completed_lessons'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Sana')),
+                ('name', models.CharField(max_length=200, verbose_name='Nomi')),
+            ],
+            options={
+                'verbose_name': 'Dam olish kuni',
+                'verbose_name_plural': 'Dam olish kunlari',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimetableSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Dushanba'), (1, 'Seshanba'), (2, 'Chorshanba'), (3, 'Payshanba'), (4, 'Juma'), (5, 'Shanba'), (6, 'Yakshanba')], verbose_name='Hafta kuni')),
+                ('session_type', models.CharField(choices=[('lecture', "Ma'ruza"), ('seminar', 'Seminar'), ('lab', 'Laboratoriya'), ('practice', 'Amaliyot')], default='lecture', max_length=20, verbose_name='Turi')),
+                ('title', models.CharField(blank=True, max_length=200, verbose_name='Mavzu')),
+                ('start_time', models.TimeField(verbose_name='Boshlanish vaqti')),
+                ('end_time', models.TimeField(verbose_name='Tugash vaqti')),
+                ('date_from', models.DateField(verbose_name='Boshlanish sanasi')),
+                ('date_to', models.DateField(verbose_name='Tugash sanasi')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timetable_slots', to='courses.course', verbose_name='Kurs')),
+            ],
+            options={
+                'verbose_name': 'Jadval bandi',
+                'verbose_name_plural': 'Dars jadvali',
+                'ordering': ['weekday', 'start_time'],
+            },
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='slot',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='attendance.timetableslot', verbose_name='Jadval bandi'),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(condition=models.Q(('slot__isnull', False)), fields=('slot', 'date'), name='session_slot_date_uniq'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_timetable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckinEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkin_entries', to='attendance.session', verbose_name='Sessiya')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkin_entries', to=settings.AUTH_USER_MODEL, verbose_name='Talaba')),
+            ],
+            options={
+                'verbose_name': 'Check-in yozuvi',
+                'verbose_name_plural': 'Check-in navbati',
+                'unique_together': {('session', 'student')},
+            },
+        ),
+    ]
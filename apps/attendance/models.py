@@ -1,10 +1,26 @@
 # apps/attendance/models.py
 
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from apps.accounts.models import User
 from apps.courses.models import Course
 
 
+class Holiday(models.Model):
+    """Dam olish kuni (jadvaldan sessiya hosil qilinmaydi)"""
+    date = models.DateField(unique=True, verbose_name="Sana")
+    name = models.CharField(max_length=200, verbose_name="Nomi")
+
+    class Meta:
+        verbose_name = "Dam olish kuni"
+        verbose_name_plural = "Dam olish kunlari"
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} - {self.name}"
+
+
 class Session(models.Model):
     """Dars sessiyasi"""
 
@@ -36,16 +52,48 @@ class Session(models.Model):
     start_time = models.TimeField(verbose_name="Boshlanish vaqti")
     end_time = models.TimeField(verbose_name="Tugash vaqti")
 
+    # Jadvaldan hosil qilingan sessiya (qo'lda yaratilganda bo'sh)
+    slot = models.ForeignKey(
+        'TimetableSlot',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='sessions',
+        verbose_name="Jadval bandi"
+    )
+
+    # Talabalar o'zi belgilanishi (aylanuvchi kod): har ochilishda yangi kalit
+    checkin_secret = models.CharField(max_length=32, blank=True, editable=False)
+    checkin_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Check-in tugash vaqti"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = "Sessiya"
         verbose_name_plural = "Sessiyalar"
         ordering = ['-date', '-start_time']
+        constraints = [
+            # Jadvalni qayta ishga tushirish bir kunga ikkinchi sessiya yaratmaydi
+            models.UniqueConstraint(
+                fields=['slot', 'date'],
+                condition=models.Q(slot__isnull=False),
+                name='session_slot_date_uniq'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.course.code} - {self.date} ({self.get_session_type_display()})"
 
+    @property
+    def is_checkin_open(self):
+        return self.checkin_until is not None and timezone.now() < self.checkin_until
+
     def attendance_count(self):
         return self.attendances.count()
 
@@ -56,6 +104,55 @@ class Session(models.Model):
         return self.attendances.filter(status='absent').count()
 
 
+class TimetableSlot(models.Model):
+    """Haftalik dars jadvali bandi - sana oralig'idagi har bir hafta kuni uchun sessiya hosil qiladi"""
+
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, 'Dushanba'
+        TUESDAY = 1, 'Seshanba'
+        WEDNESDAY = 2, 'Chorshanba'
+        THURSDAY = 3, 'Payshanba'
+        FRIDAY = 4, 'Juma'
+        SATURDAY = 5, 'Shanba'
+        SUNDAY = 6, 'Yakshanba'
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='timetable_slots',
+        verbose_name="Kurs"
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices, verbose_name="Hafta kuni")
+    session_type = models.CharField(
+        max_length=20,
+        choices=Session.Type.choices,
+        default=Session.Type.LECTURE,
+        verbose_name="Turi"
+    )
+    title = models.CharField(max_length=200, blank=True, verbose_name="Mavzu")
+
+    start_time = models.TimeField(verbose_name="Boshlanish vaqti")
+    end_time = models.TimeField(verbose_name="Tugash vaqti")
+    date_from = models.DateField(verbose_name="Boshlanish sanasi")
+    date_to = models.DateField(verbose_name="Tugash sanasi")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Jadval bandi"
+        verbose_name_plural = "Dars jadvali"
+        ordering = ['weekday', 'start_time']
+
+    def __str__(self):
+        return f"{self.course.code} - {self.get_weekday_display()} {self.start_time:%H:%M}"
+
+    def clean(self):
+        if self.start_time and self.end_time and self.end_time <= self.start_time:
+            raise ValidationError("Tugash vaqti boshlanish vaqtidan keyin bo'lishi kerak!")
+        if self.date_from and self.date_to and self.date_to < self.date_from:
+            raise ValidationError("Tugash sanasi boshlanish sanasidan oldin bo'lmasligi kerak!")
+
+
 class Attendance(models.Model):
     """Davomat"""
 
@@ -94,4 +191,71 @@ class Attendance(models.Model):
         unique_together = ['session', 'student']
 
     def __str__(self):
-        return f"{self.student.username} - {self.session} - {self.get_status_display()}"
\ No newline at end of file
+        return f"{self.student.username} - {self.session} - {self.get_status_display()}"
+
+
+class CheckinEntry(models.Model):
+    """Check-in navbati: kodni kiritgan talaba (Attendance ga to'plam bilan tushiriladi)"""
+    session = models.ForeignKey(
+        Session,
+        on_delete=models.CASCADE,
+        related_name='checkin_entries',
+        verbose_name="Sessiya"
+    )
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='checkin_entries',
+        verbose_name="Talaba"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Check-in yozuvi"
+        verbose_name_plural = "Check-in navbati"
+        unique_together = ['session', 'student']
+
+    def __str__(self):
+        return f"{self.student.username} - {self.session}"
+
+
+class AttendanceSummary(models.Model):
+    """Talabaning kurs bo'yicha davomat xulosasi (davomat va sessiyalardan hosil qilinadi)"""
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries',
+        verbose_name="Talaba"
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries',
+        verbose_name="Kurs"
+    )
+
+    present_count = models.PositiveIntegerField(default=0, verbose_name="Qatnashdi")
+    late_count = models.PositiveIntegerField(default=0, verbose_name="Kechikdi")
+    absent_count = models.PositiveIntegerField(default=0, verbose_name="Qatnashmadi")
+    excused_count = models.PositiveIntegerField(default=0, verbose_name="Sababli")
+    total_sessions = models.PositiveIntegerField(default=0, verbose_name="Sessiyalar soni")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Davomat xulosasi"
+        verbose_name_plural = "Davomat xulosalari"
+        unique_together = ['student', 'course']
+
+    def __str__(self):
+        return f"{self.student.username} - {self.course.code}"
+
+    @property
+    def attended_count(self):
+        return self.present_count + self.late_count + self.excused_count
+
+    @property
+    def percentage(self):
+        if not self.total_sessions:
+            return 0
+        return self.attended_count * 100 // self.total_sessions
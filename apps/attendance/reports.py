@@ -0,0 +1,111 @@
+# apps/attendance/reports.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from apps.courses.models import Enrollment
+from .models import Session, Attendance
+
+# Matritsadagi holat kodlari (0 - belgilanmagan)
+UNMARKED = 0
+STATUS_CODES = {
+    Attendance.Status.PRESENT: 1,
+    Attendance.Status.LATE: 2,
+    Attendance.Status.EXCUSED: 3,
+    Attendance.Status.ABSENT: 4,
+}
+CODE_STATUSES = [''] + list(STATUS_CODES)
+# Davomatga hisoblanadigan holatlar (baholar bilan bir xil)
+ATTENDED_CODES = [
+    STATUS_CODES[Attendance.Status.PRESENT],
+    STATUS_CODES[Attendance.Status.LATE],
+    STATUS_CODES[Attendance.Status.EXCUSED],
+]
+
+
+@dataclass(frozen=True)
+class AttendanceMatrix:
+    """Talaba x sessiya holatlar matritsasi (int8) va vektor hisoblangan jamlar"""
+    students: list
+    sessions: list
+    statuses: np.ndarray
+
+    @property
+    def attended(self):
+        return np.isin(self.statuses, ATTENDED_CODES)
+
+    @property
+    def student_attended(self):
+        return self.attended.sum(axis=1)
+
+    @property
+    def student_percentages(self):
+        total = len(self.sessions)
+        if not total:
+            return np.zeros(len(self.students), dtype=int)
+        return self.student_attended * 100 // total
+
+    @property
+    def session_attended(self):
+        return self.attended.sum(axis=0)
+
+    def status_counts(self, axis):
+        """Har bir holat soni: {holat: massiv} (axis=0 - sessiyalar, 1 - talabalar)"""
+        return {status: (self.statuses == code).sum(axis=axis) for status, code in STATUS_CODES.items()}
+
+    def rows(self):
+        """Jadval qatorlari: talaba, holatlar, qatnashgan soni va foizi"""
+        attended = self.student_attended
+        percentages = self.student_percentages
+        return [
+            {
+                'student': student,
+                'statuses': [CODE_STATUSES[code] for code in self.statuses[index]],
+                'present_count': int(attended[index]),
+                'total': len(self.sessions),
+                'percentage': int(percentages[index]),
+            }
+            for index, student in enumerate(self.students)
+        ]
+
+
+def filter_sessions(course, date_from=None, date_to=None, session_type=None):
+    sessions = Session.objects.filter(course=course)
+    if date_from:
+        sessions = sessions.filter(date__gte=date_from)
+    if date_to:
+        sessions = sessions.filter(date__lte=date_to)
+    if session_type:
+        sessions = sessions.filter(session_type=session_type)
+    return sessions
+
+
+def build_matrix(course, date_from=None, date_to=None, session_type=None):
+    """Kurs davomati matritsasi: sessiyalar, talabalar va davomatlar - uchta so'rov"""
+    sessions_query = filter_sessions(course, date_from, date_to, session_type)
+    sessions = list(sessions_query.order_by('date', 'start_time', 'pk'))
+    students = [
+        enrollment.student
+        for enrollment in Enrollment.objects.filter(
+            course=course,
+            status=Enrollment.Status.ACTIVE
+        ).select_related('student')
+    ]
+
+    statuses = np.zeros((len(students), len(sessions)), dtype=np.int8)
+    if students and sessions:
+        student_index = {student.pk: index for index, student in enumerate(students)}
+        session_index = {session.pk: index for index, session in enumerate(sessions)}
+        cells = [
+            (student_index[student_id], session_index[session_id], STATUS_CODES.get(status, UNMARKED))
+            for student_id, session_id, status in Attendance.objects.filter(
+                session__in=sessions_query
+            ).values_list('student_id', 'session_id', 'status').iterator()
+            if student_id in student_index and session_id in session_index
+        ]
+        if cells:
+            rows, columns, codes = np.array(cells, dtype=np.int64).T
+            statuses[rows, columns] = codes
+
+    return AttendanceMatrix(students=students, sessions=sessions, statuses=statuses)
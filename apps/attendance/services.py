@@ -0,0 +1,75 @@
+# apps/attendance/services.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.assessments.grades import refresh_grades
+from .models import Attendance
+from .summaries import ensure_summaries, refresh_summaries, apply_transitions
+
+ATTENDANCE_FIELDS = ['status', 'notes', 'marked_at']
+
+
+# ===================== DAVOMAT =====================
+
+def session_attendances(session):
+    """Sessiya davomatlari: {talaba_id: Attendance} (bitta so'rov)"""
+    return {attendance.student_id: attendance for attendance in Attendance.objects.filter(session=session)}
+
+
+def mark_attendance(session, marks):
+    """Sessiya davomatini saqlash: faqat o'zgargan qatorlar yoziladi (so'rovlar soni o'zgarmas)
+
+    `marks` - {talaba_id: (holat, izoh)}; noma'lum holat "Qatnashmadi" deb olinadi.
+    Signallar ishlamaydi. Mavjud qatorlar tranzaksiya ichida qulflanib o'qiladi - ularning
+    holat o'zgarishlari xulosalarga qo'shiladi. Yangi qatorlar ignore_conflicts bilan
+    yoziladi; shu orada parallel yaratilganlari qulflanib ustidan yoziladi, bu talabalar
+    xulosalari esa haqiqatda yozilgan davomatdan qayta hosil qilinadi.
+    (yaratilgan, yangilangan) sonlari qaytadi.
+    """
+    wanted = {
+        student_id: (status if status in Attendance.Status.values else Attendance.Status.ABSENT, notes)
+        for student_id, (status, notes) in marks.items()
+    }
+    attendances = Attendance.objects.select_for_update().filter(session=session)
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = {attendance.student_id: attendance for attendance in attendances.filter(student_id__in=list(wanted))}
+        created = [
+            Attendance(session=session, student_id=student_id, status=status, notes=notes, marked_at=now)
+            for student_id, (status, notes) in wanted.items()
+            if student_id not in existing
+        ]
+        updated = []
+        transitions = []
+        for student_id, attendance in existing.items():
+            if (attendance.status, attendance.notes) != wanted[student_id]:
+                transitions.append((student_id, attendance.status, wanted[student_id][0]))
+                attendance.status, attendance.notes = wanted[student_id]
+                attendance.marked_at = now
+                updated.append(attendance)
+
+        if created:
+            Attendance.objects.bulk_create(created, ignore_conflicts=True, batch_size=500)
+            # Parallel so'rov yaratib ulgurgan qatorlar: qulflab, bizning holat bilan yangilanadi
+            for attendance in attendances.filter(student_id__in=[attendance.student_id for attendance in created]):
+                if (attendance.status, attendance.notes) != wanted[attendance.student_id]:
+                    attendance.status, attendance.notes = wanted[attendance.student_id]
+                    attendance.marked_at = now
+                    updated.append(attendance)
+
+        if not (created or updated):
+            return 0, 0
+
+        changed = [(student_id, session.course_id) for student_id, old_status, new_status in transitions]
+        # Xulosa qatorlari o'zgarishlar qo'shilishidan oldin yaratiladi
+        ensure_summaries(changed)
+        Attendance.objects.bulk_update(updated, ATTENDANCE_FIELDS, batch_size=500)
+        apply_transitions(session.course_id, transitions)
+
+        inserted = [(attendance.student_id, session.course_id) for attendance in created]
+        refresh_summaries(inserted)
+        refresh_grades(changed + inserted)
+
+    return len(created), len(updated)
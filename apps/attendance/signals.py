@@ -0,0 +1,58 @@
+# apps/attendance/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.assessments.grades import refresh_grades, refresh_course_grades, recompute_grades
+from apps.assessments.models import Grade
+from apps.courses.models import Enrollment
+from apps.courses.services import deleted_directly
+from .models import Session, Attendance
+from . import summaries
+
+
+# ===================== SESSIYA =====================
+
+@receiver(post_save, sender=Session)
+def session_saved(sender, instance, created, **kwargs):
+    # Yangi sessiya barcha talabalar davomat ulushini o'zgartiradi
+    if created:
+        summaries.sessions_added({instance.course_id: 1})
+        refresh_course_grades([instance.course_id])
+
+
+@receiver(post_delete, sender=Session)
+def session_deleted(sender, instance, origin=None, **kwargs):
+    # Sessiya davomatlari ham kaskad bilan o'chgan - kurs xulosalari qayta hosil qilinadi.
+    # Queryset bilan ommaviy o'chirishda chaqiruvchi kurslarni bir marta yangilaydi (timetable.sessions_deleted)
+    if isinstance(origin, Session):
+        summaries.rebuild_summaries([instance.course_id])
+        recompute_grades(Grade.objects.filter(course_id=instance.course_id))
+
+
+# ===================== DAVOMAT =====================
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    pair = (instance.student_id, instance.session.course_id)
+    summaries.refresh_summaries([pair])
+    refresh_grades([pair])
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, origin=None, **kwargs):
+    if not deleted_directly(origin, Attendance):
+        return
+    course_id = Session.objects.filter(pk=instance.session_id).values_list('course_id', flat=True).first()
+    if course_id is not None:
+        summaries.refresh_summaries([(instance.student_id, course_id)])
+        refresh_grades([(instance.student_id, course_id)], create=False)
+
+
+# ===================== YOZILISH =====================
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, **kwargs):
+    # Sessiyalari bor kursga yozilgan talaba uchun xulosa darhol yaratiladi
+    if created:
+        summaries.ensure_summaries([(instance.student_id, instance.course_id)])
@@ -0,0 +1,165 @@
+# apps/attendance/summaries.py
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.courses.models import Enrollment
+from apps.courses.services import shift_counter
+from .models import Session, Attendance, AttendanceSummary
+
+# Holat -> xulosadagi hisoblagich maydoni
+COUNT_FIELDS = {
+    Attendance.Status.PRESENT: 'present_count',
+    Attendance.Status.LATE: 'late_count',
+    Attendance.Status.ABSENT: 'absent_count',
+    Attendance.Status.EXCUSED: 'excused_count',
+}
+SUMMARY_FIELDS = [*COUNT_FIELDS.values(), 'total_sessions', 'updated_at']
+
+
+def get_summary(student, course):
+    """Talabaning kurs bo'yicha xulosasi (qator bo'lmasa saqlanmagan bo'sh nusxa)"""
+    summary = AttendanceSummary.objects.filter(student=student, course=course).first()
+    if summary is None:
+        summary = AttendanceSummary(student=student, course=course)
+    return summary
+
+
+def overall_percentage(summaries):
+    """Xulosalar bo'yicha umumiy davomat foizi (bitta so'rov)"""
+    totals = summaries.aggregate(
+        attended=Sum(F('present_count') + F('late_count') + F('excused_count')),
+        sessions=Sum('total_sessions')
+    )
+    if not totals['sessions']:
+        return 0
+    return totals['attended'] * 100 // totals['sessions']
+
+
+# ===================== QAYTA HOSIL QILISH =====================
+
+def write_summaries(pairs, attendances, course_ids):
+    """Juftliklar xulosalarini davomatlar va sessiyalar sonidan yozish (3 ta so'rov)"""
+    counts = {
+        (row['student_id'], row['session__course_id']): row
+        for row in attendances.order_by().values('student_id', 'session__course_id').annotate(**{
+            field: Count('pk', filter=Q(status=status)) for status, field in COUNT_FIELDS.items()
+        })
+    }
+    totals = dict(
+        Session.objects.filter(course_id__in=course_ids).order_by().values('course_id').annotate(
+            total=Count('pk')
+        ).values_list('course_id', 'total')
+    )
+
+    summaries = []
+    for student_id, course_id in pairs:
+        row = counts.get((student_id, course_id), {})
+        summaries.append(AttendanceSummary(
+            student_id=student_id,
+            course_id=course_id,
+            total_sessions=totals.get(course_id, 0),
+            **{field: row.get(field, 0) for field in COUNT_FIELDS.values()}
+        ))
+
+    AttendanceSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['student', 'course'],
+        update_fields=SUMMARY_FIELDS,
+        batch_size=500
+    )
+    return len(summaries)
+
+
+def refresh_summaries(pairs):
+    """(talaba_id, kurs_id) juftliklari xulosalarini qayta hosil qilish (yetishmayotganlari yaratiladi)"""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+
+    student_ids = {student_id for student_id, course_id in pairs}
+    course_ids = {course_id for student_id, course_id in pairs}
+    attendances = Attendance.objects.filter(student_id__in=student_ids, session__course_id__in=course_ids)
+    return write_summaries(pairs, attendances, course_ids)
+
+
+def ensure_summaries(pairs):
+    """Faqat yetishmayotgan xulosa qatorlarini yaratish"""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+
+    existing = set(AttendanceSummary.objects.filter(
+        student_id__in={student_id for student_id, course_id in pairs},
+        course_id__in={course_id for student_id, course_id in pairs}
+    ).values_list('student_id', 'course_id'))
+    return refresh_summaries(pairs - existing)
+
+
+def rebuild_summaries(course_ids=None):
+    """Kurslar bo'yicha barcha xulosalarni qayta hosil qilish (faol yozilishlar va mavjud qatorlar)"""
+    enrollments = Enrollment.objects.filter(status=Enrollment.Status.ACTIVE)
+    summaries = AttendanceSummary.objects.all()
+    if course_ids is not None:
+        enrollments = enrollments.filter(course_id__in=course_ids)
+        summaries = summaries.filter(course_id__in=course_ids)
+
+    pairs = set(enrollments.values_list('student_id', 'course_id'))
+    pairs |= set(summaries.values_list('student_id', 'course_id'))
+
+    pairs = sorted(pairs)
+    total = 0
+    for start in range(0, len(pairs), 500):
+        total += refresh_summaries(pairs[start:start + 500])
+    return total
+
+
+# ===================== O'SISH BILAN YANGILASH =====================
+
+def apply_transitions(course_id, transitions):
+    """Holat o'zgarishlarini hisoblagichlarga qo'shish: [(talaba_id, eski_holat yoki None, yangi_holat)]
+
+    Bir xil o'tishdagi talabalar bitta UPDATE bilan yangilanadi - so'rovlar soni talabalar
+    soniga emas, o'tish turlariga bog'liq (ko'pi bilan 16 ta).
+    """
+    groups = defaultdict(list)
+    for student_id, old_status, new_status in transitions:
+        if old_status != new_status:
+            groups[old_status, new_status].append(student_id)
+
+    now = timezone.now()
+    for (old_status, new_status), student_ids in groups.items():
+        changes = {'updated_at': now}
+        if new_status:
+            changes[COUNT_FIELDS[new_status]] = F(COUNT_FIELDS[new_status]) + 1
+        if old_status:
+            changes[COUNT_FIELDS[old_status]] = Greatest(F(COUNT_FIELDS[old_status]) - 1, Value(0))
+        AttendanceSummary.objects.filter(course_id=course_id, student_id__in=student_ids).update(**changes)
+
+
+def sessions_added(counts):
+    """Yangi sessiyalar: {kurs_id: soni} - mavjud xulosalarga qo'shiladi, yangi yozilganlar uchun qator yaratiladi
+
+    Bir xil sondagi kurslar bitta UPDATE bilan yangilanadi.
+    """
+    groups = defaultdict(list)
+    for course_id, count in counts.items():
+        if count:
+            groups[count].append(course_id)
+    if not groups:
+        return
+
+    with transaction.atomic():
+        for count, course_ids in groups.items():
+            shift_counter(AttendanceSummary.objects.filter(course_id__in=course_ids), 'total_sessions', count)
+        ensure_summaries(
+            Enrollment.objects.filter(
+                course_id__in=[course_id for course_ids in groups.values() for course_id in course_ids],
+                status=Enrollment.Status.ACTIVE
+            ).values_list('student_id', 'course_id')
+        )
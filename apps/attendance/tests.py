@@ -1,3 +1,442 @@
-from django.test import TestCase
+# apps/attendance/tests.py
 
-# Create your tests here.
+import csv
+import io
+import random
+from datetime import time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User, Faculty, Department
+from apps.assessments.models import Grade
+from apps.courses.models import Course, Enrollment
+from .models import Session, TimetableSlot, Attendance, AttendanceSummary, CheckinEntry
+from .reports import build_matrix
+from .summaries import overall_percentage, rebuild_summaries
+from . import services, checkin, timetable
+
+PRESENT = Attendance.Status.PRESENT
+LATE = Attendance.Status.LATE
+ABSENT = Attendance.Status.ABSENT
+EXCUSED = Attendance.Status.EXCUSED
+
+
+class AttendanceTestCase(TestCase):
+    """Kurs va unga yozilgan 5 talaba"""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='D', faculty=Faculty.objects.create(name='F', code='F'))
+        cls.teacher = User.objects.create(username='teacher', role='teacher')
+        cls.course = Course.objects.create(name='C', code='C', department=department, teacher=cls.teacher)
+        cls.students = [User.objects.create(username=f'student{index}', role='student') for index in range(5)]
+        for student in cls.students:
+            Enrollment.objects.create(student=student, course=cls.course)
+
+    def create_session(self, date=None, **fields):
+        return Session.objects.create(
+            course=self.course,
+            date=date or timezone.localdate(),
+            start_time=time(9),
+            end_time=time(10, 20),
+            **fields
+        )
+
+    def assertSummariesMatchRecount(self):
+        """O'sish bilan yangilangan xulosalar to'liq qayta sanash bilan bir xil"""
+        fields = ('student_id', 'present_count', 'late_count', 'absent_count', 'excused_count', 'total_sessions')
+        before = sorted(AttendanceSummary.objects.values_list(*fields))
+        rebuild_summaries()
+        self.assertEqual(before, sorted(AttendanceSummary.objects.values_list(*fields)))
+
+
+# ===================== DAVOMAT BELGILASH =====================
+
+class MarkAttendanceTests(AttendanceTestCase):
+
+    def test_summaries_follow_changes(self):
+        session = self.create_session()
+        self.assertEqual(services.mark_attendance(session, {self.students[0].pk: (PRESENT, '')}), (1, 0))
+        self.assertSummariesMatchRecount()
+
+        created, updated = services.mark_attendance(session, {
+            student.pk: (LATE if index % 2 else PRESENT, '') for index, student in enumerate(self.students)
+        })
+        self.assertEqual((created, updated), (4, 0))
+        self.assertSummariesMatchRecount()
+
+        # Faqat o'zgarganlar yoziladi; noma'lum holat "Qatnashmadi"
+        created, updated = services.mark_attendance(session, {
+            self.students[0].pk: (PRESENT, ''),
+            self.students[1].pk: (EXCUSED, 'kasal'),
+            self.students[2].pk: ('unknown', ''),
+        })
+        self.assertEqual((created, updated), (0, 2))
+        self.assertEqual(Attendance.objects.get(session=session, student=self.students[2]).status, ABSENT)
+        self.assertSummariesMatchRecount()
+
+        # O'zgarishsiz qayta yuborish hech narsa yozmaydi
+        self.assertEqual(services.mark_attendance(session, {
+            self.students[1].pk: (EXCUSED, 'kasal'),
+            self.students[2].pk: (ABSENT, ''),
+        }), (0, 0))
+
+        self.create_session(timezone.localdate() + timedelta(days=1))
+        self.assertSummariesMatchRecount()
+
+    def test_concurrent_insert_is_not_double_counted(self):
+        session = self.create_session()
+        student = self.students[0]
+        bulk_create = Attendance.objects.bulk_create
+
+        def racing(objs, **kwargs):
+            # Parallel so'rov qatorni bizdan oldin yaratib ulgurdi
+            Attendance.objects.create(session=session, student=student, status=EXCUSED)
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(Attendance.objects, 'bulk_create', side_effect=racing):
+            services.mark_attendance(session, {student.pk: (PRESENT, ''), self.students[1].pk: (LATE, '')})
+
+        self.assertEqual(Attendance.objects.get(session=session, student=student).status, PRESENT)
+        self.assertSummariesMatchRecount()
+        summary = AttendanceSummary.objects.get(student=student, course=self.course)
+        self.assertEqual((summary.present_count, summary.excused_count), (1, 0))
+
+
+
+# ===================== XULOSALAR =====================
+
+class SummaryTests(AttendanceTestCase):
+
+    def summary(self, student):
+        return AttendanceSummary.objects.get(student=student, course=self.course)
+
+    def test_single_row_signals(self):
+        session = self.create_session()
+        attendance = Attendance.objects.create(session=session, student=self.students[0], status=PRESENT)
+        self.assertSummariesMatchRecount()
+
+        attendance.status = LATE
+        attendance.save()
+        self.assertEqual((self.summary(self.students[0]).present_count, self.summary(self.students[0]).late_count), (0, 1))
+        self.assertSummariesMatchRecount()
+
+        attendance.delete()
+        self.assertEqual(self.summary(self.students[0]).attended_count, 0)
+        self.assertSummariesMatchRecount()
+
+    def test_sessions_change_percentage(self):
+        first = self.create_session()
+        services.mark_attendance(first, {student.pk: (PRESENT, '') for student in self.students})
+        self.assertEqual(self.summary(self.students[0]).percentage, 100)
+
+        second = self.create_session(timezone.localdate() + timedelta(days=1))
+        self.assertEqual(self.summary(self.students[0]).percentage, 50)
+        self.assertSummariesMatchRecount()
+
+        second.delete()
+        self.assertEqual(self.summary(self.students[0]).percentage, 100)
+        self.assertSummariesMatchRecount()
+
+    def test_new_enrollment_gets_summary(self):
+        self.create_session()
+        student = User.objects.create(username='late', role='student')
+        Enrollment.objects.create(student=student, course=self.course)
+
+        summary = self.summary(student)
+        self.assertEqual((summary.total_sessions, summary.percentage), (1, 0))
+        self.assertSummariesMatchRecount()
+
+    def test_overall_percentage(self):
+        self.assertEqual(overall_percentage(AttendanceSummary.objects.all()), 0)
+
+        sessions = [self.create_session(timezone.localdate() - timedelta(days=index)) for index in range(2)]
+        services.mark_attendance(sessions[0], {self.students[0].pk: (PRESENT, ''), self.students[1].pk: (EXCUSED, '')})
+        services.mark_attendance(sessions[1], {self.students[0].pk: (LATE, ''), self.students[1].pk: (ABSENT, '')})
+
+        summaries = AttendanceSummary.objects.filter(student__in=self.students[:2])
+        self.assertEqual(overall_percentage(summaries), 75)
+        self.assertEqual(overall_percentage(AttendanceSummary.objects.all()), 30)
+
+    def test_grade_follows_attendance(self):
+        sessions = [self.create_session(timezone.localdate() - timedelta(days=index)) for index in range(4)]
+        for session in sessions[:3]:
+            services.mark_attendance(session, {self.students[0].pk: (PRESENT, '')})
+        self.assertEqual(Grade.objects.get(student=self.students[0], course=self.course).attendance_score, 75)
+
+        Attendance.objects.get(session=sessions[0], student=self.students[0]).delete()
+        self.assertEqual(Grade.objects.get(student=self.students[0], course=self.course).attendance_score, 50)
+
+    def test_mark_queries_do_not_grow_with_students(self):
+        counts = []
+        for students in (self.students[:2], self.students):
+            session = self.create_session(timezone.localdate() - timedelta(days=len(counts)))
+            with CaptureQueriesContext(connection) as context:
+                services.mark_attendance(session, {student.pk: (PRESENT, '') for student in students})
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
+        self.assertSummariesMatchRecount()
+
+# ===================== HISOBOT =====================
+
+class ReportTests(AttendanceTestCase):
+    """Davomat matritsasi jamlari oddiy qayta sanash bilan bir xil"""
+
+    def setUp(self):
+        today = timezone.localdate()
+        self.sessions = [
+            self.create_session(today - timedelta(days=index), session_type=Session.Type.SEMINAR if index % 3 else Session.Type.LECTURE)
+            for index in range(6)
+        ]
+        rng = random.Random(22)
+        statuses = [PRESENT, LATE, ABSENT, EXCUSED, None]
+        self.marks = {}
+        for session in self.sessions:
+            marks = {student.pk: (rng.choice(statuses), '') for student in self.students}
+            services.mark_attendance(session, {pk: mark for pk, mark in marks.items() if mark[0]})
+            self.marks[session.pk] = {pk: status for pk, (status, note) in marks.items() if status}
+
+        # Kursdan chiqqan talaba hisobotda ko'rinmaydi
+        Enrollment.objects.filter(student=self.students[4]).update(status=Enrollment.Status.DROPPED)
+
+    def expected(self, sessions):
+        attended = {PRESENT, LATE, EXCUSED}
+        rows = []
+        for student in self.students[:4]:
+            statuses = [self.marks[session.pk].get(student.pk, '') for session in sessions]
+            count = sum(status in attended for status in statuses)
+            rows.append((student.pk, statuses, count, count * 100 // len(sessions) if sessions else 0))
+        totals = [sum(self.marks[session.pk].get(student.pk) in attended for student in self.students[:4]) for session in sessions]
+        return rows, totals
+
+    def assertMatrix(self, matrix, sessions):
+        rows, totals = self.expected(sessions)
+        self.assertEqual([session.pk for session in matrix.sessions], [session.pk for session in sessions])
+        self.assertEqual(
+            [(row['student'].pk, row['statuses'], row['present_count'], row['percentage']) for row in matrix.rows()],
+            rows
+        )
+        self.assertEqual(list(matrix.session_attended), totals)
+        self.assertEqual(
+            list(matrix.status_counts(axis=0)[ABSENT]),
+            [sum(self.marks[session.pk].get(student.pk) == ABSENT for student in self.students[:4]) for session in sessions]
+        )
+
+    def test_totals_match_recount(self):
+        self.assertMatrix(build_matrix(self.course), sorted(self.sessions, key=lambda session: session.date))
+
+    def test_filters(self):
+        today = timezone.localdate()
+        matrix = build_matrix(self.course, date_from=today - timedelta(days=3), date_to=today - timedelta(days=1))
+        self.assertMatrix(matrix, sorted(self.sessions[1:4], key=lambda session: session.date))
+
+        matrix = build_matrix(self.course, session_type=Session.Type.LECTURE)
+        self.assertMatrix(matrix, [self.sessions[3], self.sessions[0]])
+
+        self.assertEqual(build_matrix(self.course, date_from=today + timedelta(days=1)).rows()[0]['percentage'], 0)
+
+    def test_queries_do_not_grow_with_sessions(self):
+        counts = []
+        for session_type in (Session.Type.LECTURE, None):
+            with CaptureQueriesContext(connection) as context:
+                build_matrix(self.course, session_type=session_type)
+            counts.append(len(context))
+        self.assertEqual(counts, [3, 3])
+
+    def test_export(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('attendance:teacher_attendance_report_export', args=[self.course.pk]))
+        rows = list(csv.reader(io.StringIO(response.content.decode('utf-8-sig'))))
+
+        expected, totals = self.expected(sorted(self.sessions, key=lambda session: session.date))
+        self.assertEqual(len(rows), 1 + len(expected))
+        self.assertEqual(
+            [(row[-2], row[-1]) for row in rows[1:]],
+            [(f'{count}/6', str(percentage)) for pk, statuses, count, percentage in expected]
+        )
+
+
+# ===================== CHECK-IN =====================
+
+class CheckinTests(AttendanceTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.session = self.create_session()
+        checkin.open_checkin(self.session)
+
+    def statuses(self):
+        return dict(Attendance.objects.filter(session=self.session).values_list('student_id', 'status'))
+
+    def test_check_in_is_queued_then_flushed(self):
+        services.mark_attendance(self.session, {self.students[1].pk: (ABSENT, 'kech'), self.students[2].pk: (LATE, '')})
+
+        self.assertTrue(checkin.check_in(self.session, self.students[0].pk))
+        self.assertFalse(checkin.check_in(self.session, self.students[0].pk))
+        self.assertTrue(checkin.check_in(self.session, self.students[1].pk))
+        # O'qituvchi qo'ygan boshqa holat navbatga ham tushmaydi
+        self.assertFalse(checkin.check_in(self.session, self.students[2].pk))
+        self.assertEqual(checkin.pending_count(self.session), 2)
+        self.assertNotIn(self.students[0].pk, self.statuses())
+
+        self.assertEqual(checkin.flush_checkins(self.session), 2)
+        self.assertEqual(self.statuses(), {self.students[0].pk: PRESENT, self.students[1].pk: PRESENT, self.students[2].pk: LATE})
+        self.assertEqual(Attendance.objects.get(session=self.session, student=self.students[1]).notes, 'kech')
+        self.assertFalse(CheckinEntry.objects.exists())
+        self.assertFalse(checkin.check_in(self.session, self.students[0].pk))
+        self.assertSummariesMatchRecount()
+
+    def test_teacher_status_set_while_queued_is_kept(self):
+        checkin.check_in(self.session, self.students[0].pk)
+        services.mark_attendance(self.session, {self.students[0].pk: (EXCUSED, '')})
+
+        self.assertEqual(checkin.close_checkin(self.session), 0)
+        self.assertEqual(self.statuses(), {self.students[0].pk: EXCUSED})
+        self.assertFalse(CheckinEntry.objects.exists())
+
+    @override_settings(ATTENDANCE_CHECKIN_BATCH=3)
+    def test_flush_every_batch(self):
+        for student in self.students[:2]:
+            checkin.check_in(self.session, student.pk)
+        self.assertEqual(self.statuses(), {})
+
+        checkin.check_in(self.session, self.students[2].pk)
+        self.assertEqual(len(self.statuses()), 3)
+        self.assertEqual(checkin.pending_count(self.session), 0)
+        self.assertSummariesMatchRecount()
+
+    def test_teacher_poll_flushes(self):
+        checkin.check_in(self.session, self.students[0].pk)
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('attendance:teacher_checkin_poll', args=[self.session.pk]))
+
+        self.assertEqual(response.json()['checked_in'], 1)
+        self.assertEqual(self.statuses(), {self.students[0].pk: PRESENT})
+
+    def test_code_rotates(self):
+        code, _ = checkin.current_code(self.session)
+        self.assertTrue(checkin.verify_code(self.session, code))
+
+        # Qayta ochilganda yangi kalit - eski kod yaroqsiz
+        checkin.open_checkin(self.session)
+        self.assertFalse(checkin.verify_code(self.session, code))
+        checkin.close_checkin(self.session)
+        self.assertFalse(checkin.verify_code(self.session, checkin.current_code(self.session)[0]))
+
+    @override_settings(ATTENDANCE_CHECKIN_MAX_ATTEMPTS=3)
+    def test_wrong_codes_lock_out(self):
+        student = self.students[0]
+        self.client.force_login(student)
+        url = reverse('attendance:student_checkin')
+        code, _ = checkin.current_code(self.session)
+        wrong = str((int(code) + 1) % 10 ** checkin.CODE_DIGITS).zfill(checkin.CODE_DIGITS)
+
+        for attempt in range(3):
+            self.client.post(url, {'code': wrong})
+        self.assertTrue(checkin.is_locked_out(student.pk))
+
+        # Blok davomida to'g'ri kod ham qabul qilinmaydi
+        self.client.post(url, {'code': code})
+        self.assertFalse(CheckinEntry.objects.filter(student=student).exists())
+
+        cache.delete(checkin.attempts_key(student.pk))
+        self.client.post(url, {'code': code})
+        self.assertTrue(CheckinEntry.objects.filter(student=student).exists())
+
+
+# ===================== DARS JADVALI =====================
+
+class RescheduleTests(AttendanceTestCase):
+
+    def setUp(self):
+        self.slot = self.create_slot(timezone.localdate().weekday(), weeks=5)
+        timetable.generate_sessions([self.slot])
+
+    def create_slot(self, weekday, weeks):
+        today = timezone.localdate()
+        return TimetableSlot.objects.create(
+            course=self.course,
+            weekday=weekday,
+            start_time=time(9),
+            end_time=time(10, 20),
+            date_from=today - timedelta(days=14),
+            date_to=today + timedelta(days=7 * weeks - 1)
+        )
+
+    def test_generate_is_idempotent(self):
+        count = self.slot.sessions.count()
+        self.assertEqual(count, 7)
+        self.assertEqual(timetable.generate_sessions([self.slot]), 0)
+        self.assertSummariesMatchRecount()
+
+    def test_reschedule_keeps_attended_sessions(self):
+        today = timezone.localdate()
+        attended = [self.slot.sessions.get(date=today), self.slot.sessions.get(date=today + timedelta(days=7))]
+        for session in attended:
+            services.mark_attendance(session, {student.pk: (PRESENT, '') for student in self.students})
+
+        self.slot.weekday = (today.weekday() + 1) % 7
+        self.slot.save()
+        timetable.reschedule_slot(self.slot)
+
+        # Davomati olingan sessiyalar joyida va qatorlari bilan qoladi
+        for session in attended:
+            session.refresh_from_db()
+            self.assertEqual(session.attendances.count(), len(self.students))
+        self.assertEqual([session.date for session in attended], [today, today + timedelta(days=7)])
+
+        future = self.slot.sessions.filter(date__gt=today).exclude(pk__in=[session.pk for session in attended])
+        self.assertTrue(future.exists())
+        self.assertTrue(all(session.date.weekday() == self.slot.weekday for session in future))
+        self.assertTrue(self.slot.sessions.filter(date__lte=today - timedelta(days=7)).exists())
+        self.assertSummariesMatchRecount()
+
+    def test_reschedule_removes_extra_sessions(self):
+        services.mark_attendance(self.slot.sessions.get(date=timezone.localdate()), {self.students[0].pk: (PRESENT, '')})
+        self.slot.date_to = timezone.localdate() + timedelta(days=8)
+        self.slot.save()
+
+        self.assertEqual(timetable.reschedule_slot(self.slot), (1, 0, 3))
+        self.assertSummariesMatchRecount()
+        summary = AttendanceSummary.objects.get(student=self.students[0], course=self.course)
+        self.assertEqual(summary.total_sessions, 4)
+        self.assertEqual(Grade.objects.get(student=self.students[0], course=self.course).attendance_score, 25)
+
+    def test_remove_slot_keeps_history(self):
+        today = timezone.localdate()
+        session = self.slot.sessions.get(date=today + timedelta(days=7))
+        services.mark_attendance(session, {self.students[0].pk: (PRESENT, '')})
+
+        self.assertEqual(timetable.remove_slot(self.slot), 3)
+        remaining = set(Session.objects.filter(course=self.course).values_list('date', flat=True))
+        self.assertIn(today + timedelta(days=7), remaining)
+        self.assertNotIn(today + timedelta(days=14), remaining)
+        self.assertIn(today - timedelta(days=14), remaining)
+        self.assertSummariesMatchRecount()
+        self.assertEqual(Grade.objects.get(student=self.students[0], course=self.course).attendance_score, 25)
+
+    def test_remove_slot_queries_do_not_grow_with_sessions(self):
+        slots = [self.create_slot((timezone.localdate().weekday() + 1) % 7, weeks=weeks) for weeks in (2, 16)]
+        timetable.generate_sessions(slots)
+
+        counts = []
+        for slot in slots:
+            with CaptureQueriesContext(connection) as context:
+                timetable.remove_slot(slot)
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
+        self.assertSummariesMatchRecount()
+
+    def test_single_session_delete_updates_summaries(self):
+        session = self.slot.sessions.get(date=timezone.localdate())
+        services.mark_attendance(session, {self.students[0].pk: (PRESENT, '')})
+
+        session.delete()
+        self.assertSummariesMatchRecount()
+        self.assertEqual(AttendanceSummary.objects.get(student=self.students[0], course=self.course).total_sessions, 6)
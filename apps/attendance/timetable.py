@@ -0,0 +1,144 @@
+# apps/attendance/timetable.py
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.assessments.grades import refresh_course_grades
+from .models import Holiday, Session
+from .summaries import rebuild_summaries, sessions_added
+
+# Qayta rejalashtirishda bandan sessiyaga ko'chiriladigan maydonlar (mavzu sessiyaning o'zida qoladi)
+SCHEDULE_FIELDS = ['session_type', 'start_time', 'end_time']
+
+
+def holidays_between(date_from, date_to):
+    return set(Holiday.objects.filter(date__range=(date_from, date_to)).values_list('date', flat=True))
+
+
+def slot_dates(slot, holidays, date_from=None):
+    """Band sanalari: oraliqdagi hafta kunlari, dam olish kunlarisiz"""
+    start = max(slot.date_from, date_from) if date_from else slot.date_from
+    current = start + timedelta(days=(slot.weekday - start.weekday()) % 7)
+
+    dates = []
+    while current <= slot.date_to:
+        if current not in holidays:
+            dates.append(current)
+        current += timedelta(days=7)
+    return dates
+
+
+def build_session(slot, date):
+    return Session(
+        course_id=slot.course_id,
+        slot=slot,
+        date=date,
+        title=slot.title,
+        session_type=slot.session_type,
+        start_time=slot.start_time,
+        end_time=slot.end_time
+    )
+
+
+def sessions_created(sessions):
+    """bulk_create signallarsiz - davomat xulosalari va baholar kurslar bo'yicha bir marta yangilanadi"""
+    counts = Counter(session.course_id for session in sessions)
+    if counts:
+        sessions_added(counts)
+        refresh_course_grades(list(counts))
+
+
+def sessions_deleted(course_ids):
+    """Queryset bilan o'chirish sessiya signalini chetlab o'tadi - xulosalar va baholar kurslar bo'yicha bir marta qayta hosil qilinadi"""
+    course_ids = sorted(set(course_ids))
+    if course_ids:
+        rebuild_summaries(course_ids)
+        refresh_course_grades(course_ids)
+
+
+# ===================== HOSIL QILISH =====================
+
+def generate_sessions(slots):
+    """Jadval bandlaridan sessiyalarni bitta bulk_create bilan yaratish
+
+    Qayta ishga tushirish xavfsiz: mavjud (band, sana) sessiyalari o'tkazib yuboriladi.
+    Parallel ishga tushirish shu orada yaratgan sessiyada noyoblik cheklovi IntegrityError
+    beradi va tranzaksiya to'liq bekor bo'ladi - hisoblagichlarga ortiqcha qo'shilmaydi.
+    O'tgan sanalar faqat birinchi
+    marta to'ldiriladi - qayta rejalashtirilgan bandning tarixi yangi kunga ko'chmaydi.
+    Yaratilgan sessiyalar soni qaytadi.
+    """
+    slots = list(slots)
+    if not slots:
+        return 0
+
+    today = timezone.localdate()
+    holidays = holidays_between(min(slot.date_from for slot in slots), max(slot.date_to for slot in slots))
+    existing = set(Session.objects.filter(slot__in=slots).values_list('slot_id', 'date'))
+    started = {slot_id for slot_id, date in existing}
+    sessions = [
+        build_session(slot, date)
+        for slot in slots
+        for date in slot_dates(slot, holidays, today if slot.pk in started else None)
+        if (slot.pk, date) not in existing
+    ]
+
+    with transaction.atomic():
+        Session.objects.bulk_create(sessions, batch_size=1000)
+        sessions_created(sessions)
+    return len(sessions)
+
+
+def reschedule_slot(slot, from_date=None):
+    """Bandning kelgusi sessiyalarini joriy jadvalga moslash (standart: ertadan boshlab)
+
+    Davomati olingan sessiyalar o'zgarmaydi - ularning sanasi band hisoblanadi.
+    Qolganlaridan yangi sanaga to'g'ri kelganlari joyida qoladi, boshqalari bo'sh sanalarga
+    mavzusi bilan ko'chiriladi - bitta bulk_update. Ortiqchalari o'chiriladi, yetishmaganlari
+    yaratiladi. (yangilangan, yaratilgan, o'chirilgan) sonlari qaytadi.
+    """
+    from_date = from_date or timezone.localdate() + timedelta(days=1)
+    dates = slot_dates(slot, holidays_between(from_date, slot.date_to), from_date)
+    sessions = slot.sessions.filter(date__gte=from_date)
+    attended = set(sessions.filter(attendances__isnull=False).values_list('date', flat=True).distinct())
+    future = list(sessions.exclude(date__in=attended).order_by('date'))
+
+    wanted = set(dates)
+    kept = [session for session in future if session.date in wanted]
+    moved = [session for session in future if session.date not in wanted]
+    taken = attended | {session.date for session in kept}
+    free = [date for date in dates if date not in taken]
+
+    # Ko'chirilganlar faqat band bo'lmagan yangi sanalarga tushadi - noyoblik buzilmaydi
+    for session, date in zip(moved, free):
+        session.date = date
+    updated = kept + moved[:len(free)]
+    for session in updated:
+        for field in SCHEDULE_FIELDS:
+            setattr(session, field, getattr(slot, field))
+    removed = moved[len(free):]
+    created = [build_session(slot, date) for date in free[len(moved):]]
+
+    with transaction.atomic():
+        Session.objects.bulk_update(updated, ['date', *SCHEDULE_FIELDS], batch_size=500)
+        if removed:
+            Session.objects.filter(pk__in=[session.pk for session in removed]).delete()
+            sessions_deleted([slot.course_id])
+        Session.objects.bulk_create(created, batch_size=1000)
+        sessions_created(created)
+    return len(updated), len(created), len(removed)
+
+
+def remove_slot(slot, from_date=None):
+    """Bandni o'chirish: ertadan keyingi davomatsiz sessiyalari ham o'chadi, qolganlari qo'lda yaratilgandek qoladi"""
+    from_date = from_date or timezone.localdate() + timedelta(days=1)
+    with transaction.atomic():
+        _, deleted = slot.sessions.filter(date__gte=from_date, attendances__isnull=True).delete()
+        removed = deleted.get(Session._meta.label, 0)
+        slot.delete()
+        if removed:
+            sessions_deleted([slot.course_id])
+    return removed
@@ -9,12 +9,19 @@ urlpatterns = [
     # Talaba
     path('', views.student_attendance, name='student_attendance'),
     path('course/<int:course_pk>/', views.student_attendance_detail, name='student_attendance_detail'),
+    path('checkin/', views.student_checkin, name='student_checkin'),
 
     # O'qituvchi
     path('teacher/', views.teacher_session_list, name='teacher_session_list'),
     path('teacher/course/<int:course_pk>/create/', views.teacher_session_create, name='teacher_session_create'),
     path('teacher/session/<int:pk>/edit/', views.teacher_session_edit, name='teacher_session_edit'),
     path('teacher/session/<int:pk>/delete/', views.teacher_session_delete, name='teacher_session_delete'),
+    path('teacher/course/<int:course_pk>/timetable/', views.teacher_timetable, name='teacher_timetable'),
+    path('teacher/timetable/<int:pk>/edit/', views.teacher_timetable_slot_edit, name='teacher_timetable_slot_edit'),
+    path('teacher/timetable/<int:pk>/delete/', views.teacher_timetable_slot_delete, name='teacher_timetable_slot_delete'),
     path('teacher/session/<int:pk>/take/', views.teacher_take_attendance, name='teacher_take_attendance'),
+    path('teacher/session/<int:pk>/checkin/', views.teacher_checkin, name='teacher_checkin'),
+    path('teacher/session/<int:pk>/checkin/poll/', views.teacher_checkin_poll, name='teacher_checkin_poll'),
     path('teacher/course/<int:course_pk>/report/', views.teacher_attendance_report, name='teacher_attendance_report'),
+    path('teacher/course/<int:course_pk>/report/export/', views.teacher_attendance_report_export, name='teacher_attendance_report_export'),
 ]
\ No newline at end of file
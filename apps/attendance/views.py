@@ -1,12 +1,18 @@
 # apps/attendance/views.py
 
+import csv
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.utils import timezone
 from django.db.models import Count, Q
 
-from .models import Session, Attendance
-from .forms import SessionForm
+from .models import Session, Attendance, AttendanceSummary, TimetableSlot
+from .forms import SessionForm, TimetableSlotForm, AttendanceReportFilterForm, CheckinOpenForm, CheckinCodeForm
+from .reports import build_matrix
+from . import services, checkin, timetable
 from apps.courses.models import Course, Enrollment
 
 
@@ -20,36 +26,28 @@ def student_attendance(request):
         status='active'
     ).select_related('course')
 
-    attendance_data = []
+    summaries = {
+        summary.course_id: summary
+        for summary in AttendanceSummary.objects.filter(
+            student=request.user,
+            course__in=[enrollment.course_id for enrollment in enrollments]
+        )
+    }
 
+    attendance_data = []
     for enrollment in enrollments:
-        sessions = Session.objects.filter(course=enrollment.course)
-        total_sessions = sessions.count()
-
-        if total_sessions > 0:
-            attendances = Attendance.objects.filter(
-                session__course=enrollment.course,
-                student=request.user
-            )
-
-            present = attendances.filter(status='present').count()
-            late = attendances.filter(status='late').count()
-            absent = attendances.filter(status='absent').count()
-            excused = attendances.filter(status='excused').count()
-
-            percentage = int(((present + late + excused) / total_sessions) * 100) if total_sessions > 0 else 0
-        else:
-            present = late = absent = excused = 0
-            percentage = 0
-
+        summary = summaries.get(enrollment.course_id) or AttendanceSummary(
+            student=request.user,
+            course=enrollment.course
+        )
         attendance_data.append({
             'course': enrollment.course,
-            'total_sessions': total_sessions,
-            'present': present,
-            'late': late,
-            'absent': absent,
-            'excused': excused,
-            'percentage': percentage
+            'total_sessions': summary.total_sessions,
+            'present': summary.present_count,
+            'late': summary.late_count,
+            'absent': summary.absent_count,
+            'excused': summary.excused_count,
+            'percentage': summary.percentage
         })
 
     return render(request, 'attendance/student_attendance.html', {
@@ -92,6 +90,41 @@ def student_attendance_detail(request, course_pk):
     })
 
 
+@login_required
+def student_checkin(request):
+    """Kod bilan darsga o'zi belgilanish (telefondan)"""
+    sessions = Session.objects.filter(
+        course__enrollments__student=request.user,
+        course__enrollments__status='active',
+        checkin_until__gt=timezone.now()
+    ).select_related('course')
+
+    form = CheckinCodeForm(request.POST or None)
+    if request.method == 'POST' and checkin.is_locked_out(request.user.pk):
+        # Kodni terib topishga urinishlar: blok muddati tugaguncha kod tekshirilmaydi
+        messages.error(request, 'Juda ko\'p noto\'g\'ri urinish! Birozdan so\'ng qayta urinib ko\'ring.')
+        return redirect('attendance:student_checkin')
+    if request.method == 'POST' and form.is_valid():
+        session = next(
+            (session for session in sessions if checkin.verify_code(session, form.cleaned_data['code'])),
+            None
+        )
+        if session is None:
+            remaining = checkin.record_failed_attempt(request.user.pk)
+            messages.error(request, f'Kod noto\'g\'ri yoki muddati o\'tgan! Qolgan urinishlar: {remaining}')
+        elif checkin.check_in(session, request.user.pk):
+            checkin.reset_attempts(request.user.pk)
+            messages.success(request, f'{session.course.code}: darsga belgilandingiz!')
+        else:
+            messages.info(request, 'Siz bu darsga allaqachon belgilangansiz.')
+        return redirect('attendance:student_checkin')
+
+    return render(request, 'attendance/student_checkin.html', {
+        'form': form,
+        'sessions': sessions
+    })
+
+
 # ===================== O'QITUVCHI =====================
 
 @login_required
@@ -170,6 +203,69 @@ def teacher_session_delete(request, pk):
     })
 
 
+@login_required
+def teacher_timetable(request, course_pk):
+    """Haftalik dars jadvali: band qo'shilganda uning barcha sessiyalari yaratiladi"""
+    course = get_object_or_404(Course, pk=course_pk, teacher=request.user)
+
+    if request.method == 'POST':
+        form = TimetableSlotForm(request.POST)
+        if form.is_valid():
+            slot = form.save(commit=False)
+            slot.course = course
+            slot.save()
+            created = timetable.generate_sessions([slot])
+            messages.success(request, f'Jadvalga qo\'shildi: {created} ta sessiya yaratildi!')
+            return redirect('attendance:teacher_timetable', course_pk=course.pk)
+    else:
+        form = TimetableSlotForm()
+
+    slots = course.timetable_slots.annotate(session_count=Count('sessions'))
+
+    return render(request, 'attendance/teacher/timetable.html', {
+        'course': course,
+        'slots': slots,
+        'form': form
+    })
+
+
+@login_required
+def teacher_timetable_slot_edit(request, pk):
+    """Jadval bandini tahrirlash: kelgusi sessiyalar yangi jadvalga ko'chiriladi"""
+    slot = get_object_or_404(TimetableSlot.objects.select_related('course'), pk=pk, course__teacher=request.user)
+
+    if request.method == 'POST':
+        form = TimetableSlotForm(request.POST, instance=slot)
+        if form.is_valid():
+            slot = form.save()
+            updated, created, removed = timetable.reschedule_slot(slot)
+            messages.success(
+                request,
+                f'Jadval yangilandi: {updated} ta sessiya ko\'chirildi, {created} ta yaratildi, {removed} ta o\'chirildi.'
+            )
+            return redirect('attendance:teacher_timetable', course_pk=slot.course_id)
+    else:
+        form = TimetableSlotForm(instance=slot)
+
+    return render(request, 'attendance/teacher/timetable_slot_form.html', {
+        'form': form,
+        'slot': slot,
+        'course': slot.course
+    })
+
+
+@login_required
+def teacher_timetable_slot_delete(request, pk):
+    """Jadval bandini o'chirish (o'tgan va davomatli sessiyalar saqlanadi)"""
+    slot = get_object_or_404(TimetableSlot, pk=pk, course__teacher=request.user)
+
+    if request.method == 'POST':
+        removed = timetable.remove_slot(slot)
+        messages.success(request, f'Band o\'chirildi, {removed} ta kelgusi sessiya o\'chirildi.')
+
+    return redirect('attendance:teacher_timetable', course_pk=slot.course_id)
+
+
 @login_required
 def teacher_take_attendance(request, pk):
     """Davomat olish"""
@@ -181,36 +277,31 @@ def teacher_take_attendance(request, pk):
         status='active'
     ).select_related('student')
 
+    # Check-in navbatidagi yozuvlar avval tushiriladi: forma ularni ko'rsatadi, saqlangan forma esa ustidan yozadi
+    checkin.flush_checkins(session)
+
     if request.method == 'POST':
-        for enrollment in enrollments:
-            student = enrollment.student
-            status = request.POST.get(f'status_{student.pk}', 'absent')
-            notes = request.POST.get(f'notes_{student.pk}', '')
-
-            attendance, created = Attendance.objects.update_or_create(
-                session=session,
-                student=student,
-                defaults={
-                    'status': status,
-                    'notes': notes
-                }
+        # Faqat o'zgargan holat va izohlar yoziladi
+        services.mark_attendance(session, {
+            enrollment.student_id: (
+                request.POST.get(f'status_{enrollment.student_id}', 'absent'),
+                request.POST.get(f'notes_{enrollment.student_id}', '')
             )
+            for enrollment in enrollments
+        })
 
         messages.success(request, 'Davomat saqlandi!')
         return redirect('attendance:teacher_session_list')
 
-    # Mavjud davomatlarni olish
-    attendance_data = []
-    for enrollment in enrollments:
-        attendance = Attendance.objects.filter(
-            session=session,
-            student=enrollment.student
-        ).first()
-
-        attendance_data.append({
+    # Mavjud davomatlar bitta so'rovda
+    attendances = services.session_attendances(session)
+    attendance_data = [
+        {
             'student': enrollment.student,
-            'attendance': attendance
-        })
+            'attendance': attendances.get(enrollment.student_id)
+        }
+        for enrollment in enrollments
+    ]
 
     return render(request, 'attendance/teacher/take_attendance.html', {
         'session': session,
@@ -219,46 +310,95 @@ def teacher_take_attendance(request, pk):
 
 
 @login_required
-def teacher_attendance_report(request, course_pk):
-    """Davomat hisoboti"""
-    course = get_object_or_404(Course, pk=course_pk, teacher=request.user)
+def teacher_checkin(request, pk):
+    """Check-in rejimi: aylanuvchi kodni proyektorda ko'rsatish, oynani ochish/yopish"""
+    session = get_object_or_404(Session.objects.select_related('course'), pk=pk, course__teacher=request.user)
+    form = CheckinOpenForm(request.POST or None, initial={'minutes': checkin.checkin_window()})
 
-    sessions = Session.objects.filter(course=course).order_by('date')
-    enrollments = Enrollment.objects.filter(
-        course=course,
-        status='active'
-    ).select_related('student')
+    if request.method == 'POST':
+        if request.POST.get('action') == 'close':
+            flushed = checkin.close_checkin(session)
+            messages.success(request, f'Check-in yopildi. {flushed} ta talaba davomatga yozildi.')
+            return redirect('attendance:teacher_take_attendance', pk=session.pk)
+        if form.is_valid():
+            checkin.open_checkin(session, form.cleaned_data['minutes'])
+            messages.success(request, 'Check-in ochildi!')
+            return redirect('attendance:teacher_checkin', pk=session.pk)
 
-    # Har bir talaba uchun davomat
-    report_data = []
-    for enrollment in enrollments:
-        student_attendances = []
-        present_count = 0
+    return render(request, 'attendance/teacher/checkin.html', {
+        'session': session,
+        'form': form,
+        'state': checkin_state(session),
+        'code_period': checkin.code_period()
+    })
 
-        for session in sessions:
-            attendance = Attendance.objects.filter(
-                session=session,
-                student=enrollment.student
-            ).first()
 
-            student_attendances.append(attendance)
+def checkin_state(session):
+    """Check-in sahifasi holati: joriy kod va belgilanganlar soni"""
+    code, expires_in = checkin.current_code(session) if session.is_checkin_open else ('', 0)
+    return {
+        'open': session.is_checkin_open,
+        'code': code,
+        'expires_in': expires_in,
+        'checked_in': session.attendances.filter(status=Attendance.Status.PRESENT).count() +
+        checkin.pending_count(session),
+    }
 
-            if attendance and attendance.status in ['present', 'late', 'excused']:
-                present_count += 1
 
-        total = sessions.count()
-        percentage = int((present_count / total) * 100) if total > 0 else 0
+@login_required
+def teacher_checkin_poll(request, pk):
+    """Check-in holati (JSON): har so'rovda navbat ham tushiriladi"""
+    session = get_object_or_404(Session, pk=pk, course__teacher=request.user)
+    checkin.flush_checkins(session)
+    return JsonResponse(checkin_state(session))
+
+
+def report_matrix(request, course):
+    """Filtrlar bo'yicha davomat matritsasi (hisobot sahifasi va eksport uchun umumiy)"""
+    form = AttendanceReportFilterForm(request.GET or None)
+    filters = form.cleaned_data if form.is_valid() else {}
+    return form, build_matrix(course, **filters)
 
-        report_data.append({
-            'student': enrollment.student,
-            'attendances': student_attendances,
-            'present_count': present_count,
-            'total': total,
-            'percentage': percentage
-        })
+
+@login_required
+def teacher_attendance_report(request, course_pk):
+    """Davomat hisoboti"""
+    course = get_object_or_404(Course, pk=course_pk, teacher=request.user)
+    form, matrix = report_matrix(request, course)
 
     return render(request, 'attendance/teacher/attendance_report.html', {
         'course': course,
-        'sessions': sessions,
-        'report_data': report_data
-    })
\ No newline at end of file
+        'form': form,
+        'sessions': matrix.sessions,
+        'report_data': matrix.rows(),
+        'session_totals': [int(count) for count in matrix.session_attended],
+        'query': request.GET.urlencode()
+    })
+
+
+@login_required
+def teacher_attendance_report_export(request, course_pk):
+    """Davomat hisobotini CSV ga eksport qilish"""
+    course = get_object_or_404(Course, pk=course_pk, teacher=request.user)
+    form, matrix = report_matrix(request, course)
+    labels = dict(Attendance.Status.choices)
+
+    response = HttpResponse(content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="davomat_{course.code}.csv"'
+    # Excel UTF-8 ni to'g'ri ochishi uchun
+    response.write('\ufeff')
+
+    writer = csv.writer(response)
+    writer.writerow(
+        ['Talaba'] +
+        [f'{session.date:%d.%m.%Y} {session.get_session_type_display()}' for session in matrix.sessions] +
+        ['Jami', '%']
+    )
+    for row in matrix.rows():
+        student = row['student']
+        writer.writerow(
+            [student.get_full_name() or student.username] +
+            [labels.get(status, '') for status in row['statuses']] +
+            [f"{row['present_count']}/{row['total']}", row['percentage']]
+        )
+    return response
@@ -62,14 +62,14 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('student', 'course', 'status', 'progress', 'enrolled_at')
     list_filter = ('status', 'course')
     search_fields = ('student__username', 'student__first_name', 'course__name')
-    readonly_fields = ('enrolled_at', 'completed_at')
+    readonly_fields = ('completed_lessons', 'enrolled_at', 'completed_at')
 
     fieldsets = (
         (None, {
             'fields': ('student', 'course')
         }),
         ('Holat', {
-            'fields': ('status', 'progress')
+            'fields': ('status', 'progress', 'completed_lessons')
         }),
         ('Sanalar', {
             'fields': ('enrolled_at', 'completed_at')
@@ -5,3 +5,6 @@ class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.courses'
     verbose_name = 'Kurslar'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,44 @@
+# apps/courses/management/commands/rebuild_progress.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.courses.models import Course, Enrollment
+from apps.courses.services import rebuild_progress
+
+
+class Command(BaseCommand):
+    help = "Yozilishlar progressini LessonProgress asosida to'liq qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=int,
+            action='append',
+            dest='course_ids',
+            help="Faqat shu kurs(lar) uchun (bir necha marta berish mumkin)"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help="Bitta tranzaksiyadagi kurslar soni (standart: 50)"
+        )
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids']
+        batch_size = max(options['batch_size'], 1)
+
+        courses = Course.objects.order_by('pk')
+        if course_ids:
+            courses = courses.filter(pk__in=course_ids)
+        course_ids = list(courses.values_list('pk', flat=True))
+
+        total = 0
+        for start in range(0, len(course_ids), batch_size):
+            batch = course_ids[start:start + batch_size]
+            with transaction.atomic():
+                total += rebuild_progress(Enrollment.objects.filter(course_id__in=batch))
+            self.stdout.write(f"{min(start + batch_size, len(course_ids))}/{len(course_ids)} kurs...")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} ta yozilish progressi yangilandi."))
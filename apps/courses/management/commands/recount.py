@@ -0,0 +1,37 @@
+# apps/courses/management/commands/recount.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.courses.services import recount_course_counters
+from apps.assessments.models import Quiz
+from apps.assessments.services import recount_quiz_counters
+from apps.assessments.summaries import rebuild_summaries
+from apps.attendance import summaries as attendance_summaries
+
+
+class Command(BaseCommand):
+    help = "Kurs, modul va test hisoblagichlarini hamda urinishlar va davomat xulosalarini qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            type=int,
+            action='append',
+            dest='course_ids',
+            help="Faqat shu kurs(lar) uchun (bir necha marta berish mumkin)"
+        )
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids']
+        quiz_ids = None
+        if course_ids:
+            quiz_ids = Quiz.objects.filter(course_id__in=course_ids).values('pk')
+
+        with transaction.atomic():
+            rows = recount_course_counters(course_ids)
+            rows += recount_quiz_counters(quiz_ids)
+            rows += rebuild_summaries(quiz_ids)
+            rows += attendance_summaries.rebuild_summaries(course_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"{rows} ta qator qayta hisoblandi."))
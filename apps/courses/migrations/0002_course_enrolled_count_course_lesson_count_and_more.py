@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:01
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, group_field):
+    counts = queryset.order_by().values(group_field).annotate(total=Count('pk')).values('total')[:1]
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Module = apps.get_model('courses', 'Module')
+    Lesson = apps.get_model('courses', 'Lesson')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+
+    Course.objects.update(
+        enrolled_count=_count(Enrollment.objects.filter(course=OuterRef('pk'), status='active'), 'course'),
+        module_count=_count(Module.objects.filter(course=OuterRef('pk')), 'course'),
+        lesson_count=_count(Lesson.objects.filter(module__course=OuterRef('pk')), 'module__course'),
+    )
+    Module.objects.update(
+        lesson_count=_count(Lesson.objects.filter(module=OuterRef('pk')), 'module'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Talabalar soni'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Darslar soni'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='module_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Modullar soni'),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Darslar soni'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:02
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least, NullIf
+
+
+def fill_completed_lessons(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    LessonProgress = apps.get_model('courses', 'LessonProgress')
+
+    completed = Coalesce(Subquery(
+        LessonProgress.objects.filter(
+            student=OuterRef('student_id'),
+            lesson__module__course=OuterRef('course_id'),
+            is_completed=True
+        ).order_by().values('student').annotate(total=Count('pk')).values('total')[:1],
+        output_field=IntegerField()
+    ), Value(0))
+    total = Subquery(Course.objects.filter(pk=OuterRef('course_id')).values('lesson_count')[:1])
+
+    Enrollment.objects.update(
+        completed_lessons=completed,
+        progress=Coalesce(Least(completed * 100 / NullIf(total, Value(0)), Value(100)), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_enrolled_count_course_lesson_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Tugatilgan darslar'),
+        ),
+        migrations.RunPython(fill_completed_lessons, migrations.RunPython.noop),
+    ]
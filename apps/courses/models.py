@@ -35,6 +35,11 @@ class Course(models.Model):
     credits = models.PositiveIntegerField(default=3, verbose_name="Kreditlar")
     is_active = models.BooleanField(default=True, verbose_name="Faol")
 
+    # Hisoblagichlar (signallar orqali yangilanadi, `recount` buyrug'i tuzatadi)
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Talabalar soni")
+    module_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Modullar soni")
+    lesson_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Darslar soni")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -46,15 +51,6 @@ class Course(models.Model):
     def __str__(self):
         return f"{self.code} - {self.name}"
 
-    def enrolled_count(self):
-        return self.enrollments.filter(status='active').count()
-
-    def module_count(self):
-        return self.modules.count()
-
-    def lesson_count(self):
-        return Lesson.objects.filter(module__course=self).count()
-
 
 class Module(models.Model):
     """Modul"""
@@ -68,6 +64,8 @@ class Module(models.Model):
     description = models.TextField(blank=True, verbose_name="Tavsif")
     order = models.PositiveIntegerField(default=0, verbose_name="Tartib")
 
+    lesson_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Darslar soni")
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -78,9 +76,6 @@ class Module(models.Model):
     def __str__(self):
         return f"{self.course.code} - {self.title}"
 
-    def lesson_count(self):
-        return self.lessons.count()
-
 
 class Lesson(models.Model):
     """Dars"""
@@ -109,6 +104,13 @@ class Lesson(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Modulga ko'chirilishini signalda aniqlash uchun
+        instance._loaded_module_id = dict(zip(field_names, values)).get('module_id')
+        return instance
+
     @property
     def video_embed_url(self):
         """YouTube URL ni embed formatga o'girish"""
@@ -163,6 +165,7 @@ class Enrollment(models.Model):
         verbose_name="Holat"
     )
     progress = models.PositiveIntegerField(default=0, verbose_name="Progress (%)")
+    completed_lessons = models.PositiveIntegerField(default=0, editable=False, verbose_name="Tugatilgan darslar")
 
     enrolled_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -175,18 +178,19 @@ class Enrollment(models.Model):
     def __str__(self):
         return f"{self.student.username} - {self.course.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Holat o'zgarishini signalda aniqlash uchun
+        instance._loaded_status = dict(zip(field_names, values)).get('status')
+        return instance
+
     def update_progress(self):
-        total_lessons = self.course.lesson_count()
-        if total_lessons == 0:
-            self.progress = 0
-        else:
-            completed = LessonProgress.objects.filter(
-                student=self.student,
-                lesson__module__course=self.course,
-                is_completed=True
-            ).count()
-            self.progress = int((completed / total_lessons) * 100)
-        self.save()
+        """Progressni LessonProgress asosida qayta hisoblash"""
+        from .services import rebuild_progress
+
+        rebuild_progress(Enrollment.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['progress', 'completed_lessons'])
 
 
 class LessonProgress(models.Model):
@@ -0,0 +1,156 @@
+# apps/courses/services.py
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Least, NullIf
+from django.utils import timezone
+
+from .models import Course, Module, Lesson, Enrollment, LessonProgress
+
+
+def count_subquery(queryset, group_field):
+    """Tashqi so'rov qatori uchun COUNT subquery (bo'sh bo'lsa 0)"""
+    counts = queryset.order_by().values(group_field).annotate(
+        total=Count('pk')
+    ).values('total')[:1]
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def deleted_directly(origin, model):
+    """O'chirish shu modelning o'zidan boshlanganmi (ota obyekt kaskadi emas)"""
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+def shift_counter(queryset, field, delta):
+    """Hisoblagichni atomik o'zgartirish (manfiyga tushmaydi)"""
+    if delta:
+        queryset.update(**{field: Greatest(F(field) + delta, Value(0))})
+
+
+# ===================== HISOBLAGICHLAR =====================
+
+def course_enrolled_changed(course_id, delta):
+    shift_counter(Course.objects.filter(pk=course_id), 'enrolled_count', delta)
+
+
+def course_module_changed(course_id, delta):
+    shift_counter(Course.objects.filter(pk=course_id), 'module_count', delta)
+
+
+def module_removed(course_id, lesson_count):
+    """Modul darslari bilan o'chirildi: kurs hisoblagichlari bir marta siljiydi, progress bir marta tiklanadi"""
+    courses = Course.objects.filter(pk=course_id)
+    shift_counter(courses, 'module_count', -1)
+    shift_counter(courses, 'lesson_count', -lesson_count)
+    if lesson_count:
+        rebuild_progress(Enrollment.objects.filter(course_id=course_id))
+
+
+def module_lesson_changed(module_id, delta):
+    """Modul va uning kursidagi darslar sonini o'zgartirish, progressni yangilash"""
+    shift_counter(Module.objects.filter(pk=module_id), 'lesson_count', delta)
+    shift_counter(Course.objects.filter(modules__pk=module_id), 'lesson_count', delta)
+
+    # Dars o'chirilganda uning LessonProgress yozuvlari ham ketadi
+    refresh_progress(Enrollment.objects.filter(course__modules=module_id), recount_completed=delta < 0)
+
+
+def lesson_moved(old_module_id, new_module_id):
+    """Dars boshqa modulga ko'chirildi: modul hisoblagichlari, kurs o'zgargan bo'lsa kurslar va progress"""
+    shift_counter(Module.objects.filter(pk=old_module_id), 'lesson_count', -1)
+    shift_counter(Module.objects.filter(pk=new_module_id), 'lesson_count', 1)
+
+    courses = dict(Module.objects.filter(pk__in=[old_module_id, new_module_id]).values_list('pk', 'course_id'))
+    old_course_id, new_course_id = courses.get(old_module_id), courses.get(new_module_id)
+    if old_course_id == new_course_id:
+        return
+
+    shift_counter(Course.objects.filter(pk=old_course_id), 'lesson_count', -1)
+    shift_counter(Course.objects.filter(pk=new_course_id), 'lesson_count', 1)
+    # Dars progressi endi yangi kursga tegishli - ikkala kursda tugatilganlar qayta sanaladi
+    rebuild_progress(Enrollment.objects.filter(course_id__in=[old_course_id, new_course_id]))
+
+
+def recount_course_counters(course_ids=None):
+    """Kurs va modul hisoblagichlarini bitta UPDATE bilan tiklash"""
+    courses = Course.objects.all()
+    modules = Module.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+        modules = modules.filter(course_id__in=course_ids)
+
+    updated = courses.update(
+        enrolled_count=count_subquery(
+            Enrollment.objects.filter(course=OuterRef('pk'), status=Enrollment.Status.ACTIVE),
+            'course'
+        ),
+        module_count=count_subquery(Module.objects.filter(course=OuterRef('pk')), 'course'),
+        lesson_count=count_subquery(Lesson.objects.filter(module__course=OuterRef('pk')), 'module__course'),
+    )
+    updated += modules.update(
+        lesson_count=count_subquery(Lesson.objects.filter(module=OuterRef('pk')), 'module'),
+    )
+    return updated
+
+
+# ===================== PROGRESS =====================
+
+def course_lesson_count():
+    """Yozilish qatori uchun kursdagi darslar soni (subquery)"""
+    return Subquery(
+        Course.objects.filter(pk=OuterRef('course_id')).values('lesson_count')[:1],
+        output_field=IntegerField()
+    )
+
+
+def completed_lessons_subquery():
+    """Yozilish qatori uchun tugatilgan darslar soni (subquery)"""
+    return count_subquery(
+        LessonProgress.objects.filter(
+            student=OuterRef('student_id'),
+            lesson__module__course=OuterRef('course_id'),
+            is_completed=True
+        ),
+        'student'
+    )
+
+
+def progress_expression(completed, total):
+    """completed * 100 / total, 0..100 oralig'ida (darslar bo'lmasa 0)"""
+    return Coalesce(Least(completed * 100 / NullIf(total, Value(0)), Value(100)), Value(0))
+
+
+def complete_lesson(student, lesson):
+    """Darsni tugatish; yozilish progressi O(1) da oshiriladi"""
+    marked = LessonProgress.objects.filter(
+        student=student,
+        lesson=lesson,
+        is_completed=False
+    ).update(is_completed=True, completed_at=timezone.now())
+
+    if not marked:
+        return False
+
+    completed = F('completed_lessons') + 1
+    Enrollment.objects.filter(student=student, course__modules=lesson.module_id).update(
+        completed_lessons=completed,
+        progress=progress_expression(completed, course_lesson_count()),
+    )
+    return True
+
+
+def rebuild_progress(enrollments):
+    """Yozilishlar progressini LessonProgress asosida bitta UPDATE bilan tiklash"""
+    completed = completed_lessons_subquery()
+    return enrollments.update(
+        completed_lessons=completed,
+        progress=progress_expression(completed, course_lesson_count()),
+    )
+
+
+def refresh_progress(enrollments, recount_completed=False):
+    """O'quv reja o'zgarganda yozilishlar progressini bitta UPDATE bilan yangilash"""
+    if recount_completed:
+        return rebuild_progress(enrollments)
+    return enrollments.update(
+        progress=progress_expression(F('completed_lessons'), course_lesson_count()),
+    )
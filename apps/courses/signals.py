@@ -0,0 +1,80 @@
+# apps/courses/signals.py
+
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import Module, Lesson, Enrollment
+from . import services
+
+
+# ===================== YOZILISH =====================
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, **kwargs):
+    is_active = instance.status == Enrollment.Status.ACTIVE
+
+    if created:
+        if is_active:
+            services.course_enrolled_changed(instance.course_id, 1)
+        # Qayta yozilganda oldingi LessonProgress hisobga olinadi
+        services.rebuild_progress(Enrollment.objects.filter(pk=instance.pk))
+    else:
+        loaded_status = getattr(instance, '_loaded_status', None)
+        if loaded_status is None:
+            # Oldingi holat noma'lum - kursni qayta sanash
+            services.recount_course_counters([instance.course_id])
+        elif loaded_status != instance.status:
+            was_active = loaded_status == Enrollment.Status.ACTIVE
+            services.course_enrolled_changed(instance.course_id, int(is_active) - int(was_active))
+
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    if instance.status == Enrollment.Status.ACTIVE:
+        services.course_enrolled_changed(instance.course_id, -1)
+
+
+# ===================== MODUL / DARS =====================
+
+@receiver(post_save, sender=Module)
+def module_saved(sender, instance, created, **kwargs):
+    if created:
+        services.course_module_changed(instance.course_id, 1)
+
+
+@receiver(pre_delete, sender=Module)
+def module_deleting(sender, instance, origin=None, **kwargs):
+    # Darslar kaskad bilan o'chadi - soni oldindan olinadi (nusxadagi hisoblagich eskirgan bo'lishi mumkin)
+    if services.deleted_directly(origin, Module):
+        instance._deleted_lessons = instance.lessons.count()
+
+
+@receiver(post_delete, sender=Module)
+def module_deleted(sender, instance, origin=None, **kwargs):
+    # Kurs bilan birga o'chganda hisoblagichlar ham ketadi
+    if services.deleted_directly(origin, Module):
+        services.module_removed(instance.course_id, getattr(instance, '_deleted_lessons', 0))
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    if created:
+        services.module_lesson_changed(instance.module_id, 1)
+    else:
+        loaded_module_id = getattr(instance, '_loaded_module_id', None)
+        if loaded_module_id is None:
+            # Oldingi modul noma'lum - kursni qayta sanash
+            services.recount_course_counters(Module.objects.filter(pk=instance.module_id).values('course_id'))
+        elif loaded_module_id != instance.module_id:
+            services.lesson_moved(loaded_module_id, instance.module_id)
+
+    instance._loaded_module_id = instance.module_id
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, origin=None, **kwargs):
+    # Modul yoki kurs kaskadi module_deleted da bir marta hisoblanadi
+    if services.deleted_directly(origin, Lesson):
+        services.module_lesson_changed(instance.module_id, -1)
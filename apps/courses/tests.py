@@ -1,3 +1,165 @@
+# apps/courses/tests.py
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import User, Faculty, Department
+from .models import Course, Module, Lesson, Enrollment, LessonProgress
+from . import services
+
+
+class CoursesTestCase(TestCase):
+    """Ikki kurs (har birida 2 modul), birinchisiga 3 talaba, ikkinchisiga 1 talaba yozilgan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='D', faculty=Faculty.objects.create(name='F', code='F'))
+        cls.teacher = User.objects.create(username='teacher', role='teacher')
+        cls.students = [User.objects.create(username=f'student{index}', role='student') for index in range(3)]
+        cls.course, cls.modules = cls.create_course('C1')
+        cls.other_course, cls.other_modules = cls.create_course('C2')
+        for student in cls.students:
+            Enrollment.objects.create(student=student, course=cls.course)
+        Enrollment.objects.create(student=cls.students[0], course=cls.other_course)
+
+    @classmethod
+    def create_course(cls, code):
+        course = Course.objects.create(name=code, code=code, department=cls.department, teacher=cls.teacher)
+        return course, [Module.objects.create(course=course, title=f'{code} M{index}') for index in range(2)]
+
+    def add_lessons(self, module, count):
+        return [Lesson.objects.create(module=module, title=f'L{index}', content='x') for index in range(count)]
+
+    def complete(self, student, lesson):
+        LessonProgress.objects.create(student=student, lesson=lesson)
+        return services.complete_lesson(student, lesson)
+
+    def snapshot(self):
+        return (
+            sorted(Course.objects.values_list('pk', 'enrolled_count', 'module_count', 'lesson_count')),
+            sorted(Module.objects.values_list('pk', 'lesson_count')),
+            sorted(Enrollment.objects.values_list('pk', 'completed_lessons', 'progress')),
+        )
+
+    def assertMatchesRecount(self):
+        """Signallar yuritgan hisoblagichlar va progress to'liq qayta sanash bilan bir xil"""
+        before = self.snapshot()
+        services.recount_course_counters()
+        services.rebuild_progress(Enrollment.objects.all())
+        self.assertEqual(before, self.snapshot())
+
+
+# ===================== HISOBLAGICHLAR =====================
+
+class CounterTests(CoursesTestCase):
+
+    def test_lesson_create_and_delete(self):
+        lessons = self.add_lessons(self.modules[0], 3)
+        self.complete(self.students[0], lessons[0])
+        self.assertMatchesRecount()
+
+        lessons[0].delete()
+        self.assertMatchesRecount()
+        self.assertEqual(Course.objects.get(pk=self.course.pk).lesson_count, 2)
+
+    def test_lesson_moved_within_course(self):
+        lessons = self.add_lessons(self.modules[0], 2)
+        self.complete(self.students[0], lessons[0])
+
+        lesson = Lesson.objects.get(pk=lessons[0].pk)
+        lesson.module = self.modules[1]
+        lesson.save()
+
+        self.assertMatchesRecount()
+        self.assertEqual(Module.objects.get(pk=self.modules[1].pk).lesson_count, 1)
+
+    def test_lesson_moved_across_courses(self):
+        lessons = self.add_lessons(self.modules[0], 2)
+        self.add_lessons(self.other_modules[0], 1)
+        self.complete(self.students[0], lessons[0])
+        self.complete(self.students[1], lessons[0])
+
+        lesson = Lesson.objects.get(pk=lessons[0].pk)
+        lesson.module = self.other_modules[1]
+        lesson.save()
+
+        self.assertMatchesRecount()
+        self.assertEqual(Course.objects.get(pk=self.course.pk).lesson_count, 1)
+        self.assertEqual(Course.objects.get(pk=self.other_course.pk).lesson_count, 2)
+        # Ko'chirilgan dars progressi yangi kursga o'tadi
+        self.assertEqual(Enrollment.objects.get(student=self.students[0], course=self.other_course).completed_lessons, 1)
+
+    def test_enrollment_status_change(self):
+        enrollment = Enrollment.objects.get(student=self.students[1], course=self.course)
+        enrollment.status = Enrollment.Status.DROPPED
+        enrollment.save()
+        self.assertMatchesRecount()
+        self.assertEqual(Course.objects.get(pk=self.course.pk).enrolled_count, 2)
+
+        enrollment.delete()
+        self.assertMatchesRecount()
+
+    def test_module_delete_with_lessons(self):
+        lessons = self.add_lessons(self.modules[0], 3)
+        self.add_lessons(self.modules[1], 2)
+        self.complete(self.students[0], lessons[0])
+
+        # Nusxadagi hisoblagich eskirgan bo'lsa ham to'g'ri siljiydi
+        self.modules[0].delete()
+        self.assertMatchesRecount()
+        self.assertEqual(Course.objects.get(pk=self.course.pk).lesson_count, 2)
+
+    def test_module_delete_queries_do_not_grow_with_lessons(self):
+        self.add_lessons(self.modules[0], 2)
+        self.add_lessons(self.modules[1], 20)
+
+        counts = []
+        for module in self.modules:
+            with CaptureQueriesContext(connection) as context:
+                Module.objects.get(pk=module.pk).delete()
+            counts.append(len(context))
+        self.assertEqual(counts[0], counts[1])
+        self.assertMatchesRecount()
+
+    def test_course_delete_cascade(self):
+        self.add_lessons(self.other_modules[0], 5)
+        Course.objects.get(pk=self.other_course.pk).delete()
+        self.assertMatchesRecount()
+
+
+# ===================== PROGRESS =====================
+
+class ProgressTests(CoursesTestCase):
+
+    def enrollment(self, student):
+        return Enrollment.objects.get(student=student, course=self.course)
+
+    def test_complete_lesson_once(self):
+        lessons = self.add_lessons(self.modules[0], 4)
+        self.assertTrue(self.complete(self.students[0], lessons[0]))
+        self.assertFalse(services.complete_lesson(self.students[0], lessons[0]))
+
+        enrollment = self.enrollment(self.students[0])
+        self.assertEqual((enrollment.completed_lessons, enrollment.progress), (1, 25))
+        self.assertMatchesRecount()
+
+    def test_new_lesson_lowers_progress(self):
+        lessons = self.add_lessons(self.modules[0], 2)
+        self.complete(self.students[0], lessons[0])
+        self.complete(self.students[0], lessons[1])
+        self.assertEqual(self.enrollment(self.students[0]).progress, 100)
+
+        self.add_lessons(self.modules[1], 2)
+        self.assertEqual(self.enrollment(self.students[0]).progress, 50)
+        self.assertMatchesRecount()
+
+    def test_reenrollment_counts_earlier_progress(self):
+        lessons = self.add_lessons(self.modules[0], 2)
+        self.complete(self.students[1], lessons[0])
+        self.enrollment(self.students[1]).delete()
 
-# Create your tests here.
+        enrollment = Enrollment.objects.create(student=self.students[1], course=self.course)
+        enrollment.refresh_from_db()
+        self.assertEqual((enrollment.completed_lessons, enrollment.progress), (1, 50))
+        self.assertMatchesRecount()
@@ -4,10 +4,10 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
-from django.utils import timezone
 
 from .models import Course, Module, Lesson, Enrollment, LessonProgress
 from .forms import CourseForm, ModuleForm, LessonForm
+from . import services
 
 
 # ===================== UMUMIY =====================
@@ -161,25 +161,13 @@ def lesson_complete(request, pk):
     lesson = get_object_or_404(Lesson, pk=pk)
 
     if request.user.is_student():
-        progress, _ = LessonProgress.objects.get_or_create(
+        LessonProgress.objects.get_or_create(
             student=request.user,
             lesson=lesson
         )
 
-        if not progress.is_completed:
-            progress.is_completed = True
-            progress.completed_at = timezone.now()
-            progress.save()
-
-            # Enrollment progressini yangilash
-            enrollment = Enrollment.objects.filter(
-                student=request.user,
-                course=lesson.module.course
-            ).first()
-
-            if enrollment:
-                enrollment.update_progress()
-
+        # Progress va yozilish hisoblagichini yangilash
+        if services.complete_lesson(request.user, lesson):
             messages.success(request, 'Dars tugatildi!')
 
     return redirect('courses:lesson_detail', pk=pk)
@@ -275,7 +263,7 @@ def teacher_module_create(request, course_pk):
             return redirect('courses:teacher_course_detail', pk=course_pk)
     else:
         # Keyingi tartib raqamini olish
-        last_order = course.modules.count()
+        last_order = course.module_count
         form = ModuleForm(initial={'order': last_order})
 
     return render(request, 'courses/teacher/module_form.html', {
@@ -337,7 +325,7 @@ def teacher_lesson_create(request, module_pk):
             messages.success(request, 'Dars qo\'shildi!')
             return redirect('courses:teacher_course_detail', pk=module.course.pk)
     else:
-        last_order = module.lessons.count()
+        last_order = module.lesson_count
         form = LessonForm(initial={'order': last_order})
 
     return render(request, 'courses/teacher/lesson_form.html', {
@@ -132,6 +132,17 @@ LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'accounts:dashboard'
 LOGOUT_REDIRECT_URL = 'accounts:login'
 
+# Test javoblarini saqlash usuli: 'compact' (urinishning o'zida) yoki 'rows' (StudentAnswer + M2M)
+ASSESSMENTS_SELECTION_STORAGE = os.getenv('ASSESSMENTS_SELECTION_STORAGE', 'rows')
+# Yuborilgan testlarni `grade_submissions --interval N` ishchisi baholaydi (so'rov ichida emas);
+# ishchi alohida jarayon sifatida doim ishlab turishi kerak
+ASSESSMENTS_ASYNC_GRADING = os.getenv('ASSESSMENTS_ASYNC_GRADING', 'False').lower() in ('true', '1', 'yes')
+# Ishchi shuncha soniyada olmagan urinish natija sahifasi so'rovida baholanadi (0 - o'chirilgan)
+ASSESSMENTS_GRADING_TIMEOUT = int(os.getenv('ASSESSMENTS_GRADING_TIMEOUT', '30'))
+# Test kuzatuvi long-poll kutish vaqti (soniya); faqat ASGI va umumiy kesh (Redis va h.k.) bilan
+# ishlaydi, aks holda 0 - oddiy so'rovlar
+ASSESSMENTS_LIVE_WAIT = int(os.getenv('ASSESSMENTS_LIVE_WAIT', '0'))
+
 # AI Chatbot
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 